@@ -0,0 +1,230 @@
+"""Append-only change log behind server.py's change feed (GET /api/changes).
+
+Entries live in the change_log collection under sequence numbers taken from the
+counters collection; see ChangeLog for how appends are batched and the log compacted.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import DeleteOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeLog:
+    """Append-only log of writes to the synced collections, read by the change feed.
+
+    Each write appends an upsert (with the document) or a tombstone under the next
+    global sequence number, which doubles as the feed's resume token. Appends made
+    while an earlier batch is being written are grouped, so a bulk write reserves its
+    sequence numbers with one increment and lands in one insert_many.
+
+    Compaction works through new entries in batches, dropping the entries each one
+    supersedes, and drops tombstones older than the retention window. The newest
+    dropped tombstone becomes the horizon: tokens before it may have missed a delete,
+    so their clients must resync. An entry that couldn't be written moves the horizon
+    past it for the same reason.
+    """
+
+    def __init__(self, database, retention: float, compact_interval: float, compact_batch: int,
+                 settle: float):
+        self.collection = database.change_log
+        self.counters = database.counters
+        self.retention = retention
+        self.compact_interval = compact_interval
+        self.compact_batch = compact_batch
+        self.settle = settle
+        self._task = None
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_written: Optional[asyncio.Future] = None
+        self._writers = set()
+        self._write_lock = asyncio.Lock()
+        self._resync_needed = False
+        self.appended = 0
+        self.batches = 0
+        self.lost = 0
+        self.compacted = 0
+
+    @staticmethod
+    def scope(tenant: Optional[str] = None) -> Dict[str, Any]:
+        # Always present, so single-site queries (tenant null) use the tenant-led indexes too
+        return {"tenant": tenant}
+
+    async def append(self, collection_name: str, operation: str, doc_id: str,
+                     document: Optional[Dict[str, Any]] = None, tenant: Optional[str] = None):
+        """Record one write to collection_name, returning once its batch is written"""
+        entry = {
+            "collection": collection_name,
+            "doc_id": doc_id,
+            "op": "delete" if operation == "delete" else "upsert",
+        }
+        if tenant:
+            entry["tenant"] = tenant
+        if document is not None:
+            entry["document"] = document
+        if self._pending_written is None:
+            self._pending_written = asyncio.get_running_loop().create_future()
+            writer = asyncio.create_task(self._write_pending())
+            self._writers.add(writer)
+            writer.add_done_callback(self._writers.discard)
+        self._pending.append(entry)
+        await asyncio.shield(self._pending_written)
+
+    async def _write_pending(self):
+        # Appends arriving in the same tick, or while an earlier batch is written, join the batch
+        await asyncio.sleep(0)
+        async with self._write_lock:
+            entries, self._pending = self._pending, []
+            written, self._pending_written = self._pending_written, None
+            try:
+                last = await self._reserve(len(entries))
+                at = datetime.utcnow()
+                for seq, entry in enumerate(entries, last - len(entries) + 1):
+                    entry.update(seq=seq, at=at)
+                await self.collection.insert_many(entries, ordered=False)
+                self.appended += len(entries)
+                self.batches += 1
+            except PyMongoError as e:
+                # The writes themselves succeeded; make feed consumers resync to pick them up
+                self.lost += len(entries)
+                self._resync_needed = True
+                logger.error(f"Failed to log {len(entries)} changes: {e}")
+                await self._force_resync()
+            finally:
+                written.set_result(None)
+
+    async def _reserve(self, count: int) -> int:
+        """Take count sequence numbers, returning the last"""
+        counter = await self.counters.find_one_and_update(
+            {"id": "change_log"}, {"$inc": {"seq": count}},
+            projection={"_id": 0, "seq": 1}, upsert=True, return_document=ReturnDocument.AFTER,
+        )
+        return counter["seq"]
+
+    async def _force_resync(self):
+        """Move the horizon past everything logged so far, including lost entries"""
+        try:
+            await self._raise_horizon(await self._reserve(1))
+            self._resync_needed = False
+        except PyMongoError as e:
+            logger.error(f"Failed to expire change tokens; retrying on the next compaction: {e}")
+
+    async def _raise_horizon(self, seq: int):
+        try:
+            await self.counters.find_one_and_update(
+                {"id": "change_log_horizon", "seq": {"$lt": seq}}, {"$set": {"seq": seq}}, upsert=True
+            )
+        except DuplicateKeyError:
+            # Another worker already raised it at least this far
+            pass
+
+    async def _counter(self, name: str) -> int:
+        doc = await self.counters.find_one({"id": name}, {"_id": 0, "seq": 1})
+        return doc["seq"] if doc else 0
+
+    async def horizon(self) -> int:
+        return await self._counter("change_log_horizon")
+
+    async def head(self, tenant: Optional[str] = None) -> int:
+        """Token covering every settled entry, to start following the feed from"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.settle)
+        docs = await self.collection.find(
+            {**self.scope(tenant), "at": {"$lte": cutoff}}, {"_id": 0, "seq": 1}
+        ).sort("seq", -1).limit(1).to_list(1)
+        return max(docs[0]["seq"] if docs else 0, await self.horizon())
+
+    async def read(self, since: int, limit: int, tenant: Optional[str] = None):
+        """Settled entries after since in log order, and whether more may follow"""
+        docs = await self.collection.find(
+            {**self.scope(tenant), "seq": {"$gt": since}}, {"_id": 0, "tenant": 0}
+        ).sort("seq", 1).limit(limit + 1).to_list(limit + 1)
+        cutoff = (datetime.utcnow() - timedelta(seconds=self.settle)).isoformat()
+        entries = []
+        for doc in docs[:limit]:
+            at = doc["at"]
+            # Stop at the first unsettled entry so nothing before it can be skipped
+            if (at.isoformat() if isinstance(at, datetime) else at) > cutoff:
+                return entries, False
+            entries.append(doc)
+        return entries, len(docs) > limit
+
+    async def compact(self) -> int:
+        if self._resync_needed:
+            await self._force_resync()
+        return await self._drop_superseded() + await self._drop_expired_tombstones()
+
+    async def _drop_superseded(self) -> int:
+        """Delete the entries superseded by entries logged since the last compaction"""
+        removed = 0
+        position = await self._counter("change_log_compacted")
+        while True:
+            entries = await self.collection.find(
+                {"seq": {"$gt": position}}, {"_id": 0, "seq": 1, "tenant": 1, "collection": 1, "doc_id": 1}
+            ).sort("seq", 1).limit(self.compact_batch).to_list(self.compact_batch)
+            if not entries:
+                return removed
+            newest = {}
+            for entry in entries:
+                newest[(entry.get("tenant"), entry["collection"], entry["doc_id"])] = entry["seq"]
+            for (tenant, collection_name, doc_id), seq in newest.items():
+                result = await self.collection.delete_many({
+                    **self.scope(tenant), "collection": collection_name, "doc_id": doc_id, "seq": {"$lt": seq},
+                })
+                removed += result.deleted_count
+            position = entries[-1]["seq"]
+            await self.counters.find_one_and_update(
+                {"id": "change_log_compacted"}, {"$set": {"seq": position}}, upsert=True
+            )
+            self.compacted += removed
+            if len(entries) < self.compact_batch:
+                return removed
+
+    async def _drop_expired_tombstones(self) -> int:
+        removed = 0
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention)
+        while True:
+            expired = await self.collection.find(
+                {"op": "delete", "at": {"$lt": cutoff}}, {"_id": 0, "seq": 1, "tenant": 1}
+            ).limit(self.compact_batch).to_list(self.compact_batch)
+            if not expired:
+                return removed
+            # Expire the tokens first, so a failure in between never hides a delete
+            await self._raise_horizon(max(doc["seq"] for doc in expired))
+            await self.collection.bulk_write(
+                [DeleteOne({**self.scope(doc.get("tenant")), "seq": doc["seq"]}) for doc in expired],
+                ordered=False,
+            )
+            removed += len(expired)
+            self.compacted += len(expired)
+            if len(expired) < self.compact_batch:
+                return removed
+
+    async def _compact_loop(self):
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            try:
+                removed = await self.compact()
+                if removed:
+                    logger.info(f"Compacted {removed} change log entries")
+            except PyMongoError as e:
+                logger.warning(f"Change log compaction failed: {e}")
+
+    def start(self):
+        self._task = asyncio.create_task(self._compact_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "appended": self.appended,
+            "batches": self.batches,
+            "lost": self.lost,
+            "compacted": self.compacted,
+        }
@@ -0,0 +1,163 @@
+"""Durable background job queue used by server.py for work that shouldn't hold up a request.
+
+Jobs live in a collection so they survive restarts; each kind has a handler that takes a
+batch of payloads, and jobs that keep failing end up in a dead-letter collection.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """Durable background jobs stored in a collection and run by asyncio workers.
+
+    Workers claim up to batch_size due jobs of one kind and hand their payloads to the
+    kind's handler, which succeeds or raises for the whole batch. A failed batch is run
+    again one job at a time, so a single bad job can't fail the others. Failed jobs are
+    retried after retry_base * 2**(attempts - 1) seconds (capped at retry_max) and moved
+    to the dead-letter collection after max_attempts. A claim is a lease, so jobs held
+    by a worker that died become due again once it expires.
+    """
+
+    def __init__(self, collection, dead_letter, workers: int, batch_size: int, linger: float,
+                 poll_interval: float, max_attempts: int, retry_base: float, retry_max: float, lease: float):
+        self.collection = collection
+        self.dead_letter = dead_letter
+        self.workers = workers
+        self.batch_size = batch_size
+        self.linger = linger
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.lease = lease
+        self.handlers = {}
+        self._wakeup = None
+        self._tasks = []
+        self.enqueued = 0
+        self.completed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.batches = 0
+
+    def register(self, kind: str, handler):
+        """Register handler(payloads) as the coroutine that runs jobs of kind"""
+        self.handlers[kind] = handler
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any]):
+        now = datetime.utcnow()
+        await self.collection.insert_one({
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "run_at": now,
+            "created_at": now,
+        })
+        self.enqueued += 1
+        if self._wakeup:
+            self._wakeup.set()
+
+    def start(self):
+        if self.handlers and not self._tasks:
+            self._wakeup = asyncio.Event()
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stop the workers; jobs they had claimed run again when their lease expires"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                # Give jobs enqueued right behind this one a moment to join its batch
+                self._wakeup.clear()
+                await asyncio.sleep(self.linger)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                for kind in self.handlers:
+                    while jobs := await self._claim(kind):
+                        await self._run(kind, jobs)
+            except PyMongoError as e:
+                logger.error(f"Job queue worker failed to reach {self.collection.name}: {e}")
+
+    async def _claim(self, kind: str) -> List[Dict[str, Any]]:
+        now = datetime.utcnow()
+        jobs = []
+        while len(jobs) < self.batch_size:
+            job = await self.collection.find_one_and_update(
+                {"kind": kind, "$or": [
+                    {"status": "pending", "run_at": {"$lte": now}},
+                    {"status": "running", "locked_until": {"$lte": now}},
+                ]},
+                {"$set": {"status": "running", "locked_until": now + timedelta(seconds=self.lease)}},
+                projection={"_id": 0},
+            )
+            if not job:
+                break
+            jobs.append(job)
+        return jobs
+
+    async def _run(self, kind: str, jobs: List[Dict[str, Any]]):
+        self.batches += 1
+        try:
+            await self.handlers[kind]([job["payload"] for job in jobs])
+        except Exception as e:
+            if len(jobs) == 1:
+                await self._fail(kind, jobs, e)
+                return
+            logger.warning(f"Batch of {len(jobs)} {kind} jobs failed, running them one at a time: {e}")
+            for job in jobs:
+                await self._run(kind, [job])
+            return
+        await self.collection.bulk_write([DeleteOne({"id": job["id"]}) for job in jobs], ordered=False)
+        self.completed += len(jobs)
+
+    async def _fail(self, kind: str, jobs: List[Dict[str, Any]], error: Exception):
+        now = datetime.utcnow()
+        operations = []
+        dead = []
+        for job in jobs:
+            attempts = job["attempts"] + 1
+            if attempts >= self.max_attempts:
+                dead.append({**job, "status": "dead", "attempts": attempts, "last_error": str(error), "failed_at": now})
+                operations.append(DeleteOne({"id": job["id"]}))
+            else:
+                delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+                operations.append(UpdateOne({"id": job["id"]}, {"$set": {
+                    "status": "pending",
+                    "attempts": attempts,
+                    "run_at": now + timedelta(seconds=delay),
+                    "last_error": str(error),
+                }}))
+        # Copy to the dead-letter collection before deleting, so a crash in between keeps the job
+        if dead:
+            await self.dead_letter.insert_many(dead, ordered=False)
+        await self.collection.bulk_write(operations, ordered=False)
+        self.retried += len(jobs) - len(dead)
+        self.dead_lettered += len(dead)
+        logger.warning(f"{len(jobs)} {kind} jobs failed ({len(dead)} dead-lettered): {error}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "enqueued": self.enqueued,
+            "completed": self.completed,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "batches": self.batches,
+        }
@@ -0,0 +1,30 @@
+"""SMTP delivery for the notification emails server.py queues as background jobs."""
+
+import asyncio
+import smtplib
+from email.message import EmailMessage
+from typing import List
+
+
+class SMTPNotifier:
+    """Sends email over one SMTP session per batch, off the event loop"""
+
+    def __init__(self, host: str, port: int, username: str, password: str, starttls: bool, timeout: float):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def _send(self, messages: List[EmailMessage]):
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for message in messages:
+                smtp.send_message(message)
+
+    async def send(self, messages: List[EmailMessage]):
+        await asyncio.to_thread(self._send, messages)
@@ -0,0 +1,92 @@
+"""Model serialization shared by server.py's handlers and repositories.
+
+Models are turned into Mongo-ready dicts by a ModelEncoder precompiled once per
+model class, and responses are rendered with orjson when it is installed.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Union, get_args, get_origin
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, HttpUrl
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def unwrap_annotation(annotation):
+    """Strip Optional[...] and List[...] from a field annotation, returning (inner type, is_list)"""
+    many = False
+    while True:
+        origin = get_origin(annotation)
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if origin is Union and len(args) == 1:
+            annotation = args[0]
+        elif origin in (list, List) and args:
+            annotation, many = args[0], True
+        else:
+            return annotation, many
+
+
+class ModelEncoder:
+    """Precompiled converter from a model instance to a Mongo-ready dict.
+
+    Which fields hold HttpUrl values or nested models is worked out once per
+    model class, so encoding an instance only touches those fields.
+    """
+
+    def __init__(self, model):
+        self.url_fields = []
+        self.nested_fields = []
+        for name, field in model.model_fields.items():
+            inner, many = unwrap_annotation(field.annotation)
+            if inner is HttpUrl:
+                self.url_fields.append(name)
+            elif isinstance(inner, type) and issubclass(inner, BaseModel):
+                self.nested_fields.append((name, encoder_for(inner), many))
+
+    def encode(self, obj) -> Dict[str, Any]:
+        data = dict(obj.__dict__)
+        for name in self.url_fields:
+            value = data[name]
+            if value is not None:
+                data[name] = str(value)
+        for name, encoder, many in self.nested_fields:
+            value = data[name]
+            if value is not None:
+                data[name] = [encoder.encode(item) for item in value] if many else encoder.encode(value)
+        return data
+
+
+model_encoders: Dict[type, ModelEncoder] = {}
+
+
+def encoder_for(model) -> ModelEncoder:
+    encoder = model_encoders.get(model)
+    if encoder is None:
+        encoder = model_encoders[model] = ModelEncoder(model)
+    return encoder
+
+
+def model_to_dict(model):
+    """Convert Pydantic model to dict with HttpUrl converted to strings"""
+    return encoder_for(type(model)).encode(model)
+
+
+def json_default(value):
+    """Encode what json can't natively the way orjson does: datetimes as ISO 8601"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, default=json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
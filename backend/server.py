@@ -1,35 +1,1391 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse, JSONResponse, Response, PlainTextResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers
+from starlette.websockets import WebSocketClose
 from motor.motor_asyncio import AsyncIOMotorClient
+from storage import MemoryClient, SQLiteClient
+from jobs import JobQueue
+from mailer import SMTPNotifier
+from snapshots import SnapshotPublisher
+from changelog import ChangeLog
+from serialization import FastJSONResponse, model_to_dict
+from pymongo import IndexModel, InsertOne, UpdateOne, DeleteOne, ReturnDocument, ReadPreference, ASCENDING, DESCENDING, monitoring
+from pymongo.errors import PyMongoError, BulkWriteError, DuplicateKeyError, OperationFailure
 import os
+import asyncio
+import inspect
 import logging
+import threading
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr, HttpUrl
+from pydantic import BaseModel, Field, EmailStr, HttpUrl, ValidationError
 from typing import List, Optional, Dict, Any
 import uuid
+import time
+import json
+import base64
+import bisect
+import contextvars
+import hashlib
+import ipaddress
+import re
+from collections import OrderedDict
 from datetime import datetime
+from email.message import EmailMessage
 
 
-def model_to_dict(model):
-    """Convert Pydantic model to dict with HttpUrl converted to strings"""
-    data = model.dict()
-    for key, value in data.items():
-        if hasattr(value, '__str__') and 'HttpUrl' in str(type(value)):
-            data[key] = str(value)
-    return data
+def encode_cursor(sort_value, doc_id: str) -> str:
+    """Encode a keyset position as an opaque URL-safe cursor"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, doc_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Decode a cursor produced by encode_cursor, raising 400 if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, doc_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), str(doc_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(model, fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma-separated fields= parameter against model; None selects every field"""
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in model.model_fields]
+    if not names or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields {unknown}; choose from {list(model.model_fields)}" if unknown
+            else "fields must name at least one field",
+        )
+    return names
+
+
+def sparse(content, fields: Optional[List[str]]):
+    """Trim a serialized document, or a list of them, down to the selected fields"""
+    if fields is None:
+        return content
+    if isinstance(content, list):
+        return [{name: doc[name] for name in fields if name in doc} for doc in content]
+    return {name: content[name] for name in fields if name in content}
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Metrics
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram in seconds"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+def label_string(**labels) -> str:
+    return ",".join(f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                    for key, value in labels.items())
+
+
+class HTTPMetrics:
+    """Per-route request latency, status codes and in-flight counts.
+
+    Only touched from the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self):
+        self.in_flight: Dict[str, int] = {}
+        self.responses: Dict[tuple, int] = {}
+        self.latency: Dict[tuple, Histogram] = {}
+
+    def started(self, route: str):
+        self.in_flight[route] = self.in_flight.get(route, 0) + 1
+
+    def finished(self, method: str, route: str, status: int, seconds: float):
+        self.in_flight[route] -= 1
+        key = (method, route, status)
+        self.responses[key] = self.responses.get(key, 0) + 1
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = Histogram()
+        histogram.observe(seconds)
+
+    def render(self) -> List[str]:
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being handled",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        lines += [f"http_requests_in_flight{{{label_string(route=route)}}} {count}"
+                  for route, count in self.in_flight.items()]
+        lines += ["# HELP http_requests_total Completed requests", "# TYPE http_requests_total counter"]
+        lines += [f"http_requests_total{{{label_string(method=method, route=route, status=status)}}} {count}"
+                  for (method, route, status), count in self.responses.items()]
+        lines += ["# HELP http_request_duration_seconds Request latency",
+                  "# TYPE http_request_duration_seconds histogram"]
+        for (method, route), histogram in self.latency.items():
+            lines += histogram.render("http_request_duration_seconds", label_string(method=method, route=route))
+        return lines
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Mongo command latency per command and collection, fed by pymongo command events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collections: Dict[int, str] = {}
+        self.outcomes: Dict[tuple, int] = {}
+        self.latency: Dict[tuple, Histogram] = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if isinstance(collection, str):
+            with self._lock:
+                self._collections[event.request_id] = collection
+
+    def _finished(self, event, outcome: str):
+        seconds = event.duration_micros / 1e6
+        with self._lock:
+            collection = self._collections.pop(event.request_id, "")
+            key = (event.command_name, collection)
+            self.outcomes[key + (outcome,)] = self.outcomes.get(key + (outcome,), 0) + 1
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram()
+            histogram.observe(seconds)
+
+    def succeeded(self, event):
+        self._finished(event, "success")
+
+    def failed(self, event):
+        self._finished(event, "failure")
+
+    def render(self) -> List[str]:
+        with self._lock:
+            lines = ["# HELP mongo_commands_total Completed Mongo commands", "# TYPE mongo_commands_total counter"]
+            lines += [
+                f"mongo_commands_total{{{label_string(command=command, collection=collection, outcome=outcome)}}} {count}"
+                for (command, collection, outcome), count in self.outcomes.items()
+            ]
+            lines += ["# HELP mongo_command_duration_seconds Mongo command latency",
+                      "# TYPE mongo_command_duration_seconds histogram"]
+            for (command, collection), histogram in self.latency.items():
+                lines += histogram.render(
+                    "mongo_command_duration_seconds", label_string(command=command, collection=collection)
+                )
+        return lines
+
+
+# Slow operation log
+SLOW_OP_THRESHOLD_MS = float(os.environ.get('SLOW_OP_THRESHOLD_MS', '100'))
+SLOW_OP_LOG_SIZE = int(os.environ.get('SLOW_OP_LOG_SIZE', '100'))
+
+# Route template of the request being handled; Motor copies the context into its executor threads
+current_route: contextvars.ContextVar = contextvars.ContextVar('current_route', default=None)
+
+# command name -> function returning the filter from the command document
+COMMAND_FILTERS = {
+    'find': lambda command: command.get('filter', {}),
+    'count': lambda command: command.get('query', {}),
+    'distinct': lambda command: command.get('query', {}),
+    'findAndModify': lambda command: command.get('query', {}),
+    'update': lambda command: command['updates'][0].get('q', {}) if command.get('updates') else {},
+    'delete': lambda command: command['deletes'][0].get('q', {}) if command.get('deletes') else {},
+    'aggregate': lambda command: command.get('pipeline', []),
+}
+
+# Command fields explain() rejects or that only make sense for the original command
+EXPLAIN_EXCLUDED_FIELDS = {'lsid', 'txnNumber', 'writeConcern', 'readConcern', '$db', '$clusterTime', '$readPreference'}
+
+
+def query_shape(value):
+    """Replace the literal values of a filter with 1, keeping fields and operators"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            return [query_shape(item) for item in value]
+        return 1
+    return 1
+
+
+class SlowOpLog(monitoring.CommandListener):
+    """Records Mongo commands slower than a threshold, deduplicated per query shape.
+
+    The explain("executionStats") of each new shape is captured on the event loop in the
+    background, so the command that was slow is not delayed any further.
+    """
+
+    def __init__(self, threshold_ms: float, size: int):
+        self.threshold_micros = threshold_ms * 1000
+        self.size = size
+        self._lock = threading.Lock()
+        self._started: Dict[int, tuple] = {}
+        self._entries: OrderedDict = OrderedDict()
+        self._loop = None
+        self._tasks = set()
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+
+    def started(self, event):
+        if self.threshold_micros <= 0 or event.command_name not in COMMAND_FILTERS:
+            return
+        with self._lock:
+            self._started[event.request_id] = (event.database_name, event.command, current_route.get())
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+
+    def _finished(self, event):
+        with self._lock:
+            started = self._started.pop(event.request_id, None)
+        if started is None or event.duration_micros < self.threshold_micros:
+            return
+        database_name, command, route = started
+        collection = command.get(event.command_name)
+        shape = query_shape(COMMAND_FILTERS[event.command_name](command))
+        key = (event.command_name, collection, json.dumps(shape, sort_keys=True))
+        duration_ms = event.duration_micros / 1000
+        logger.warning(
+            f"Slow Mongo {event.command_name} on {collection} took {duration_ms:.1f}ms "
+            f"(shape {key[2]}, route {route})"
+        )
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {
+                    "command": event.command_name,
+                    "collection": collection,
+                    "shape": shape,
+                    "count": 0,
+                    "max_ms": 0.0,
+                    "explain": None,
+                }
+                if len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+                explain = self._loop is not None
+            else:
+                self._entries.move_to_end(key)
+                explain = False
+            entry["count"] += 1
+            entry["last_ms"] = duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_route"] = route
+            entry["last_seen"] = datetime.utcnow()
+
+        if explain:
+            explained = {field: value for field, value in command.items() if field not in EXPLAIN_EXCLUDED_FIELDS}
+            self._loop.call_soon_threadsafe(self._schedule_explain, entry, database_name, explained)
+
+    def _schedule_explain(self, entry, database_name: str, command: dict):
+        task = self._loop.create_task(self._explain(entry, database_name, command))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, entry, database_name: str, command: dict):
+        try:
+            result = await client[database_name].command({"explain": command, "verbosity": "executionStats"})
+        except PyMongoError as e:
+            entry["explain"] = {"error": str(e)}
+            return
+        stats = result.get("executionStats", {})
+        entry["explain"] = {
+            "winning_plan": result.get("queryPlanner", {}).get("winningPlan"),
+            "n_returned": stats.get("nReturned"),
+            "execution_time_ms": stats.get("executionTimeMillis"),
+            "keys_examined": stats.get("totalKeysExamined"),
+            "docs_examined": stats.get("totalDocsExamined"),
+        }
+
+    def entries(self) -> List[dict]:
+        with self._lock:
+            return [dict(entry) for entry in reversed(self._entries.values())]
+
+
+http_metrics = HTTPMetrics()
+command_metrics = CommandMetrics()
+slow_op_log = SlowOpLog(SLOW_OP_THRESHOLD_MS, SLOW_OP_LOG_SIZE)
+
+# Storage backend: "mongo" (default), "memory" for tests and benchmarks, or "sqlite"
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo')
+
+# MongoDB connection pool settings
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '10'))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '300000'))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '2000'))
+# Read preference for public GETs, e.g. "secondaryPreferred"; writes always go to the primary.
+# A secondary can lag behind a write, so a public GET may briefly serve the previous
+# document; its ETag is hashed from that body and conditional_get never remembers it
+# against the new versions, so clients pick up the write once the secondary catches up.
+# Singleton caches refilled from a lagging secondary hold that copy until their TTL.
+MONGO_PUBLIC_READ_PREFERENCE = os.environ.get('MONGO_PUBLIC_READ_PREFERENCE', 'primary')
+# Connections opened at startup before the app reports ready
+MONGO_WARMUP_CONNECTIONS = int(os.environ.get('MONGO_WARMUP_CONNECTIONS', str(MONGO_MIN_POOL_SIZE)))
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Live connection pool counters per server, fed by pymongo's pool events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers: Dict[str, Dict[str, int]] = {}
+
+    def _bump(self, address, **changes):
+        key = f"{address[0]}:{address[1]}"
+        with self._lock:
+            server = self._servers.setdefault(key, {
+                "open": 0, "in_use": 0, "waiting": 0, "checkouts": 0, "checkout_failures": 0, "cleared": 0,
+            })
+            for name, delta in changes.items():
+                server[name] += delta
+
+    def pool_created(self, event):
+        self._bump(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._bump(event.address, cleared=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._bump(event.address, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._bump(event.address, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._bump(event.address, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._bump(event.address, waiting=-1, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._bump(event.address, waiting=-1, in_use=1, checkouts=1)
+
+    def connection_checked_in(self, event):
+        self._bump(event.address, in_use=-1)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {address: dict(counters) for address, counters in self._servers.items()}
+
+
+pool_stats = PoolStats()
+
+if STORAGE_BACKEND == 'mongo':
+    # MongoDB connection
+    mongo_url = os.environ['MONGO_URL']
+    client = AsyncIOMotorClient(
+        mongo_url,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        event_listeners=[pool_stats, command_metrics, slow_op_log],
+    )
+elif STORAGE_BACKEND == 'memory':
+    client = MemoryClient()
+elif STORAGE_BACKEND == 'sqlite':
+    client = SQLiteClient(os.environ.get('SQLITE_PATH', str(ROOT_DIR / 'ladypi89.sqlite3')))
+else:
+    raise RuntimeError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}")
+db = client[os.environ.get('DB_NAME', 'ladypi89')]
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+# Database handle for public GETs; read-after-write paths keep using db
+if STORAGE_BACKEND == 'mongo' and MONGO_PUBLIC_READ_PREFERENCE != 'primary':
+    public_db = db.with_options(read_preference=READ_PREFERENCES[MONGO_PUBLIC_READ_PREFERENCE])
+else:
+    public_db = db
+
+
+async def warm_up_connections():
+    """Open MONGO_WARMUP_CONNECTIONS pooled connections so first requests skip the handshake"""
+    if STORAGE_BACKEND != 'mongo' or MONGO_WARMUP_CONNECTIONS <= 0:
+        return
+    start = time.perf_counter()
+    targets = [db] if public_db is db else [db, public_db]
+    # Concurrent pings each need their own connection, which the pool keeps afterwards
+    await asyncio.gather(*(
+        target.command("ping", read_preference=target.read_preference)
+        for target in targets for _ in range(MONGO_WARMUP_CONNECTIONS)
+    ))
+    logger.info(
+        f"Warmed up {MONGO_WARMUP_CONNECTIONS} connections per target in "
+        f"{(time.perf_counter() - start) * 1000:.0f}ms: {pool_stats.snapshot()}"
+    )
+
+# Index registry: every index the handlers rely on, keyed by collection
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "biography": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+    ],
+    "partnerships": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+    ],
+    "social_media": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+    ],
+    "streaming_status": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+    ],
+    "site_profile": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+    ],
+    "contact_forms": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id", background=True),
+        IndexModel(
+            [("content_hash", ASCENDING)], name="content_hash_unique", unique=True, background=True,
+            partialFilterExpression={"content_hash": {"$exists": True}},
+        ),
+    ],
+    "status_checks": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+        IndexModel([("timestamp", DESCENDING), ("id", DESCENDING)], name="timestamp_id", background=True),
+    ],
+    "jobs": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+        IndexModel([("kind", ASCENDING), ("status", ASCENDING), ("run_at", ASCENDING)], name="kind_status_run_at",
+                   background=True),
+    ],
+    "jobs_dead_letter": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+    ],
+    # Shared across tenants with its own tenant-led indexes: compaction scans the whole log
+    "change_log": [
+        IndexModel([("seq", ASCENDING)], name="seq_unique", unique=True, background=True),
+        IndexModel([("tenant", ASCENDING), ("seq", ASCENDING)], name="tenant_seq", background=True),
+        IndexModel(
+            [("tenant", ASCENDING), ("collection", ASCENDING), ("doc_id", ASCENDING), ("seq", ASCENDING)],
+            name="tenant_collection_doc_id_seq", background=True,
+        ),
+        IndexModel([("op", ASCENDING), ("at", ASCENDING)], name="op_at", background=True),
+    ],
+    "counters": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+    ],
+    "tenants": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+        IndexModel([("hosts", ASCENDING)], name="hosts", background=True),
+    ],
+}
+
+
+async def ensure_indexes(database, registry=None) -> Dict[str, Dict[str, List[str]]]:
+    """Create any registry index that is missing and return what was done per collection"""
+    report = {}
+    for collection_name, indexes in (registry or INDEX_REGISTRY).items():
+        collection = database[collection_name]
+        existing = await collection.index_information()
+        result = {"created": [], "existing": [], "failed": []}
+        for index in indexes:
+            name = index.document["name"]
+            if name in existing:
+                result["existing"].append(name)
+                continue
+            try:
+                await collection.create_indexes([index])
+                result["created"].append(name)
+            except PyMongoError as e:
+                logger.error(f"Failed to create index {collection_name}.{name}: {e}")
+                result["failed"].append(name)
+        report[collection_name] = result
+    return report
+
+
+def unique_indexes(collection_names) -> Dict[str, List[IndexModel]]:
+    """The registry's unique indexes on collection_names"""
+    return {
+        collection_name: [index for index in INDEX_REGISTRY[collection_name] if index.document.get("unique")]
+        for collection_name in collection_names
+    }
+
+
+async def build_indexes():
+    """Build registry indexes and log a report, without blocking startup"""
+    try:
+        report = await ensure_indexes(db)
+    except PyMongoError as e:
+        logger.error(f"Index build aborted: {e}")
+        return
+    for collection_name, result in report.items():
+        logger.info(
+            f"Indexes on {collection_name}: created={result['created']} "
+            f"existing={result['existing']} failed={result['failed']}"
+        )
+
+
+# Return list endpoints straight from Mongo documents, skipping model validation
+FAST_RESPONSES = os.environ.get('FAST_RESPONSES', '1') == '1'
+
+# Multi-tenant mode serves many creator sites from one deployment. Each request is
+# resolved to a tenant from a "/t/<tenant>" path prefix or from its host, and requests
+# that resolve to none are served as DEFAULT_TENANT
+MULTI_TENANT = os.environ.get('MULTI_TENANT', '0') == '1'
+TENANT_RESOLUTION = os.environ.get('TENANT_RESOLUTION', 'host')  # host or path
+TENANT_BASE_DOMAIN = os.environ.get('TENANT_BASE_DOMAIN', '').lower()
+DEFAULT_TENANT = os.environ.get('DEFAULT_TENANT', 'ladypi89')
+TENANT_PATH_PREFIX = "/t/"
+
+# Tenant of the request being handled; None outside multi-tenant mode
+current_tenant: contextvars.ContextVar = contextvars.ContextVar('current_tenant', default=None)
+
+
+def tenant_key(name: str, tenant: Optional[str] = None) -> str:
+    """Scope a cache or version key to tenant, or to the current request's tenant"""
+    tenant = tenant or current_tenant.get()
+    return f"{tenant}:{name}" if tenant else name
+
+
+# Collections shared by every tenant; all others are partitioned by a tenant field
+SHARED_COLLECTIONS = {"jobs", "jobs_dead_letter", "tenants", "cache_versions", "counters", "change_log"}
+
+
+def tenant_indexes(indexes: List[IndexModel]) -> List[IndexModel]:
+    """The same indexes led by the tenant field, so tenant-scoped queries can use them"""
+    scoped = []
+    for index in indexes:
+        options = dict(index.document)
+        keys = list(options.pop("key").items())
+        name = options.pop("name")
+        scoped.append(IndexModel([("tenant", ASCENDING), *keys], name=f"tenant_{name}", **options))
+    return scoped
+
+
+if MULTI_TENANT:
+    INDEX_REGISTRY = {
+        collection_name: indexes if collection_name in SHARED_COLLECTIONS else tenant_indexes(indexes)
+        for collection_name, indexes in INDEX_REGISTRY.items()
+    }
+
+
+# Singleton document cache (biography, streaming status)
+SINGLETON_CACHE_TTL = float(os.environ.get('SINGLETON_CACHE_TTL', '60'))
+
+
+class SingletonCache:
+    """TTL-bounded read-through cache for documents that exist once per collection (per tenant)"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, tuple] = {}
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, key: str, loader):
+        """Return the cached value for key, calling loader() on a miss or expiry"""
+        key = tenant_key(key)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        generation = self._generations.get(key, 0)
+        value = await loader()
+        # Don't store a value loaded before an invalidation that raced with it
+        if value is not None and self.ttl > 0 and self._generations.get(key, 0) == generation:
+            self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def peek(self, key: str):
+        """The cached value for key if there is a live one, without loading or counting"""
+        entry = self._entries.get(tenant_key(key))
+        return entry[1] if entry is not None and entry[0] > time.monotonic() else None
+
+    def invalidate(self, key: str):
+        self._invalidate(tenant_key(key))
+
+    def _invalidate(self, key: str):
+        self.invalidations += 1
+        self._generations[key] = self._generations.get(key, 0) + 1
+        self._entries.pop(key, None)
+
+    def put(self, key: str, value):
+        """Replace the cached value with one known to be fresh, e.g. the result of a write.
+
+        Priming after writes means the next read can't repopulate the cache from a
+        lagging secondary. A value of None just invalidates.
+        """
+        key = tenant_key(key)
+        self._invalidate(key)
+        if value is not None and self.ttl > 0:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self):
+        for key in set(self._entries) | set(self._generations):
+            self._invalidate(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ttl_seconds": self.ttl,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+singleton_cache = SingletonCache(SINGLETON_CACHE_TTL)
+
+# Single-flight coalescing of hot reads; stats are kept for this many route + query keys
+SINGLE_FLIGHT = os.environ.get('SINGLE_FLIGHT', '1') == '1'
+SINGLE_FLIGHT_TRACKED_KEYS = 256
+
+
+class SingleFlight:
+    """Collapses concurrent identical reads onto one in-flight call.
+
+    The first request for a route + query key starts the load and serializes its result
+    once; requests arriving while it runs await the same task and get the same bytes.
+    Loads are also keyed by the versions of the collections they read, so a request
+    that arrives after a write never joins a load that started before it (and was
+    tagged with the version after it). The load runs as its own task, so a
+    disconnecting first caller doesn't cancel it for the others.
+    """
+
+    def __init__(self, tracked_keys: int):
+        self.tracked_keys = tracked_keys
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats: OrderedDict = OrderedDict()
+
+    @staticmethod
+    def key(request: Request) -> str:
+        path = request.url.path
+        if request.url.query:
+            path += "?" + "&".join(sorted(request.url.query.split("&")))
+        return tenant_key(path)
+
+    @staticmethod
+    async def _load(loader, fields: Optional[List[str]]) -> bytes:
+        result = await loader()
+        if isinstance(result, list):
+            result = [model_to_dict(item) if isinstance(item, BaseModel) else item for item in result]
+        elif isinstance(result, BaseModel):
+            result = model_to_dict(result)
+        return FastJSONResponse(None).render(sparse(result, fields))
+
+    def _count(self, key: str, collapsed: bool):
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = {"requests": 0, "loads": 0, "collapsed": 0}
+            if len(self._stats) > self.tracked_keys:
+                self._stats.popitem(last=False)
+        else:
+            self._stats.move_to_end(key)
+        stats["requests"] += 1
+        stats["collapsed" if collapsed else "loads"] += 1
+
+    async def response(self, request: Request, collection_names, loader,
+                       fields: Optional[List[str]] = None) -> Response:
+        """A JSON response with loader()'s result, shared with identical concurrent requests"""
+        if not SINGLE_FLIGHT:
+            return Response(content=await self._load(loader, fields), media_type="application/json")
+        route_key = self.key(request)
+        key = f"{route_key}@{collection_versions.versions(collection_names)}"
+        task = self._inflight.get(key)
+        self._count(route_key, collapsed=task is not None)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(self._load(loader, fields))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        body = await asyncio.shield(task)
+        return Response(content=body, media_type="application/json")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": SINGLE_FLIGHT,
+            "in_flight": len(self._inflight),
+            "keys": {key: dict(stats) for key, stats in self._stats.items()},
+        }
+
+
+single_flight = SingleFlight(SINGLE_FLIGHT_TRACKED_KEYS)
+
+# Cross-worker cache coherence: "auto" watches a change stream and falls back to polling
+# the version document, "poll" always polls, "off" disables it (e.g. a single worker)
+CACHE_COHERENCE = os.environ.get('CACHE_COHERENCE', 'off' if STORAGE_BACKEND == 'memory' else 'auto')
+CACHE_POLL_INTERVAL = float(os.environ.get('CACHE_POLL_INTERVAL', '1'))
+CACHE_COHERENCE_MAX_BACKOFF = 60
+
+# Push channel settings
+STREAM_HEARTBEAT_SECONDS = float(os.environ.get('STREAM_HEARTBEAT_SECONDS', '15'))
+STREAM_QUEUE_SIZE = int(os.environ.get('STREAM_QUEUE_SIZE', '8'))
+
+
+class Broadcaster:
+    """In-process pub/sub that fans each published message out to every subscriber.
+
+    Each subscriber gets a small bounded queue. When a slow consumer's queue is
+    full the oldest message is dropped, so it always catches up to the latest state
+    and never holds memory or a database cursor for the publisher. Subscribers and
+    messages are scoped to the current tenant.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[Optional[str], set] = {}
+        self._last_messages: Dict[Optional[str], str] = {}
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def last_message(self) -> Optional[str]:
+        return self._last_messages.get(current_tenant.get())
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(current_tenant.get(), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        tenant = current_tenant.get()
+        subscribers = self._subscribers.get(tenant, set())
+        subscribers.discard(queue)
+        if not subscribers:
+            self._subscribers.pop(tenant, None)
+
+    def publish(self, message: Optional[str]):
+        """Queue message for the tenant's subscribers; None tells subscribers to disconnect"""
+        self.published += 1
+        self._last_messages[current_tenant.get()] = message
+        self._deliver(self._subscribers.get(current_tenant.get(), ()), message)
+
+    def _deliver(self, subscribers, message: Optional[str]):
+        for queue in subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(message)
+
+    def close(self):
+        """Disconnect every subscriber of every tenant"""
+        for subscribers in self._subscribers.values():
+            self._deliver(subscribers, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+streaming_status_broadcaster = Broadcaster(STREAM_QUEUE_SIZE)
+
+class Repository:
+    """Data access for one collection, shared by all CRUD handlers.
+
+    Every read projects documents down to the model's fields (dropping _id), or to
+    the fields a request selected, every update is a single atomic
+    find_one_and_update, and listeners are called after each successful write. In
+    multi-tenant mode every query is scoped to the current tenant and every new
+    document is stamped with it.
+    """
+
+    def __init__(self, database, collection_name: str, model, read_database=None):
+        self.collection = database[collection_name]
+        # Reads marked public may be routed to secondaries
+        self.public_collection = (database if read_database is None else read_database)[collection_name]
+        self.name = collection_name
+        self.model = model
+        self.projection = {"_id": 0, **{name: 1 for name in model.model_fields}}
+        self.listeners = []
+        self.document_listeners = 0
+
+    def add_listener(self, listener, documents: bool = True):
+        """Register listener(repository, operation, doc_id, document) for insert/update/delete.
+
+        document is the model after the write, or None for deletes. Listeners that
+        ignore it pass documents=False, which lets bulk updates skip reading back the
+        documents they changed; they may then be called with None after updates.
+        """
+        self.listeners.append(listener)
+        self.document_listeners += documents
+
+    def projection_for(self, fields: Optional[List[str]], *required: str) -> Dict[str, Any]:
+        if fields is None:
+            return self.projection
+        return {"_id": 0, **{name: 1 for name in (*fields, *required)}}
+
+    def scoped(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        """query (or a new document) restricted to the current tenant"""
+        tenant = current_tenant.get()
+        return {**query, "tenant": tenant} if tenant else query
+
+    async def notify(self, operation: str, doc_id: str, document=None):
+        for listener in self.listeners:
+            result = listener(self, operation, doc_id, document)
+            if inspect.isawaitable(result):
+                await result
+
+    async def find_one(self, query: Optional[Dict[str, Any]] = None, public: bool = False):
+        collection = self.public_collection if public else self.collection
+        doc = await collection.find_one(self.scoped(query or {}), self.projection)
+        return self.model(**doc) if doc else None
+
+    async def find_all(self, query: Optional[Dict[str, Any]] = None, limit: int = 1000, raw: bool = False,
+                       public: bool = False, fields: Optional[List[str]] = None):
+        """Fetch matching documents as models, or as projected dicts when raw or fields is set"""
+        collection = self.public_collection if public else self.collection
+        docs = await collection.find(self.scoped(query or {}), self.projection_for(fields)).to_list(limit)
+        if raw or fields is not None:
+            return docs
+        return [self.model(**doc) for doc in docs]
+
+    async def find_page(self, sort_field: str, limit: int, cursor: Optional[str], raw: bool = False,
+                        fields: Optional[List[str]] = None):
+        """Fetch one page ordered newest first by (sort_field, id), returning (items, next_cursor)
+
+        With fields, items are dicts of just those fields.
+        """
+        query = {}
+        if cursor:
+            sort_value, doc_id = decode_cursor(cursor)
+            query = {"$or": [
+                {sort_field: {"$lt": sort_value}},
+                {sort_field: sort_value, "id": {"$lt": doc_id}},
+            ]}
+        # Fetch one extra document to know whether another page exists
+        docs = await self.collection.find(
+            self.scoped(query), self.projection_for(fields, sort_field, "id")
+        ).sort([(sort_field, -1), ("id", -1)]).limit(limit + 1).to_list(limit + 1)
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(docs[-1][sort_field], docs[-1]["id"])
+        if fields is not None:
+            return sparse(docs, fields), next_cursor
+        if raw:
+            return docs, next_cursor
+        return [self.model(**doc) for doc in docs], next_cursor
+
+    async def insert(self, obj, extra: Optional[Dict[str, Any]] = None):
+        """Insert obj, storing any extra fields that are not part of its model"""
+        await self.collection.insert_one(self.scoped({**model_to_dict(obj), **(extra or {})}))
+        await self.notify("insert", obj.id, obj)
+        return obj
+
+    async def update(self, query: Dict[str, Any], changes: Dict[str, Any]):
+        """Apply $set changes and return the updated document, or None if nothing matched"""
+        if not changes:
+            return await self.find_one(query)
+        doc = await self.collection.find_one_and_update(
+            self.scoped(query),
+            {"$set": changes},
+            projection=self.projection,
+            return_document=ReturnDocument.AFTER,
+        )
+        if not doc:
+            return None
+        obj = self.model(**doc)
+        await self.notify("update", obj.id, obj)
+        return obj
+
+    async def delete(self, doc_id: str) -> bool:
+        result = await self.collection.delete_one(self.scoped({"id": doc_id}))
+        if result.deleted_count == 0:
+            return False
+        await self.notify("delete", doc_id)
+        return True
+
+    async def bulk_write(self, creates: List[Any], updates: List[tuple], deletes: List[str]) -> List[Dict[str, Any]]:
+        """Apply creates, (id, changes) updates and id deletes as one unordered bulk_write.
+
+        Returns one result per item in request order. Deletes are idempotent, so a
+        missing id still reports "deleted"; updates of missing ids report "not_found".
+        """
+        results = []
+        operations = []
+        operation_results = []
+        for obj in creates:
+            results.append({"op": "create", "id": obj.id, "status": "created"})
+            operations.append(InsertOne(self.scoped(model_to_dict(obj))))
+            operation_results.append(results[-1])
+        for doc_id, changes in updates:
+            results.append({"op": "update", "id": doc_id, "status": "updated"})
+            if not changes:
+                results[-1].update(status="failed", detail="No fields to update")
+                continue
+            operations.append(UpdateOne(self.scoped({"id": doc_id}), {"$set": changes}))
+            operation_results.append(results[-1])
+        for doc_id in deletes:
+            results.append({"op": "delete", "id": doc_id, "status": "deleted"})
+            operations.append(DeleteOne(self.scoped({"id": doc_id})))
+            operation_results.append(results[-1])
+        if not operations:
+            return results
+
+        try:
+            summary = (await self.collection.bulk_write(operations, ordered=False)).bulk_api_result
+        except BulkWriteError as e:
+            summary = e.details
+        for error in summary.get("writeErrors", []):
+            operation_results[error["index"]].update(status="failed", detail=error.get("errmsg"))
+
+        updated = [r for r in results if r["op"] == "update" and r["status"] == "updated"]
+        updated_docs = {}
+        # Only read back when some update missed or a listener needs the new documents
+        if updated and (summary.get("nMatched", 0) < len(updated) or self.document_listeners):
+            docs = await self.collection.find(
+                self.scoped({"id": {"$in": [r["id"] for r in updated]}}), self.projection
+            ).to_list(None)
+            updated_docs = {doc["id"]: self.model(**doc) for doc in docs}
+            for result in updated:
+                if result["id"] not in updated_docs:
+                    result["status"] = "not_found"
+
+        if self.listeners:
+            created = {obj.id: obj for obj in creates}
+            notifications = []
+            for result in results:
+                if result["status"] == "created":
+                    notifications.append(self.notify("insert", result["id"], created[result["id"]]))
+                elif result["status"] == "updated":
+                    notifications.append(self.notify("update", result["id"], updated_docs.get(result["id"])))
+                elif result["status"] == "deleted":
+                    notifications.append(self.notify("delete", result["id"]))
+            # Run concurrently so coalescing listeners can fold the whole batch together
+            await asyncio.gather(*notifications)
+        return results
+
+
+def update_fields(update_model) -> Dict[str, Any]:
+    """Return the fields set on an update model, ready to store"""
+    return {k: v for k, v in model_to_dict(update_model).items() if v is not None}
+
+
+# Status check ingest buffer settings
+STATUS_BATCH_SIZE = int(os.environ.get('STATUS_BATCH_SIZE', '500'))
+STATUS_FLUSH_INTERVAL = float(os.environ.get('STATUS_FLUSH_INTERVAL', '0.5'))
+STATUS_MAX_PENDING = int(os.environ.get('STATUS_MAX_PENDING', '10000'))
+STATUS_WRITE_MAX_ATTEMPTS = int(os.environ.get('STATUS_WRITE_MAX_ATTEMPTS', '5'))
+STATUS_WRITE_RETRY_BASE = float(os.environ.get('STATUS_WRITE_RETRY_BASE', '0.5'))
+STATUS_WRITE_RETRY_MAX = float(os.environ.get('STATUS_WRITE_RETRY_MAX', '30'))
+STATUS_INGEST_MAX_ITEMS = 5000
+
+
+class WriteBuffer:
+    """Coalesces single-document writes into unordered insert_many batches.
+
+    A batch is flushed once it reaches batch_size documents or flush_interval
+    seconds after its first document arrived. At most max_pending documents are
+    held in memory; add() waits for the flusher to make room beyond that.
+
+    Documents were already acknowledged, so a failed insert is retried after
+    retry_base * 2**(attempts - 1) seconds (capped at retry_max), and after
+    max_attempts the documents still unwritten go to the dead-letter collection.
+    Duplicate key errors on a retry are documents an earlier attempt wrote.
+    """
+
+    def __init__(self, collection, batch_size: int, flush_interval: float, max_pending: int, on_write=None,
+                 dead_letter=None, max_attempts: int = 5, retry_base: float = 0.5, retry_max: float = 30):
+        self.collection = collection
+        self.dead_letter = dead_letter
+        self.on_write = on_write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._queue = None
+        self._task = None
+        self._stopping = False
+        self.written = 0
+        self.batches = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.failed = 0
+
+    def start(self):
+        if self._task is None:
+            # Created here so the queue belongs to the running event loop
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def add(self, document: Dict[str, Any]):
+        await self._queue.put(document)
+
+    async def stop(self):
+        """Flush everything still buffered and stop the flusher"""
+        if self._task is None:
+            return
+        # Batches still failing get one last attempt each instead of waiting out their backoff
+        self._stopping = True
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    document = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        document = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if document is None:
+                    closing = True
+                    break
+                batch.append(document)
+            try:
+                await self._write(batch)
+            except Exception:
+                # Never let one batch stop the flusher; add() would block forever
+                logger.exception(f"Buffered insert into {self.collection.name} failed unexpectedly")
+
+    async def _insert(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert batch, returning the documents still unwritten"""
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+            return []
+        except BulkWriteError as e:
+            unwritten = {error["index"] for error in e.details.get("writeErrors", []) if error.get("code") != 11000}
+            return [document for index, document in enumerate(batch) if index in unwritten]
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        self.batches += 1
+        pending, attempts = batch, 0
+        while True:
+            attempts += 1
+            try:
+                unwritten = await self._insert(pending)
+                error = "some documents were rejected"
+            except Exception as e:
+                unwritten, error = pending, str(e)
+            self.written += len(pending) - len(unwritten)
+            pending = unwritten
+            if not pending or attempts >= self.max_attempts or self._stopping:
+                break
+            delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+            self.retried += len(pending)
+            logger.warning(
+                f"Buffered insert into {self.collection.name} failed for {len(pending)} documents, "
+                f"retrying in {delay:g}s: {error}"
+            )
+            await asyncio.sleep(delay)
+        if pending:
+            await self._dead_letter(pending, attempts, error)
+        unwritten = {id(document) for document in pending}
+        written = [document for document in batch if id(document) not in unwritten]
+        if written and self.on_write:
+            try:
+                self.on_write(self.collection.name, written)
+            except Exception:
+                logger.exception(f"on_write listener for {self.collection.name} failed")
+
+    async def _dead_letter(self, documents: List[Dict[str, Any]], attempts: int, error: str):
+        if self.dead_letter is not None:
+            failed_at = datetime.utcnow()
+            try:
+                await self.dead_letter.insert_many([
+                    {"collection": self.collection.name, "document": document, "attempts": attempts,
+                     "last_error": error, "failed_at": failed_at}
+                    for document in documents
+                ], ordered=False)
+                self.dead_lettered += len(documents)
+                logger.error(f"Dead-lettered {len(documents)} documents for {self.collection.name}: {error}")
+                return
+            except PyMongoError as e:
+                error = f"{error}; dead-lettering failed too: {e}"
+        self.failed += len(documents)
+        logger.error(f"Buffered insert into {self.collection.name} lost {len(documents)} documents: {error}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._queue.qsize() if self._queue else 0,
+            "written": self.written,
+            "batches": self.batches,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "failed": self.failed,
+        }
+
+
+# Background job settings
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_BATCH_SIZE = int(os.environ.get('JOB_BATCH_SIZE', '20'))
+JOB_BATCH_LINGER = float(os.environ.get('JOB_BATCH_LINGER', '1'))
+JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', '5'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '6'))
+JOB_RETRY_BASE = float(os.environ.get('JOB_RETRY_BASE', '5'))
+JOB_RETRY_MAX = float(os.environ.get('JOB_RETRY_MAX', '900'))
+JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', '300'))
+
+
+# Contact notification email settings; notifications are off unless SMTP_HOST and
+# CONTACT_NOTIFY_TO are set (e.g. SMTP_HOST=localhost SMTP_PORT=1025 for a local stand-in)
+SMTP_HOST = os.environ.get('SMTP_HOST', '')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', '25'))
+SMTP_USERNAME = os.environ.get('SMTP_USERNAME', '')
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD', '')
+SMTP_STARTTLS = os.environ.get('SMTP_STARTTLS', '0') == '1'
+SMTP_TIMEOUT = float(os.environ.get('SMTP_TIMEOUT', '10'))
+CONTACT_NOTIFY_FROM = os.environ.get('CONTACT_NOTIFY_FROM', 'noreply@ladypi89.com')
+CONTACT_NOTIFY_TO = os.environ.get('CONTACT_NOTIFY_TO', '')
+
+
+# Contact form abuse protection settings
+CONTACT_RATE_BURST = int(os.environ.get('CONTACT_RATE_BURST', '5'))
+CONTACT_RATE_PER_MINUTE = float(os.environ.get('CONTACT_RATE_PER_MINUTE', '1'))
+CONTACT_DEDUP_WINDOW = float(os.environ.get('CONTACT_DEDUP_WINDOW', '86400'))
+CONTACT_TRACKED_KEYS = int(os.environ.get('CONTACT_TRACKED_KEYS', '10000'))
+# Proxies (comma-separated IPs or CIDR ranges) trusted to report the client in X-Forwarded-For.
+# Empty by default, which is right only when clients connect directly; behind a reverse
+# proxy or load balancer, set it to the proxy's addresses or all clients share one limit
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(proxy.strip(), strict=False)
+    for proxy in os.environ.get('TRUSTED_PROXIES', '').split(',') if proxy.strip()
+]
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets, holding at most max_keys buckets in LRU order"""
+
+    def __init__(self, burst: int, rate_per_second: float, max_keys: int):
+        self.burst = burst
+        self.rate = rate_per_second
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self.allowed = 0
+        self.rejected = 0
+
+    def acquire(self, key: str) -> float:
+        """Take a token for key, returning 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        tokens, last = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+            self.allowed += 1
+        else:
+            wait = (1 - tokens) / self.rate if self.rate > 0 else float("inf")
+            self.rejected += 1
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class RecentHashes:
+    """Bounded LRU of content hashes seen within the last window seconds"""
+
+    def __init__(self, window: float, max_entries: int):
+        self.window = window
+        self.max_entries = max_entries
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self.duplicates = 0
+
+    def seen(self, content_hash: str) -> bool:
+        """Record content_hash and report whether it was already seen inside the window"""
+        now = time.monotonic()
+        seen_at = self._seen.pop(content_hash, None)
+        self._seen[content_hash] = now
+        if len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+        if seen_at is not None and now - seen_at < self.window:
+            self.duplicates += 1
+            return True
+        return False
+
+
+def contact_content_hash(name: str, email: str, message: str) -> str:
+    """Hash of the normalized submission and the dedup window it falls in.
+
+    The window bucket lets the unique index reject duplicates only within
+    CONTACT_DEDUP_WINDOW instead of forever.
+    """
+    bucket = int(time.time() // CONTACT_DEDUP_WINDOW) if CONTACT_DEDUP_WINDOW > 0 else 0
+    normalized = "\n".join([
+        name.strip().lower(), email.strip().lower(), " ".join(message.split()).lower(), str(bucket),
+    ])
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+
+def client_address(request: Request) -> str:
+    """The client's IP: the peer, or behind trusted proxies the nearest untrusted forwarded hop"""
+    address = request.client.host if request.client else "unknown"
+    hops = [
+        hop.strip() for header in request.headers.getlist("x-forwarded-for")
+        for hop in header.split(",") if hop.strip()
+    ]
+    while hops and is_trusted_proxy(address):
+        address = hops.pop()
+    if hops and not TRUSTED_PROXIES:
+        warn_untrusted_forwarding(address)
+    return address
+
+
+untrusted_forwarding_warned = False
+
+
+def warn_untrusted_forwarding(peer: str):
+    """Log once that X-Forwarded-For is being ignored because no proxy is trusted.
+
+    Behind a reverse proxy every client then shares the proxy's address, and with
+    it one contact form rate limit bucket.
+    """
+    global untrusted_forwarding_warned
+    if untrusted_forwarding_warned:
+        return
+    untrusted_forwarding_warned = True
+    logger.warning(
+        f"Ignoring X-Forwarded-For from {peer}: TRUSTED_PROXIES is empty, so clients are identified by "
+        f"their peer address. Set TRUSTED_PROXIES to the reverse proxy's IPs or CIDR ranges if this "
+        f"server runs behind one."
+    )
+
+
+contact_limiter = TokenBucketLimiter(CONTACT_RATE_BURST, CONTACT_RATE_PER_MINUTE / 60, CONTACT_TRACKED_KEYS)
+contact_hashes = RecentHashes(CONTACT_DEDUP_WINDOW, CONTACT_TRACKED_KEYS)
+
+class CollectionVersions:
+    """Per-collection (and per-tenant) write counters of this process.
+
+    They only say whether anything changed locally (or was reported by cache
+    coherence) since an ETag was computed; the tags themselves are body hashes, so
+    they match across workers and restarts.
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+
+    def bump(self, collection_name: str, tenant: Optional[str] = None):
+        key = tenant_key(collection_name, tenant)
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def bump_all(self, collection_name: str):
+        """Bump collection_name for every tenant, for changes whose tenant is unknown"""
+        self.bump(collection_name, "*")
+
+    def version(self, collection_name: str) -> int:
+        return self._versions.get(tenant_key(collection_name), 0) + self._versions.get(f"*:{collection_name}", 0)
+
+    def versions(self, collection_names) -> str:
+        return ".".join(str(self.version(name)) for name in collection_names)
+
+
+collection_versions = CollectionVersions()
+
+
+class BodyETags:
+    """Strong ETags hashed from response bodies, remembered per route and local versions.
+
+    A hash of the body tags the same data the same way in every worker and after a
+    restart. The tag is remembered against the collection versions taken before the
+    handler ran, so while those are unchanged a matching If-None-Match gets its 304
+    without running the handler or querying Mongo.
+    """
+
+    def __init__(self, tracked_keys: int):
+        self.tracked_keys = tracked_keys
+        self._tags: OrderedDict = OrderedDict()
+
+    @staticmethod
+    def tag(body: bytes) -> str:
+        return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def get(self, key: str, versions: str) -> Optional[str]:
+        entry = self._tags.get(key)
+        if entry is None or entry[0] != versions:
+            return None
+        self._tags.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, versions: str, etag: str):
+        self._tags[key] = (versions, etag)
+        self._tags.move_to_end(key)
+        if len(self._tags) > self.tracked_keys:
+            self._tags.popitem(last=False)
+
+
+# Conditional GET: remember tags for this many route + query keys
+ETAG_TRACKED_KEYS = int(os.environ.get('ETAG_TRACKED_KEYS', '1000'))
+body_etags = BodyETags(ETAG_TRACKED_KEYS)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag, per RFC 9110"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -44,6 +1400,10 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+class StatusCheckPage(BaseModel):
+    items: List[StatusCheck]
+    next_cursor: Optional[str] = None
+
 # Biography Models
 class Biography(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -83,6 +1443,14 @@ class PartnershipUpdate(BaseModel):
     handle: Optional[str] = None
     url: Optional[HttpUrl] = None
 
+class PartnershipBulkUpdate(PartnershipUpdate):
+    id: str
+
+class PartnershipBulk(BaseModel):
+    create: List[PartnershipCreate] = []
+    update: List[PartnershipBulkUpdate] = []
+    delete: List[str] = []
+
 # Social Media Models
 class SocialMedia(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -104,6 +1472,24 @@ class SocialMediaUpdate(BaseModel):
     icon: Optional[str] = None
     color: Optional[str] = None
 
+class SocialMediaBulkUpdate(SocialMediaUpdate):
+    id: str
+
+class SocialMediaBulk(BaseModel):
+    create: List[SocialMediaCreate] = []
+    update: List[SocialMediaBulkUpdate] = []
+    delete: List[str] = []
+
+# Bulk Operation Models
+class BulkItemResult(BaseModel):
+    op: str  # create, update, delete
+    id: str
+    status: str  # created, updated, deleted, not_found, failed
+    detail: Optional[str] = None
+
+class BulkResult(BaseModel):
+    results: List[BulkItemResult]
+
 # Contact Form Models
 class ContactForm(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -118,6 +1504,10 @@ class ContactFormCreate(BaseModel):
     email: EmailStr
     message: str
 
+class ContactFormPage(BaseModel):
+    items: List[ContactForm]
+    next_cursor: Optional[str] = None
+
 # Streaming Status Model
 class StreamingStatus(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -126,6 +1516,837 @@ class StreamingStatus(BaseModel):
     status: str  # online, offline, streaming
     game: str
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    last_checked: Optional[datetime] = None
+
+# Tenant Models
+TENANT_ID_PATTERN = r"^[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?$"
+
+class Tenant(BaseModel):
+    id: str
+    name: str
+    hosts: List[str] = []
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class TenantCreate(BaseModel):
+    id: str = Field(pattern=TENANT_ID_PATTERN)
+    name: str
+    hosts: List[str] = []
+    # Seed values for the new site
+    title: str = ""
+    twitch_url: Optional[HttpUrl] = None
+
+# Public Site Model
+class SiteProfile(BaseModel):
+    id: str = "site"
+    biography: Optional[Biography] = None
+    partnerships: List[Partnership] = []
+    social_media: List[SocialMedia] = []
+    streaming_status: Optional[StreamingStatus] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+# Repositories
+status_check_repo = Repository(db, "status_checks", StatusCheck)
+biography_repo = Repository(db, "biography", Biography, read_database=public_db)
+partnership_repo = Repository(db, "partnerships", Partnership, read_database=public_db)
+social_media_repo = Repository(db, "social_media", SocialMedia, read_database=public_db)
+contact_repo = Repository(db, "contact_forms", ContactForm)
+job_queue = JobQueue(
+    db.jobs, db.jobs_dead_letter, JOB_WORKERS, JOB_BATCH_SIZE, JOB_BATCH_LINGER, JOB_POLL_INTERVAL,
+    JOB_MAX_ATTEMPTS, JOB_RETRY_BASE, JOB_RETRY_MAX, JOB_LEASE_SECONDS,
+)
+contact_notifier = SMTPNotifier(SMTP_HOST, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD, SMTP_STARTTLS, SMTP_TIMEOUT)
+streaming_status_repo = Repository(db, "streaming_status", StreamingStatus, read_database=public_db)
+
+
+# How long a host or tenant id that matched no tenant is remembered as unknown
+TENANT_MISS_TTL = float(os.environ.get('TENANT_MISS_TTL', '60'))
+TENANT_TRACKED_MISSES = 10000
+
+
+class TenantRegistry:
+    """Known tenants, held in memory and looked up in the tenants collection on a miss.
+
+    Misses are remembered for miss_ttl seconds, so requests for unknown hosts don't
+    each cost a query, while tenants registered by another worker still show up.
+    """
+
+    def __init__(self, collection, base_domain: str, miss_ttl: float):
+        self.collection = collection
+        self.base_domain = base_domain
+        self.miss_ttl = miss_ttl
+        self._tenants: Dict[str, Tenant] = {}
+        self._hosts: Dict[str, str] = {}
+        self._misses: Dict[str, float] = {}
+
+    def remember(self, tenant: Tenant):
+        self._tenants[tenant.id] = tenant
+        for host in tenant.hosts:
+            self._hosts[host] = tenant.id
+
+    async def load(self):
+        for doc in await self.collection.find({}, {"_id": 0}).to_list(None):
+            self.remember(Tenant(**doc))
+
+    def _missed(self, key: str) -> bool:
+        expires = self._misses.get(key)
+        if expires is None:
+            return False
+        if expires > time.monotonic():
+            return True
+        del self._misses[key]
+        return False
+
+    def _miss(self, key: str):
+        if len(self._misses) > TENANT_TRACKED_MISSES:
+            self._misses.clear()
+        self._misses[key] = time.monotonic() + self.miss_ttl
+
+    async def _lookup(self, key: str, query: Dict[str, Any]) -> Optional[Tenant]:
+        if self._missed(key):
+            return None
+        doc = await self.collection.find_one(query, {"_id": 0})
+        if not doc:
+            self._miss(key)
+            return None
+        tenant = Tenant(**doc)
+        self.remember(tenant)
+        return tenant
+
+    async def get(self, tenant_id: str) -> Optional[Tenant]:
+        tenant = self._tenants.get(tenant_id)
+        if tenant is None and re.match(TENANT_ID_PATTERN, tenant_id):
+            tenant = await self._lookup(f"id:{tenant_id}", {"id": tenant_id})
+        return tenant
+
+    async def id_for_host(self, host: str) -> Optional[str]:
+        """The tenant id for a Host header: a registered host, else a subdomain of base_domain"""
+        host = host.rsplit(":", 1)[0].lower()
+        if host in self._hosts:
+            return self._hosts[host]
+        if self.base_domain and host.endswith("." + self.base_domain):
+            return host[:-len(self.base_domain) - 1].rsplit(".", 1)[-1]
+        tenant = await self._lookup(f"host:{host}", {"hosts": host})
+        return tenant.id if tenant else None
+
+    async def create(self, tenant: Tenant):
+        await self.collection.insert_one(model_to_dict(tenant))
+        self._misses.pop(f"id:{tenant.id}", None)
+        for host in tenant.hosts:
+            self._misses.pop(f"host:{host}", None)
+        self.remember(tenant)
+
+    def all(self) -> List[Tenant]:
+        return list(self._tenants.values())
+
+
+tenant_registry = TenantRegistry(db.tenants, TENANT_BASE_DOMAIN, TENANT_MISS_TTL)
+
+
+def bump_batch_versions(collection_name: str, batch: List[Dict[str, Any]]):
+    """Bump the collection's version for every tenant with documents in a flushed batch"""
+    for tenant in {doc.get("tenant") for doc in batch}:
+        collection_versions.bump(collection_name, tenant)
+
+
+status_check_buffer = WriteBuffer(
+    status_check_repo.collection, STATUS_BATCH_SIZE, STATUS_FLUSH_INTERVAL, STATUS_MAX_PENDING,
+    on_write=bump_batch_versions, dead_letter=db.status_checks_dead_letter,
+    max_attempts=STATUS_WRITE_MAX_ATTEMPTS, retry_base=STATUS_WRITE_RETRY_BASE, retry_max=STATUS_WRITE_RETRY_MAX,
+)
+
+# Every write bumps its collection's version, invalidating ETags handed out before it
+for repo in (status_check_repo, biography_repo, partnership_repo, social_media_repo, contact_repo, streaming_status_repo):
+    repo.add_listener(
+        lambda repo, operation, doc_id, document: collection_versions.bump(repo.name), documents=False
+    )
+
+# Cached singletons are dropped whenever their repository writes
+biography_repo.add_listener(lambda repo, operation, doc_id, document: singleton_cache.put("biography", document))
+streaming_status_repo.add_listener(lambda repo, operation, doc_id, document: singleton_cache.put("streaming_status", document))
+
+
+class SiteProfileBuilder:
+    """Keeps the denormalized site_profile document in step with its source collections.
+
+    Concurrent refresh requests are coalesced per tenant: a caller whose change was
+    already covered by a build that started after it asked returns without rebuilding.
+    """
+
+    def __init__(self, database, read_database):
+        self.collection = database.site_profile
+        self.public_collection = read_database.site_profile
+        # tenant -> [lock, refreshes requested, refreshes covered by a finished build]
+        self._state: Dict[Optional[str], list] = {}
+
+    @staticmethod
+    def query() -> Dict[str, Any]:
+        # Backends other than Mongo keep ids unique across tenants, so the id carries the tenant too
+        tenant = current_tenant.get()
+        return {"id": tenant_key("site"), "tenant": tenant} if tenant else {"id": "site"}
+
+    async def build(self) -> SiteProfile:
+        biography, partnerships, social_media, streaming_status = await asyncio.gather(
+            biography_repo.find_one(),
+            partnership_repo.find_all(),
+            social_media_repo.find_all(),
+            streaming_status_repo.find_one(),
+        )
+        query = self.query()
+        profile = SiteProfile(
+            id=query["id"],
+            biography=biography,
+            partnerships=partnerships,
+            social_media=social_media,
+            streaming_status=StreamingStatusWriter.without_heartbeat(streaming_status),
+        )
+        await self.collection.replace_one(query, {**model_to_dict(profile), **query}, upsert=True)
+        singleton_cache.put("site", profile)
+        # /api/site's ETag is remembered against this version alone, so it only moves
+        # once the new profile is what GETs serve
+        collection_versions.bump("site_profile")
+        await cache_coherence.mark("site_profile")
+        return profile
+
+    async def refresh(self):
+        state = self._state.setdefault(current_tenant.get(), [asyncio.Lock(), 0, 0])
+        state[1] += 1
+        generation = state[1]
+        async with state[0]:
+            if state[2] >= generation:
+                return
+            target = state[1]
+            await self.build()
+            state[2] = target
+
+    async def load(self) -> SiteProfile:
+        doc = await self.public_collection.find_one(self.query(), {"_id": 0, "tenant": 0})
+        if not doc:
+            return await self.build()
+        return SiteProfile(**doc)
+
+
+site_profile_builder = SiteProfileBuilder(db, public_db)
+
+for repo in (biography_repo, partnership_repo, social_media_repo, streaming_status_repo):
+    repo.add_listener(
+        lambda repo, operation, doc_id, document: site_profile_builder.refresh(), documents=False
+    )
+
+# Push every streaming status change to SSE/WebSocket subscribers, serialized once
+streaming_status_repo.add_listener(
+    lambda repo, operation, doc_id, document: document and streaming_status_broadcaster.publish(
+        StreamingStatusWriter.without_heartbeat(document).json()
+    )
+)
+
+
+def header_value(text: str) -> str:
+    """Submitted text made safe for an email header, which can't contain line breaks"""
+    return " ".join(text.split())
+
+
+async def send_contact_notifications(payloads: List[Dict[str, Any]]):
+    """Email one digest covering a batch of new contact form submissions"""
+    message = EmailMessage()
+    message["From"] = CONTACT_NOTIFY_FROM
+    message["To"] = CONTACT_NOTIFY_TO
+    if len(payloads) == 1:
+        message["Subject"] = f"New contact form submission from {header_value(payloads[0]['name'])}"
+        message["Reply-To"] = header_value(payloads[0]["email"])
+    else:
+        message["Subject"] = f"{len(payloads)} new contact form submissions"
+    message.set_content("\n\n".join(
+        (f"Site: {payload['tenant']}\n" if payload.get("tenant") else "")
+        + f"From: {payload['name']} <{payload['email']}>\nReceived: {payload['created_at']}\n\n{payload['message']}"
+        for payload in payloads
+    ))
+    await contact_notifier.send([message])
+
+
+async def enqueue_contact_notification(repo, operation, doc_id, document):
+    if operation != "insert":
+        return
+    # The submission is already stored; a lost notification must not fail the request
+    try:
+        await job_queue.enqueue("contact_notification", {
+            "contact_id": document.id,
+            "name": document.name,
+            "email": document.email,
+            "message": document.message,
+            "created_at": document.created_at,
+            "tenant": current_tenant.get(),
+        })
+    except PyMongoError as e:
+        logger.error(f"Failed to queue notification for contact form {document.id}: {e}")
+
+
+if SMTP_HOST and CONTACT_NOTIFY_TO:
+    job_queue.register("contact_notification", send_contact_notifications)
+    contact_repo.add_listener(enqueue_contact_notification)
+
+def is_heartbeat(cached: Optional[StreamingStatus], streaming_status: StreamingStatus) -> bool:
+    """Whether streaming_status differs from the cached one in last_checked alone"""
+    if cached is None:
+        return False
+    return {**model_to_dict(cached), "last_checked": None} == {**model_to_dict(streaming_status), "last_checked": None}
+
+
+class CacheCoherence:
+    """Keeps this worker's cached state in step with writes made by other workers.
+
+    A change stream on the cached collections refreshes the singleton cache from each
+    change's full document, bumps ETag versions and forwards streaming status changes
+    to local subscribers. Where change streams are unavailable (standalone servers,
+    SQLite) writers stamp a random token per collection into a version document
+    instead, and every worker polls it for tokens it didn't write itself. In
+    multi-tenant mode both are tracked per tenant. If either fails unexpectedly it is
+    restarted with backoff, and the worker reports itself degraded in the meantime.
+    """
+
+    # collection -> (singleton cache key, model) for collections cached as one document
+    CACHED = {
+        "biography": ("biography", Biography),
+        "streaming_status": ("streaming_status", StreamingStatus),
+        "site_profile": ("site", SiteProfile),
+    }
+
+    def __init__(self, database, collection_names, mode: str, poll_interval: float):
+        self.database = database
+        self.versions = database.cache_versions
+        self.collection_names = list(collection_names)
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.strategy = None
+        self.remote_changes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._seen: Dict[str, str] = {}
+        self._task = None
+
+    async def mark(self, collection_name: str):
+        """Record a local write for pollers in other workers"""
+        if self.mode == "off":
+            return
+        field = tenant_key(collection_name)
+        token = uuid.uuid4().hex
+        self._seen[field] = token
+        try:
+            await self.versions.find_one_and_update(
+                {"id": "versions"}, {"$set": {field: token}}, upsert=True
+            )
+        except PyMongoError as e:
+            logger.warning(f"Failed to record cache version for {collection_name}: {e}")
+
+    def apply(self, collection_name: str, document: Optional[Dict[str, Any]], tenant: Optional[str] = None):
+        """Bring tenant's local state for collection_name up to date with its current document"""
+        self.remote_changes += 1
+        if MULTI_TENANT and tenant is None:
+            # A delete, whose tenant a change stream doesn't report
+            collection_versions.bump_all(collection_name)
+            return
+        token = current_tenant.set(tenant)
+        try:
+            self._apply(collection_name, document)
+        finally:
+            current_tenant.reset(token)
+
+    def _apply(self, collection_name: str, document: Optional[Dict[str, Any]]):
+        if collection_name not in self.CACHED:
+            collection_versions.bump(collection_name)
+            return
+        key, model = self.CACHED[collection_name]
+        if document is None:
+            collection_versions.bump(collection_name)
+            singleton_cache.invalidate(key)
+            return
+        document.pop("_id", None)
+        document.pop("tenant", None)
+        try:
+            obj = model(**document)
+        except ValidationError as e:
+            # e.g. a hand-edited document; let reads load (and report) it themselves
+            logger.warning(f"Ignoring invalid {collection_name} document from another worker: {e}")
+            collection_versions.bump(collection_name)
+            singleton_cache.invalidate(key)
+            return
+        if collection_name == "streaming_status" and is_heartbeat(singleton_cache.peek(key), obj):
+            # Another worker persisting last_checked; not worth new ETags or pushes
+            return
+        collection_versions.bump(collection_name)
+        singleton_cache.put(key, obj)
+        if collection_name == "streaming_status":
+            message = StreamingStatusWriter.without_heartbeat(obj).json()
+            if message != streaming_status_broadcaster.last_message:
+                streaming_status_broadcaster.publish(message)
+
+    async def reload(self, collection_name: str, tenant: Optional[str] = None):
+        document = None
+        if collection_name in self.CACHED:
+            document = await self.database[collection_name].find_one({"tenant": tenant} if tenant else {})
+        self.apply(collection_name, document, tenant)
+
+    async def resync(self):
+        """Refresh everything after a gap in which changes may have been missed"""
+        if not MULTI_TENANT:
+            for collection_name in self.collection_names:
+                await self.reload(collection_name)
+            return
+        for collection_name in self.collection_names:
+            collection_versions.bump_all(collection_name)
+        singleton_cache.clear()
+
+    def start(self):
+        if self.mode != "off":
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self):
+        delay = self.poll_interval
+        while True:
+            started = time.monotonic()
+            try:
+                if self.failures:
+                    # Changes made while degraded were missed
+                    await self.resync()
+                if self.mode == "auto" and await self.watch():
+                    return
+                self.strategy = "polling"
+                await self.poll()
+            except Exception as e:
+                self.strategy = "degraded"
+                self.failures += 1
+                self.last_error = repr(e)
+                if time.monotonic() - started > CACHE_COHERENCE_MAX_BACKOFF:
+                    delay = self.poll_interval
+                logger.exception(f"Cache coherence failed, restarting in {delay:g}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, CACHE_COHERENCE_MAX_BACKOFF)
+
+    async def watch(self) -> bool:
+        """Follow the change stream; returns False if change streams are unavailable"""
+        if STORAGE_BACKEND != "mongo":
+            return False
+        pipeline = [{"$match": {"ns.coll": {"$in": self.collection_names}}}]
+        resume_token = None
+        while True:
+            try:
+                async with self.database.watch(
+                    pipeline, full_document="updateLookup", resume_after=resume_token
+                ) as stream:
+                    if self.strategy != "change_stream":
+                        logger.info("Cache coherence following the change stream")
+                    elif resume_token is None:
+                        # Changes made while disconnected are lost; reload everything
+                        await self.resync()
+                    self.strategy = "change_stream"
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        document = change.get("fullDocument")
+                        self.apply(change["ns"]["coll"], document, document and document.get("tenant"))
+            except OperationFailure as e:
+                if self.strategy != "change_stream":
+                    logger.info(f"Change streams unavailable ({e}), polling cache versions instead")
+                    return False
+                logger.warning(f"Cache change stream failed, restarting: {e}")
+                resume_token = None
+            except PyMongoError as e:
+                logger.warning(f"Cache change stream interrupted, resuming: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def poll(self):
+        first = True
+        while True:
+            try:
+                versions = await self.versions.find_one({"id": "versions"}, {"_id": 0, "id": 0}) or {}
+                for field, token in versions.items():
+                    tenant, _, collection_name = field.rpartition(":")
+                    if collection_name not in self.collection_names or token == self._seen.get(field):
+                        continue
+                    self._seen[field] = token
+                    if not first:
+                        await self.reload(collection_name, tenant or None)
+                first = False
+            except PyMongoError as e:
+                logger.warning(f"Failed to poll cache versions: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "strategy": self.strategy,
+            "remote_changes": self.remote_changes,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+cache_coherence = CacheCoherence(
+    db, ["biography", "partnerships", "social_media", "streaming_status", "site_profile"],
+    CACHE_COHERENCE, CACHE_POLL_INTERVAL,
+)
+
+for repo in (biography_repo, partnership_repo, social_media_repo, streaming_status_repo):
+    repo.add_listener(
+        lambda repo, operation, doc_id, document: cache_coherence.mark(repo.name), documents=False
+    )
+
+# Streaming status writes: minimum seconds between two changes, and how often the
+# in-memory last_checked heartbeat is written back
+STREAMING_STATUS_DEBOUNCE = float(os.environ.get('STREAMING_STATUS_DEBOUNCE', '10'))
+STREAMING_STATUS_HEARTBEAT_INTERVAL = float(os.environ.get('STREAMING_STATUS_HEARTBEAT_INTERVAL', '60'))
+
+
+class StreamingStatusWriter:
+    """Turns frequent status reports into change-only, debounced writes.
+
+    A report that matches the stored status and game writes nothing. A change within
+    the debounce window of the previous write is held back, and only the latest held
+    value is written when the window closes, so a flapping bot costs at most one write
+    per window. The time of the last report is kept in memory as last_checked and
+    persisted in the background without touching updated_at or notifying listeners.
+    It is left out of the ETag-tagged GETs, so an unchanged report changes no tags;
+    GET /api/streaming-status/heartbeat serves it instead. All of this state is kept
+    per tenant.
+    """
+
+    class State:
+        def __init__(self):
+            self.last_checked: Optional[datetime] = None
+            self.persisted_checked: Optional[datetime] = None
+            self.last_write = float("-inf")
+            self.pending: Optional[tuple] = None
+            self.flush_task = None
+
+    def __init__(self, repo: Repository, debounce: float, heartbeat_interval: float):
+        self.repo = repo
+        self.debounce = debounce
+        self.heartbeat_interval = heartbeat_interval
+        self._states: Dict[Optional[str], "StreamingStatusWriter.State"] = {}
+        self._heartbeat_task = None
+        self.reports = 0
+        self.writes = 0
+        self.unchanged = 0
+        self.debounced = 0
+
+    def state(self) -> "StreamingStatusWriter.State":
+        tenant = current_tenant.get()
+        if tenant not in self._states:
+            self._states[tenant] = self.State()
+        return self._states[tenant]
+
+    async def report(self, status: str, game: str) -> Optional[StreamingStatus]:
+        """Record a status report, returning the stored status (None if there is none)"""
+        state = self.state()
+        self.reports += 1
+        state.last_checked = datetime.utcnow()
+        wait = state.last_write + self.debounce - time.monotonic()
+        if wait > 0:
+            self.debounced += 1
+            state.pending = (status, game)
+            if state.flush_task is None:
+                state.flush_task = asyncio.create_task(self._flush_after(wait))
+            return await self.current()
+        state.pending = None
+        return await self.write(status, game)
+
+    async def write(self, status: str, game: str) -> Optional[StreamingStatus]:
+        changed = await self.repo.update(
+            {"$or": [{"status": {"$ne": status}}, {"game": {"$ne": game}}]},
+            {"status": status, "game": game, "updated_at": datetime.utcnow()},
+        )
+        if changed:
+            self.writes += 1
+            self.state().last_write = time.monotonic()
+            return changed
+        self.unchanged += 1
+        return await self.current()
+
+    async def current(self) -> Optional[StreamingStatus]:
+        return await singleton_cache.get("streaming_status", self.repo.find_one)
+
+    async def _flush_after(self, wait: float):
+        await asyncio.sleep(wait)
+        await self.flush()
+
+    async def flush(self):
+        state = self.state()
+        state.flush_task = None
+        pending, state.pending = state.pending, None
+        if pending:
+            try:
+                await self.write(*pending)
+            except PyMongoError as e:
+                logger.error(f"Failed to write debounced streaming status: {e}")
+
+    @staticmethod
+    def without_heartbeat(streaming_status: Optional[StreamingStatus]) -> Optional[StreamingStatus]:
+        """streaming_status as the tagged GETs serve it, without last_checked"""
+        if streaming_status is None or streaming_status.last_checked is None:
+            return streaming_status
+        return streaming_status.copy(update={"last_checked": None})
+
+    def overlay(self, streaming_status: StreamingStatus) -> StreamingStatus:
+        """The stored status with this worker's most recent last_checked"""
+        last_checked = self.state().last_checked
+        if last_checked is None or (
+            streaming_status.last_checked and streaming_status.last_checked >= last_checked
+        ):
+            return streaming_status
+        return streaming_status.copy(update={"last_checked": last_checked})
+
+    async def persist_heartbeat(self):
+        state = self.state()
+        checked = state.last_checked
+        if checked is None or checked == state.persisted_checked:
+            return
+        # Straight to the collection: a heartbeat is not a change listeners care about
+        await self.repo.collection.find_one_and_update(self.repo.scoped({}), {"$set": {"last_checked": checked}})
+        state.persisted_checked = checked
+
+    async def for_each_tenant(self, func):
+        for tenant in list(self._states):
+            token = current_tenant.set(tenant)
+            try:
+                await func()
+            finally:
+                current_tenant.reset(token)
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.for_each_tenant(self.persist_heartbeat)
+            except PyMongoError as e:
+                logger.warning(f"Failed to persist streaming status heartbeat: {e}")
+
+    def start(self):
+        self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def stop(self):
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+        for state in self._states.values():
+            if state.flush_task:
+                state.flush_task.cancel()
+        await self.for_each_tenant(self.flush)
+        try:
+            await self.for_each_tenant(self.persist_heartbeat)
+        except PyMongoError as e:
+            logger.warning(f"Failed to persist streaming status heartbeat: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state()
+        return {
+            "reports": self.reports,
+            "writes": self.writes,
+            "unchanged": self.unchanged,
+            "debounced": self.debounced,
+            "pending": state.pending is not None,
+            "last_checked": state.last_checked,
+        }
+
+
+streaming_status_writer = StreamingStatusWriter(
+    streaming_status_repo, STREAMING_STATUS_DEBOUNCE, STREAMING_STATUS_HEARTBEAT_INTERVAL
+)
+
+# Change feed: how long tombstones are kept, how often the log is compacted (and how
+# many entries each compaction step handles), and how old an entry must be before it
+# is served (so entries whose sequence number was taken but whose insert hasn't landed
+# yet are never skipped)
+CHANGE_LOG_RETENTION = float(os.environ.get('CHANGE_LOG_RETENTION', str(7 * 86400)))
+CHANGE_LOG_COMPACT_INTERVAL = float(os.environ.get('CHANGE_LOG_COMPACT_INTERVAL', '300'))
+CHANGE_LOG_COMPACT_BATCH = int(os.environ.get('CHANGE_LOG_COMPACT_BATCH', '500'))
+CHANGE_FEED_SETTLE = float(os.environ.get('CHANGE_FEED_SETTLE', '1'))
+CHANGE_FEED_MAX_ITEMS = 1000
+
+
+change_log = ChangeLog(
+    db, CHANGE_LOG_RETENTION, CHANGE_LOG_COMPACT_INTERVAL, CHANGE_LOG_COMPACT_BATCH, CHANGE_FEED_SETTLE
+)
+
+
+async def log_change(repo, operation: str, doc_id: str, document=None):
+    """Repository listener recording one write in the change log"""
+    await change_log.append(
+        repo.name, operation, doc_id, document and model_to_dict(document), current_tenant.get()
+    )
+
+
+for repo in (partnership_repo, social_media_repo, contact_repo):
+    repo.add_listener(log_change)
+
+# Static snapshots of the public data, written for nginx or a CDN to serve directly.
+# Disabled unless SNAPSHOT_DIR is set
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', '')
+SNAPSHOT_DEBOUNCE = float(os.environ.get('SNAPSHOT_DEBOUNCE', '1'))
+SNAPSHOT_KEEP_VERSIONS = int(os.environ.get('SNAPSHOT_KEEP_VERSIONS', '5'))
+
+
+async def load_snapshot_documents(tenant: Optional[str]) -> Dict[str, Any]:
+    """Public documents of one site, keyed by snapshot file name"""
+    token = current_tenant.set(tenant)
+    try:
+        biography, partnerships, social_media, streaming_status = await asyncio.gather(
+            biography_repo.find_one(),
+            partnership_repo.find_all(raw=True),
+            social_media_repo.find_all(raw=True),
+            streaming_status_repo.find_one(),
+        )
+    finally:
+        current_tenant.reset(token)
+    biography = biography and model_to_dict(biography)
+    streaming_status = streaming_status and model_to_dict(streaming_status)
+    return {
+        "biography": biography,
+        "partnerships": partnerships,
+        "social-media": social_media,
+        "streaming-status": streaming_status,
+        "site": {
+            "biography": biography,
+            "partnerships": partnerships,
+            "social_media": social_media,
+            "streaming_status": streaming_status,
+        },
+    }
+
+
+snapshot_publisher = SnapshotPublisher(
+    SNAPSHOT_DIR, SNAPSHOT_DEBOUNCE, SNAPSHOT_KEEP_VERSIONS, load_snapshot_documents, FastJSONResponse(None).render
+)
+
+for repo in (biography_repo, partnership_repo, social_media_repo, streaming_status_repo):
+    repo.add_listener(
+        lambda repo, operation, doc_id, document: snapshot_publisher.request(current_tenant.get()), documents=False
+    )
+
+# Default data seeded at startup: collection -> (model, natural key, documents).
+# A natural key of None marks a singleton collection.
+SEED_DATA = {
+    "biography": (Biography, None, [
+        {
+            "name": "LadyPi89",
+            "title": "Rocket League Streamer & Content Creator",
+            "bio": "Soy de España concretamente en las islas canarias aunque ahora vivo en Málaga",
+            "tagline": "Me podrás encontrar y jugar conmigo si hay hueco en las partidas",
+        },
+    ]),
+    "partnerships": (Partnership, "name", [
+        {"name": "Sin Frenos League", "role": "Embajadora", "logo": "💎", "handle": "@sinfrenosleague"},
+        {"name": "ClaveCD", "role": "Partner", "logo": "🕹️", "handle": "@Clavecd", "url": "https://www.clavecd.es/?partner-ladypi89"},
+    ]),
+    "social_media": (SocialMedia, "platform", [
+        {"platform": "Twitch", "url": "https://www.twitch.tv/ladypi89", "icon": "play", "color": "#9146ff"},
+        {"platform": "TikTok", "url": "https://www.tiktok.com/@ladypi89", "icon": "tiktok", "color": "#ff0050"},
+        {"platform": "Twitter", "url": "https://x.com/LadyPi89", "icon": "twitter", "color": "#1da1f2"},
+        {"platform": "YouTube", "url": "https://www.youtube.com/channel/UCDghFBnSUFW7aYc4YaYp2Dw", "icon": "youtube", "color": "#ff0000"},
+        {"platform": "Instagram", "url": "https://www.instagram.com/ladypi89_oficial/", "icon": "instagram", "color": "#e4405f"},
+        {"platform": "Discord", "url": "https://discord.com/invite/asQR5zVSgE", "icon": "discord", "color": "#7289da"},
+        {"platform": "ClaveCD", "url": "https://www.clavecd.es/?partner-ladypi89", "icon": "gamepad-2", "color": "#00d4ff"},
+    ]),
+    "streaming_status": (StreamingStatus, None, [
+        {"platform": "Twitch", "url": "https://www.twitch.tv/ladypi89", "status": "offline", "game": "Rocket League"},
+    ]),
+}
+
+SEED_NAMESPACE = uuid.UUID("5b0c3e0e-8f7a-4c55-9d0e-7a4f2b1c6d89")
+
+
+def seed_operations(collection_name: str, tenant: Optional[str] = None,
+                    seed_data=SEED_DATA) -> List[UpdateOne]:
+    """Build one upsert per default document, keyed on its natural key (and tenant)"""
+    model, natural_key, documents = seed_data[collection_name]
+    scope = {"tenant": tenant} if tenant else {}
+    operations = []
+    for data in documents:
+        key_value = data[natural_key] if natural_key else "singleton"
+        # Deterministic ids let the unique id index (built before seeding) reject
+        # duplicates from concurrent seeders
+        seed_name = f"{collection_name}:{key_value}"
+        seed_id = str(uuid.uuid5(SEED_NAMESPACE, f"{tenant}:{seed_name}" if tenant else seed_name))
+        document = model_to_dict(model(id=seed_id, **data))
+        query = {natural_key: key_value, **scope} if natural_key else scope
+        operations.append(UpdateOne(query, {"$setOnInsert": document}, upsert=True))
+    return operations
+
+
+async def seed_collection(database, collection_name: str, tenant: Optional[str] = None,
+                          seed_data=SEED_DATA) -> int:
+    """Insert missing default documents in one unordered bulk write, returning how many"""
+    # Collections that already hold data (singletons, or admin-curated lists) are left alone
+    if await database[collection_name].find_one({"tenant": tenant} if tenant else {}, {"_id": 1}) is not None:
+        return 0
+    operations = seed_operations(collection_name, tenant, seed_data)
+    try:
+        result = await database[collection_name].bulk_write(operations, ordered=False)
+        return result.upserted_count
+    except BulkWriteError as e:
+        # Another worker seeded the same documents first
+        return e.details.get("nUpserted", 0)
+
+
+async def seed_defaults(database, tenant: Optional[str] = None, seed_data=SEED_DATA) -> Dict[str, int]:
+    """Seed every collection in seed_data concurrently"""
+    names = list(seed_data)
+    counts = await asyncio.gather(*(seed_collection(database, name, tenant, seed_data) for name in names))
+    return dict(zip(names, counts))
+
+
+async def seed_site(tenant: Optional[str] = None, seed_data=SEED_DATA) -> Dict[str, int]:
+    """Seed one site's defaults and rebuild its profile if anything was added"""
+    token = current_tenant.set(tenant)
+    try:
+        counts = await seed_defaults(db, tenant, seed_data)
+        # Seeding writes bypass the repositories, so rebuild the site profile explicitly
+        if any(counts.values()):
+            for collection_name, count in counts.items():
+                if count:
+                    collection_versions.bump(collection_name)
+            await site_profile_builder.refresh()
+            snapshot_publisher.request(tenant)
+        return counts
+    finally:
+        current_tenant.reset(token)
+
+
+def tenant_seed_data(tenant: TenantCreate):
+    """Starting documents for a newly registered creator site"""
+    return {
+        "biography": (Biography, None, [
+            {"name": tenant.name, "title": tenant.title, "bio": "", "tagline": ""},
+        ]),
+        "streaming_status": (StreamingStatus, None, [
+            {
+                "platform": "Twitch",
+                "url": str(tenant.twitch_url or f"https://www.twitch.tv/{tenant.id}"),
+                "status": "offline",
+                "game": "",
+            },
+        ]),
+    }
+
+
+# Collections holding per-site documents; site_profile is left out as it is rebuilt on demand
+TENANT_COLLECTIONS = ["biography", "partnerships", "social_media", "streaming_status", "contact_forms", "status_checks"]
+
+
+async def adopt_untenanted(database, tenant: str) -> Dict[str, int]:
+    """Assign documents written before multi-tenant mode was enabled to tenant"""
+    counts = {}
+    for collection_name in TENANT_COLLECTIONS:
+        result = await database[collection_name].update_many(
+            {"tenant": {"$exists": False}}, {"$set": {"tenant": tenant}}
+        )
+        counts[collection_name] = result.modified_count
+    return counts
+
 
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
@@ -136,174 +2357,250 @@ async def root():
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    await status_check_buffer.add(status_check_repo.scoped(model_to_dict(status_obj)))
     return status_obj
 
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+@api_router.post("/status/batch")
+async def create_status_checks(request: Request):
+    """Ingest many status checks from a JSON array or NDJSON body"""
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if len(items) > STATUS_INGEST_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {STATUS_INGEST_MAX_ITEMS} items per batch")
+    try:
+        status_objs = [StatusCheck(**StatusCheckCreate(**item).dict()) for item in items]
+    except (ValidationError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    for status_obj in status_objs:
+        await status_check_buffer.add(status_check_repo.scoped(model_to_dict(status_obj)))
+    return {"accepted": len(status_objs)}
+
+@api_router.get("/status/buffer")
+async def get_status_buffer_stats():
+    """Get status check ingest buffer counters"""
+    return status_check_buffer.stats()
+
+@api_router.get("/status", response_model=StatusCheckPage)
+async def get_status_checks(limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None,
+                            fields: Optional[str] = None):
+    selected = parse_fields(StatusCheck, fields)
+    status_checks, next_cursor = await status_check_repo.find_page(
+        "timestamp", limit, cursor, raw=FAST_RESPONSES, fields=selected
+    )
+    if FAST_RESPONSES or selected:
+        return FastJSONResponse({"items": status_checks, "next_cursor": next_cursor})
+    return StatusCheckPage(items=status_checks, next_cursor=next_cursor)
 
 # Biography Endpoints
 @api_router.get("/biography", response_model=Biography)
-async def get_biography():
+async def get_biography(request: Request, fields: Optional[str] = None):
     """Get the streamer's biography"""
-    bio_data = await db.biography.find_one()
-    if not bio_data:
-        # Return default data if none exists
-        default_bio = Biography(
-            name="LadyPi89",
-            title="Rocket League Streamer & Content Creator",
-            bio="Soy de España concretamente en las islas canarias aunque ahora vivo en Málaga",
-            tagline="Me podrás encontrar y jugar conmigo si hay hueco en las partidas"
-        )
-        await db.biography.insert_one(model_to_dict(default_bio))
-        return default_bio
-    return Biography(**bio_data)
+    selected = parse_fields(Biography, fields)
+    return await single_flight.response(
+        request, ("biography",), lambda: singleton_cache.get("biography", load_biography), selected
+    )
+
+async def load_biography():
+    bio = await biography_repo.find_one(public=True)
+    if not bio:
+        raise HTTPException(status_code=404, detail="Biography not found")
+    return bio
 
 @api_router.put("/biography", response_model=Biography)
 async def update_biography(biography_update: BiographyUpdate):
     """Update the streamer's biography"""
-    bio_data = await db.biography.find_one()
-    if not bio_data:
-        raise HTTPException(status_code=404, detail="Biography not found")
-    
-    update_dict = {k: v for k, v in biography_update.dict().items() if v is not None}
+    update_dict = update_fields(biography_update)
     update_dict["updated_at"] = datetime.utcnow()
     
-    await db.biography.update_one(
-        {"id": bio_data["id"]}, 
-        {"$set": update_dict}
-    )
-    
-    updated_bio = await db.biography.find_one({"id": bio_data["id"]})
-    return Biography(**updated_bio)
+    updated_bio = await biography_repo.update({}, update_dict)
+    if not updated_bio:
+        raise HTTPException(status_code=404, detail="Biography not found")
+    return updated_bio
+
+# Bulk Endpoints
+MAX_BULK_ITEMS = 500
+
+async def run_bulk(repo: Repository, model, bulk) -> BulkResult:
+    if len(bulk.create) + len(bulk.update) + len(bulk.delete) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ITEMS} items per bulk request")
+    creates = [model(**item.dict()) for item in bulk.create]
+    updates = [(item.id, update_fields(item.copy(exclude={"id"}))) for item in bulk.update]
+    results = await repo.bulk_write(creates, updates, bulk.delete)
+    return BulkResult(results=results)
 
 # Partnership Endpoints
 @api_router.get("/partnerships", response_model=List[Partnership])
-async def get_partnerships():
+async def get_partnerships(fields: Optional[str] = None):
     """Get all partnerships"""
-    partnerships = await db.partnerships.find().to_list(1000)
-    if not partnerships:
-        # Return default partnerships if none exist
-        default_partnerships = [
-            Partnership(
-                name="Sin Frenos League",
-                role="Embajadora",
-                logo="💎",
-                handle="@sinfrenosleague"
-            ),
-            Partnership(
-                name="ClaveCD",
-                role="Partner",
-                logo="🕹️",
-                handle="@Clavecd",
-                url="https://www.clavecd.es/?partner-ladypi89"
-            )
-        ]
-        for partnership in default_partnerships:
-            await db.partnerships.insert_one(model_to_dict(partnership))
-        return default_partnerships
-    return [Partnership(**partnership) for partnership in partnerships]
+    selected = parse_fields(Partnership, fields)
+    if FAST_RESPONSES or selected:
+        return FastJSONResponse(await partnership_repo.find_all(raw=True, public=True, fields=selected))
+    return await partnership_repo.find_all(public=True)
 
 @api_router.post("/partnerships", response_model=Partnership)
 async def create_partnership(partnership: PartnershipCreate):
     """Create a new partnership"""
     new_partnership = Partnership(**partnership.dict())
-    await db.partnerships.insert_one(model_to_dict(new_partnership))
-    return new_partnership
+    return await partnership_repo.insert(new_partnership)
+
+@api_router.post("/partnerships/bulk", response_model=BulkResult)
+async def bulk_partnerships(bulk: PartnershipBulk):
+    """Create, update and delete partnerships in one database round trip"""
+    return await run_bulk(partnership_repo, Partnership, bulk)
 
 @api_router.put("/partnerships/{partnership_id}", response_model=Partnership)
 async def update_partnership(partnership_id: str, partnership_update: PartnershipUpdate):
     """Update a partnership"""
-    existing_partnership = await db.partnerships.find_one({"id": partnership_id})
-    if not existing_partnership:
-        raise HTTPException(status_code=404, detail="Partnership not found")
-    
-    update_dict = {k: v for k, v in partnership_update.dict().items() if v is not None}
-    
-    await db.partnerships.update_one(
-        {"id": partnership_id}, 
-        {"$set": update_dict}
+    updated_partnership = await partnership_repo.update(
+        {"id": partnership_id}, update_fields(partnership_update)
     )
-    
-    updated_partnership = await db.partnerships.find_one({"id": partnership_id})
-    return Partnership(**updated_partnership)
+    if not updated_partnership:
+        raise HTTPException(status_code=404, detail="Partnership not found")
+    return updated_partnership
 
 @api_router.delete("/partnerships/{partnership_id}")
 async def delete_partnership(partnership_id: str):
     """Delete a partnership"""
-    result = await db.partnerships.delete_one({"id": partnership_id})
-    if result.deleted_count == 0:
+    if not await partnership_repo.delete(partnership_id):
         raise HTTPException(status_code=404, detail="Partnership not found")
     return {"message": "Partnership deleted successfully"}
 
 # Social Media Endpoints
 @api_router.get("/social-media", response_model=List[SocialMedia])
-async def get_social_media():
+async def get_social_media(request: Request, fields: Optional[str] = None):
     """Get all social media links"""
-    social_media = await db.social_media.find().to_list(1000)
-    if not social_media:
-        # Return default social media if none exist
-        default_social_media = [
-            SocialMedia(platform="Twitch", url="https://www.twitch.tv/ladypi89", icon="play", color="#9146ff"),
-            SocialMedia(platform="TikTok", url="https://www.tiktok.com/@ladypi89", icon="tiktok", color="#ff0050"),
-            SocialMedia(platform="Twitter", url="https://x.com/LadyPi89", icon="twitter", color="#1da1f2"),
-            SocialMedia(platform="YouTube", url="https://www.youtube.com/channel/UCDghFBnSUFW7aYc4YaYp2Dw", icon="youtube", color="#ff0000"),
-            SocialMedia(platform="Instagram", url="https://www.instagram.com/ladypi89_oficial/", icon="instagram", color="#e4405f"),
-            SocialMedia(platform="Discord", url="https://discord.com/invite/asQR5zVSgE", icon="discord", color="#7289da"),
-            SocialMedia(platform="ClaveCD", url="https://www.clavecd.es/?partner-ladypi89", icon="gamepad-2", color="#00d4ff")
-        ]
-        for social in default_social_media:
-            await db.social_media.insert_one(model_to_dict(social))
-        return default_social_media
-    return [SocialMedia(**social) for social in social_media]
+    selected = parse_fields(SocialMedia, fields)
+    return await single_flight.response(
+        request, ("social_media",),
+        lambda: social_media_repo.find_all(raw=FAST_RESPONSES, public=True, fields=selected),
+    )
 
 @api_router.post("/social-media", response_model=SocialMedia)
 async def create_social_media(social_media: SocialMediaCreate):
     """Create a new social media link"""
     new_social_media = SocialMedia(**social_media.dict())
-    await db.social_media.insert_one(model_to_dict(new_social_media))
-    return new_social_media
+    return await social_media_repo.insert(new_social_media)
+
+@api_router.post("/social-media/bulk", response_model=BulkResult)
+async def bulk_social_media(bulk: SocialMediaBulk):
+    """Create, update and delete social media links in one database round trip"""
+    return await run_bulk(social_media_repo, SocialMedia, bulk)
 
 @api_router.put("/social-media/{social_media_id}", response_model=SocialMedia)
 async def update_social_media(social_media_id: str, social_media_update: SocialMediaUpdate):
     """Update a social media link"""
-    existing_social_media = await db.social_media.find_one({"id": social_media_id})
-    if not existing_social_media:
-        raise HTTPException(status_code=404, detail="Social media link not found")
-    
-    update_dict = {k: v for k, v in social_media_update.dict().items() if v is not None}
-    
-    await db.social_media.update_one(
-        {"id": social_media_id}, 
-        {"$set": update_dict}
+    updated_social_media = await social_media_repo.update(
+        {"id": social_media_id}, update_fields(social_media_update)
     )
-    
-    updated_social_media = await db.social_media.find_one({"id": social_media_id})
-    return SocialMedia(**updated_social_media)
+    if not updated_social_media:
+        raise HTTPException(status_code=404, detail="Social media link not found")
+    return updated_social_media
 
 @api_router.delete("/social-media/{social_media_id}")
 async def delete_social_media(social_media_id: str):
     """Delete a social media link"""
-    result = await db.social_media.delete_one({"id": social_media_id})
-    if result.deleted_count == 0:
+    if not await social_media_repo.delete(social_media_id):
         raise HTTPException(status_code=404, detail="Social media link not found")
     return {"message": "Social media link deleted successfully"}
 
 # Contact Form Endpoints
 @api_router.post("/contact", response_model=ContactForm)
-async def submit_contact_form(contact: ContactFormCreate):
+async def submit_contact_form(contact: ContactFormCreate, request: Request):
     """Submit a contact form"""
+    client_ip = client_address(request)
+    for key in (f"ip:{client_ip}", f"email:{contact.email.lower()}"):
+        wait = contact_limiter.acquire(key)
+        if wait:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many contact form submissions",
+                headers={"Retry-After": str(int(wait) + 1)},
+            )
+
+    content_hash = contact_content_hash(contact.name, contact.email, contact.message)
+    if contact_hashes.seen(content_hash):
+        raise HTTPException(status_code=409, detail="Duplicate contact form submission")
+
     new_contact = ContactForm(**contact.dict())
-    await db.contact_forms.insert_one(new_contact.dict())
-    return new_contact
+    try:
+        return await contact_repo.insert(new_contact, extra={"content_hash": content_hash})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Duplicate contact form submission")
+
+@api_router.get("/contact/stats")
+async def get_contact_protection_stats():
+    """Get rate limiter and duplicate suppression counters"""
+    return {
+        "allowed": contact_limiter.allowed,
+        "rate_limited": contact_limiter.rejected,
+        "duplicates": contact_hashes.duplicates,
+    }
+
+@api_router.get("/changes")
+async def get_changes(since: Optional[str] = None, limit: int = Query(500, ge=1, le=CHANGE_FEED_MAX_ITEMS)):
+    """Get upserts and tombstones of partnerships, social media and contact forms after a token.
+
+    Without since, returns the current token only: take it, download the full lists,
+    then poll with it. A 410 means the token predates the retention window.
+    """
+    if since is None:
+        return {"changes": [], "next_token": str(await change_log.head(current_tenant.get())), "has_more": False}
+    try:
+        since_seq = int(since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid change token")
+    if since_seq < await change_log.horizon():
+        raise HTTPException(status_code=410, detail="Change token expired; download the full lists again")
+
+    entries, has_more = await change_log.read(since_seq, limit, current_tenant.get())
+    changes = [
+        {
+            "token": str(entry["seq"]),
+            "collection": entry["collection"],
+            "op": entry["op"],
+            "id": entry["doc_id"],
+            "document": entry.get("document"),
+            "at": entry["at"],
+        }
+        for entry in entries
+    ]
+    next_token = changes[-1]["token"] if changes else str(since_seq)
+    return {"changes": changes, "next_token": next_token, "has_more": has_more}
 
-@api_router.get("/contact", response_model=List[ContactForm])
-async def get_contact_forms():
-    """Get all contact form submissions"""
-    contact_forms = await db.contact_forms.find().sort("created_at", -1).to_list(1000)
-    return [ContactForm(**contact) for contact in contact_forms]
+@api_router.get("/changes/stats")
+async def get_change_log_stats():
+    """Get append, batch, lost-entry and compaction counters for the change log"""
+    return change_log.stats()
+
+@api_router.get("/snapshots/stats")
+async def get_snapshot_stats():
+    """Get static snapshot export counters"""
+    return snapshot_publisher.stats()
+
+@api_router.get("/jobs/stats")
+async def get_job_stats():
+    """Get background job queue counters"""
+    return job_queue.stats()
+
+@api_router.get("/contact", response_model=ContactFormPage)
+async def get_contact_forms(limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None,
+                            fields: Optional[str] = None):
+    """Get contact form submissions, newest first, one page at a time"""
+    selected = parse_fields(ContactForm, fields)
+    contact_forms, next_cursor = await contact_repo.find_page(
+        "created_at", limit, cursor, raw=FAST_RESPONSES, fields=selected
+    )
+    if FAST_RESPONSES or selected:
+        return FastJSONResponse({"items": contact_forms, "next_cursor": next_cursor})
+    return ContactFormPage(items=contact_forms, next_cursor=next_cursor)
 
 @api_router.put("/contact/{contact_id}/status")
 async def update_contact_status(contact_id: str, status: str):
@@ -311,30 +2608,26 @@ async def update_contact_status(contact_id: str, status: str):
     if status not in ["new", "read", "responded"]:
         raise HTTPException(status_code=400, detail="Invalid status")
     
-    result = await db.contact_forms.update_one(
-        {"id": contact_id}, 
-        {"$set": {"status": status}}
-    )
-    if result.matched_count == 0:
+    if not await contact_repo.update({"id": contact_id}, {"status": status}):
         raise HTTPException(status_code=404, detail="Contact form not found")
     return {"message": "Contact status updated successfully"}
 
 # Streaming Status endpoint
 @api_router.get("/streaming-status", response_model=StreamingStatus)
-async def get_streaming_status():
+async def get_streaming_status(request: Request, fields: Optional[str] = None):
     """Get current streaming status"""
-    status_data = await db.streaming_status.find_one()
-    if not status_data:
-        # Return default streaming status if none exists
-        default_status = StreamingStatus(
-            platform="Twitch",
-            url="https://www.twitch.tv/ladypi89",
-            status="offline",
-            game="Rocket League"
-        )
-        await db.streaming_status.insert_one(model_to_dict(default_status))
-        return default_status
-    return StreamingStatus(**status_data)
+    selected = parse_fields(StreamingStatus, fields)
+    return await single_flight.response(request, ("streaming_status",), current_streaming_status, selected)
+
+async def current_streaming_status():
+    streaming_status = await singleton_cache.get("streaming_status", load_streaming_status)
+    return streaming_status_writer.without_heartbeat(streaming_status)
+
+async def load_streaming_status():
+    streaming_status = await streaming_status_repo.find_one(public=True)
+    if not streaming_status:
+        raise HTTPException(status_code=404, detail="Streaming status not found")
+    return streaming_status
 
 @api_router.put("/streaming-status", response_model=StreamingStatus)
 async def update_streaming_status(status: str, game: str = "Rocket League"):
@@ -342,21 +2635,210 @@ async def update_streaming_status(status: str, game: str = "Rocket League"):
     if status not in ["online", "offline", "streaming"]:
         raise HTTPException(status_code=400, detail="Invalid status")
     
-    status_data = await db.streaming_status.find_one()
-    if not status_data:
+    updated_status = await streaming_status_writer.report(status, game)
+    if not updated_status:
         raise HTTPException(status_code=404, detail="Streaming status not found")
-    
-    await db.streaming_status.update_one(
-        {"id": status_data["id"]}, 
-        {"$set": {"status": status, "game": game, "updated_at": datetime.utcnow()}}
+    return streaming_status_writer.overlay(updated_status)
+
+@api_router.get("/streaming-status/heartbeat")
+async def get_streaming_status_heartbeat():
+    """Get when the streaming status was last reported, which the tagged GETs leave out"""
+    streaming_status = await singleton_cache.get("streaming_status", load_streaming_status)
+    return {"last_checked": streaming_status_writer.overlay(streaming_status).last_checked}
+
+@api_router.get("/streaming-status/writes")
+async def get_streaming_status_writes():
+    """Get report, write and debounce counters for streaming status updates"""
+    return streaming_status_writer.stats()
+
+# Streaming Status push channels
+async def next_message(queue: asyncio.Queue):
+    """Wait for the next broadcast message, returning "" when a heartbeat is due"""
+    try:
+        return await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+    except asyncio.TimeoutError:
+        return ""
+
+@api_router.get("/streaming-status/events")
+async def stream_streaming_status(request: Request):
+    """Server-Sent Events feed of streaming status changes"""
+    # Subscribe before reading the current status, so a change published in between
+    # is queued rather than lost
+    queue = streaming_status_broadcaster.subscribe()
+    try:
+        current = await current_streaming_status()
+    except BaseException:
+        streaming_status_broadcaster.unsubscribe(queue)
+        raise
+
+    async def events():
+        try:
+            yield f"event: streaming-status\ndata: {current.json()}\n\n"
+            while not await request.is_disconnected():
+                message = await next_message(queue)
+                if message is None:
+                    break
+                if message:
+                    yield f"event: streaming-status\ndata: {message}\n\n"
+                else:
+                    yield ": heartbeat\n\n"
+        finally:
+            streaming_status_broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    
-    updated_status = await db.streaming_status.find_one({"id": status_data["id"]})
-    return StreamingStatus(**updated_status)
+
+def status_frame(message: str) -> str:
+    """A broadcast status wrapped for the WebSocket, where it shares the channel with heartbeats"""
+    return f'{{"type": "status", "data": {message}}}'
+
+@api_router.websocket("/streaming-status/ws")
+async def websocket_streaming_status(websocket: WebSocket):
+    """WebSocket feed of streaming status changes.
+
+    Sends {"type": "status", "data": <streaming status>} frames, the current status
+    first, and {"type": "heartbeat"} while idle.
+    """
+    await websocket.accept()
+    queue = streaming_status_broadcaster.subscribe()
+    try:
+        current = await current_streaming_status()
+        await websocket.send_text(status_frame(current.json()))
+        while True:
+            message = await next_message(queue)
+            if message is None:
+                await websocket.close()
+                break
+            await websocket.send_text(status_frame(message) if message else '{"type": "heartbeat"}')
+    except WebSocketDisconnect:
+        pass
+    finally:
+        streaming_status_broadcaster.unsubscribe(queue)
+
+@api_router.get("/streaming-status/subscribers")
+async def get_streaming_status_subscribers():
+    """Get push channel subscriber and delivery counters"""
+    return streaming_status_broadcaster.stats()
+
+# Public Site endpoint
+@api_router.get("/site", response_model=SiteProfile)
+async def get_site(fields: Optional[str] = None):
+    """Get everything the public site renders in one response"""
+    selected = parse_fields(SiteProfile, fields)
+    site = await singleton_cache.get("site", site_profile_builder.load)
+    if selected:
+        return FastJSONResponse(sparse(model_to_dict(site), selected))
+    return site
+
+# Health endpoint
+@api_router.get("/health")
+async def get_health():
+    """Report storage reachability and live connection pool stats"""
+    health = {"status": "ok", "storage": STORAGE_BACKEND}
+    if STORAGE_BACKEND == 'mongo':
+        start = time.perf_counter()
+        try:
+            await db.command("ping")
+        except PyMongoError as e:
+            return JSONResponse(status_code=503, content={**health, "status": "unavailable", "detail": str(e)})
+        health["ping_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        health["public_read_preference"] = MONGO_PUBLIC_READ_PREFERENCE
+        health["pool"] = {
+            "max_size": MONGO_MAX_POOL_SIZE,
+            "min_size": MONGO_MIN_POOL_SIZE,
+            "servers": pool_stats.snapshot(),
+        }
+    if cache_coherence.strategy == "degraded":
+        # Still serving, but ETags and caches may not reflect other workers' writes
+        health["status"] = "degraded"
+        health["cache_coherence"] = cache_coherence.stats()
+    return health
+
+# Cache endpoint
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    """Get hit, miss and invalidation counters for the singleton cache"""
+    return {**singleton_cache.stats(), "coherence": cache_coherence.stats()}
+
+@api_router.get("/single-flight/stats")
+async def get_single_flight_stats():
+    """Get per-key counts of reads that shared another request's in-flight load"""
+    return single_flight.stats()
+
+@api_router.get("/admin/tenants", response_model=List[Tenant])
+async def get_tenants():
+    """List the creator sites this worker knows about"""
+    return tenant_registry.all()
+
+@api_router.post("/admin/tenants", response_model=Tenant)
+async def create_tenant(input: TenantCreate):
+    """Register a creator site and seed its default documents"""
+    if not MULTI_TENANT:
+        raise HTTPException(status_code=400, detail="Multi-tenant mode is disabled")
+    tenant = Tenant(id=input.id, name=input.name, hosts=[host.lower() for host in input.hosts])
+    try:
+        await tenant_registry.create(tenant)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Tenant already exists")
+    await seed_site(tenant.id, tenant_seed_data(input))
+    return tenant
+
+@api_router.get("/admin/slow-ops")
+async def get_slow_ops():
+    """Get the most recent slow Mongo operations, one entry per query shape"""
+    return {"threshold_ms": SLOW_OP_THRESHOLD_MS, "operations": slow_op_log.entries()}
 
 # Include the router in the main app
 app.include_router(api_router)
 
+# Conditional GET: path -> (collections the response is built from, Cache-Control,
+# whether the handler reads through public_db)
+PUBLIC_CACHE_CONTROL = "public, no-cache"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+CONDITIONAL_ROUTES = {
+    "/api/biography": (("biography",), PUBLIC_CACHE_CONTROL, True),
+    "/api/partnerships": (("partnerships",), PUBLIC_CACHE_CONTROL, True),
+    "/api/social-media": (("social_media",), PUBLIC_CACHE_CONTROL, True),
+    "/api/streaming-status": (("streaming_status",), PUBLIC_CACHE_CONTROL, True),
+    "/api/site": (("site_profile",), PUBLIC_CACHE_CONTROL, True),
+    "/api/contact": (("contact_forms",), PRIVATE_CACHE_CONTROL, False),
+    "/api/status": (("status_checks",), PRIVATE_CACHE_CONTROL, False),
+}
+
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    route = CONDITIONAL_ROUTES.get(request.url.path)
+    if route is None or request.method not in ("GET", "HEAD"):
+        return await call_next(request)
+
+    collection_names, cache_control, reads_public_db = route
+    # Taken before the handler runs, so a tag is never remembered against versions
+    # newer than its body
+    versions = collection_versions.versions(collection_names)
+    key = tenant_key(f"{request.url.path}?{request.url.query}")
+    if_none_match = request.headers.get("if-none-match")
+    # A lagging secondary can return the body from before the write that set these
+    # versions, so tags read from one are only ever checked against a fresh body
+    remember = not (reads_public_db and public_db is not db)
+    etag = body_etags.get(key, versions) if remember else None
+    if etag and if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+    response = await call_next(request)
+    if response.status_code != 200:
+        return response
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    etag = body_etags.tag(body)
+    if remember:
+        body_etags.put(key, versions, etag)
+    headers = {**response.headers, "ETag": etag, "Cache-Control": cache_control}
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    return Response(content=body, status_code=200, headers=headers)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -365,6 +2847,114 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and in-flight counts per route template"""
+
+    def __init__(self, app):
+        self.app = app
+        self._static_routes = None
+        self._dynamic_routes = None
+
+    def resolve_route(self, path: str) -> str:
+        if self._static_routes is None:
+            routes = [route for route in app.routes if hasattr(route, "path_regex")]
+            self._static_routes = {route.path for route in routes if "{" not in route.path}
+            self._dynamic_routes = [(route.path_regex, route.path) for route in routes if "{" in route.path]
+        if path in self._static_routes:
+            return path
+        for regex, template in self._dynamic_routes:
+            if regex.match(path):
+                return template
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self.resolve_route(scope["path"])
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_metrics.started(route)
+        token = current_route.set(route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_route.reset(token)
+            http_metrics.finished(scope["method"], route, status, time.perf_counter() - start)
+
+app.add_middleware(MetricsMiddleware)
+
+class TenantMiddleware:
+    """ASGI middleware resolving each request's tenant from its path prefix or host.
+
+    Path prefixes are stripped before routing, so every route serves every tenant.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        tenant_id = None
+        if TENANT_RESOLUTION == "path":
+            path = scope["path"]
+            if path.startswith(TENANT_PATH_PREFIX):
+                tenant_id, _, rest = path[len(TENANT_PATH_PREFIX):].partition("/")
+                prefix_length = len(TENANT_PATH_PREFIX) + len(tenant_id)
+                scope = {**scope, "path": "/" + rest}
+                if scope.get("raw_path"):
+                    scope["raw_path"] = scope["raw_path"][prefix_length:] or b"/"
+        else:
+            tenant_id = await tenant_registry.id_for_host(Headers(scope=scope).get("host", ""))
+
+        tenant = await tenant_registry.get(tenant_id or DEFAULT_TENANT)
+        if tenant is None:
+            if scope["type"] == "http":
+                await JSONResponse({"detail": "Unknown site"}, status_code=404)(scope, receive, send)
+            else:
+                await WebSocketClose(code=4404)(scope, receive, send)
+            return
+
+        token = current_tenant.set(tenant.id)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_tenant.reset(token)
+
+# Added after the metrics middleware so it runs first and metrics see the stripped path
+if MULTI_TENANT:
+    app.add_middleware(TenantMiddleware)
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of request, Mongo and internal metrics"""
+    lines = http_metrics.render() + command_metrics.render()
+    gauges = {
+        "singleton_cache_hits": singleton_cache.hits,
+        "singleton_cache_misses": singleton_cache.misses,
+        "singleton_cache_invalidations": singleton_cache.invalidations,
+        "streaming_status_subscribers": streaming_status_broadcaster.stats()["subscribers"],
+        "status_check_buffer_pending": status_check_buffer.stats()["pending"],
+    }
+    for name, value in gauges.items():
+        lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+    lines += ["# TYPE mongo_pool_connections gauge"]
+    for address, counters in pool_stats.snapshot().items():
+        for state in ("open", "in_use", "waiting"):
+            lines.append(f"mongo_pool_connections{{{label_string(server=address, state=state)}}} {counters[state]}")
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -372,6 +2962,87 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+background_tasks = set()
+
+@app.on_event("startup")
+async def startup_slow_op_log():
+    slow_op_log.start()
+
+@app.on_event("startup")
+async def startup_warm_up_connections():
+    await warm_up_connections()
+
+@app.on_event("startup")
+async def startup_write_buffers():
+    status_check_buffer.start()
+
+@app.on_event("startup")
+async def startup_seed_defaults():
+    # Seeding happens on a fresh database, before the background index build has run,
+    # and relies on the unique id indexes to stop concurrent workers adding duplicates
+    # (as do the change log's counters)
+    await ensure_indexes(db, unique_indexes([*SEED_DATA, "tenants", "counters"]))
+    if not MULTI_TENANT:
+        counts = await seed_site()
+        logger.info(f"Seeded default documents: {counts}")
+        return
+    adopted = await adopt_untenanted(db, DEFAULT_TENANT)
+    if any(adopted.values()):
+        logger.info(f"Assigned existing documents to tenant {DEFAULT_TENANT}: {adopted}")
+    await tenant_registry.load()
+    if await tenant_registry.get(DEFAULT_TENANT) is None:
+        try:
+            await tenant_registry.create(Tenant(id=DEFAULT_TENANT, name=DEFAULT_TENANT))
+        except DuplicateKeyError:
+            # Registered by another worker starting at the same time
+            await tenant_registry.load()
+    counts = await seed_site(DEFAULT_TENANT)
+    logger.info(f"Seeded default documents for tenant {DEFAULT_TENANT}: {counts}")
+
+@app.on_event("startup")
+async def startup_snapshots():
+    # Start from a complete snapshot even if nothing changed since the last run
+    snapshot_publisher.request(DEFAULT_TENANT if MULTI_TENANT else None)
+
+@app.on_event("startup")
+async def startup_build_indexes():
+    task = asyncio.create_task(build_indexes())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+@app.on_event("startup")
+async def startup_cache_coherence():
+    cache_coherence.start()
+
+@app.on_event("startup")
+async def startup_streaming_status_writer():
+    streaming_status_writer.start()
+
+@app.on_event("startup")
+async def startup_job_queue():
+    job_queue.start()
+
+@app.on_event("startup")
+async def startup_change_log():
+    change_log.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Each step runs even if an earlier one fails, so buffered writes are always flushed
+    steps = [
+        cache_coherence.stop,
+        streaming_status_writer.stop,
+        job_queue.stop,
+        change_log.stop,
+        snapshot_publisher.flush,
+        streaming_status_broadcaster.close,
+        status_check_buffer.stop,
+    ]
+    for step in steps:
+        try:
+            result = step()
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            logger.exception(f"Shutdown step {step.__qualname__} failed")
     client.close()
@@ -0,0 +1,145 @@
+"""Static snapshots of the public data, written for nginx or a CDN to serve directly."""
+
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pymongo.errors import PyMongoError
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotPublisher:
+    """Exports the public data as static, precompressed JSON files after writes.
+
+    Writes only request an export; the export runs debounce seconds after the first
+    request, so a burst of writes (an admin batch edit) produces one export. Each file
+    is written as an immutable <name>.<content hash>.json plus the mutable <name>.json,
+    each with .gz and (if brotli is installed) .br siblings, and manifest.json lists
+    the current versions. Every file is replaced atomically, unchanged content is not
+    rewritten, and only the newest keep_versions versions of each file are kept. In
+    multi-tenant mode each tenant gets its own subdirectory.
+
+    load(tenant) returns the documents to export by file name, and render(document)
+    serializes one of them to bytes.
+    """
+
+    def __init__(self, directory: str, debounce: float, keep_versions: int,
+                 load: Callable[[Optional[str]], Awaitable[Dict[str, Any]]],
+                 render: Callable[[Any], bytes]):
+        self.directory = Path(directory) if directory else None
+        self.debounce = debounce
+        self.keep_versions = keep_versions
+        self.load = load
+        self.render = render
+        # tenant -> export task waiting out the debounce window
+        self._scheduled: Dict[Optional[str], asyncio.Task] = {}
+        self.requested = 0
+        self.exports = 0
+        self.files_written = 0
+        self.failed = 0
+
+    def request(self, tenant: Optional[str] = None):
+        """Schedule an export of tenant's public data"""
+        if self.directory is None:
+            return
+        self.requested += 1
+        if tenant not in self._scheduled:
+            self._scheduled[tenant] = asyncio.create_task(self._export_after(tenant))
+
+    async def _export_after(self, tenant: Optional[str]):
+        await asyncio.sleep(self.debounce)
+        # Writes from here on schedule the next export
+        del self._scheduled[tenant]
+        try:
+            await self.export(tenant)
+        except (PyMongoError, OSError) as e:
+            self.failed += 1
+            logger.error(f"Snapshot export failed: {e}")
+
+    async def export(self, tenant: Optional[str] = None):
+        contents = {name: self.render(document) for name, document in (await self.load(tenant)).items()}
+        directory = self.directory / tenant if tenant else self.directory
+        self.files_written += await asyncio.to_thread(self._write, directory, contents)
+        self.exports += 1
+
+    def _write(self, directory: Path, contents: Dict[str, bytes]) -> int:
+        directory.mkdir(parents=True, exist_ok=True)
+        written = 0
+        versions = {}
+        for name, content in contents.items():
+            version = hashlib.sha256(content).hexdigest()[:16]
+            versions[name] = f"{name}.{version}.json"
+            for path, data in self._variants(directory / versions[name], content):
+                if path.exists():
+                    # Content seen before is current again; keep pruning from removing it
+                    os.utime(path)
+                else:
+                    self._replace(path, data)
+                    written += 1
+            current = directory / f"{name}.json"
+            if not current.exists() or current.read_bytes() != content:
+                for path, data in self._variants(current, content):
+                    self._replace(path, data)
+                    written += 1
+            self._prune(directory, name)
+        manifest = self.render({
+            "generated_at": datetime.utcnow(),
+            "version": hashlib.sha256("".join(versions.values()).encode()).hexdigest()[:16],
+            "files": versions,
+        })
+        self._replace(directory / "manifest.json", manifest)
+        return written + 1
+
+    @staticmethod
+    def _variants(path: Path, content: bytes):
+        yield path.with_name(path.name + ".gz"), gzip.compress(content, 9, mtime=0)
+        if brotli is not None:
+            yield path.with_name(path.name + ".br"), brotli.compress(content)
+        # The uncompressed file goes last, so its presence means the variants are complete
+        yield path, content
+
+    @staticmethod
+    def _replace(path: Path, data: bytes):
+        """Write data to a temporary file beside path and rename it into place"""
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", delete=False) as file:
+            file.write(data)
+        os.chmod(file.name, 0o644)
+        os.replace(file.name, path)
+
+    def _prune(self, directory: Path, name: str):
+        versions = sorted(directory.glob(f"{name}.*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in versions[self.keep_versions:]:
+            for variant in (path, path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")):
+                variant.unlink(missing_ok=True)
+
+    async def flush(self):
+        """Run every scheduled export now"""
+        for tenant, task in list(self._scheduled.items()):
+            task.cancel()
+            del self._scheduled[tenant]
+            try:
+                await self.export(tenant)
+            except (PyMongoError, OSError) as e:
+                logger.error(f"Snapshot export failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.directory is not None,
+            "requested": self.requested,
+            "pending": len(self._scheduled),
+            "exports": self.exports,
+            "files_written": self.files_written,
+            "failed": self.failed,
+        }
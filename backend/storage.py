@@ -0,0 +1,715 @@
+"""Storage backends that stand in for Motor behind server.py's repositories.
+
+Each backend exposes the subset of the Motor client/database/collection API that
+server.py uses, so handlers and repositories don't care where documents live:
+
+    client[db_name][collection_name] -> collection
+    collection.find_one(query, projection)
+    collection.find(query, projection).sort(keys).limit(n).to_list(length)
+    collection.insert_one(doc) / insert_many(docs, ordered)
+    collection.find_one_and_update(query, update, projection, return_document, upsert)
+    collection.update_many(query, update)
+    collection.replace_one(query, doc, upsert) / delete_one(query) / delete_many(query)
+    collection.bulk_write([InsertOne | UpdateOne | DeleteOne], ordered)
+    collection.create_indexes([IndexModel]) / index_information()
+
+Queries support field equality, $lt/$lte/$gt/$gte/$ne/$in/$exists and $or; updates
+support $set, $setOnInsert and $inc. Errors are raised as pymongo exceptions so
+callers handle every backend the same way.
+"""
+
+import asyncio
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import InsertOne, UpdateOne, DeleteOne, ReturnDocument
+from pymongo.errors import AutoReconnect, BulkWriteError, DuplicateKeyError, OperationFailure, PyMongoError
+
+MISSING = object()
+
+
+def matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Evaluate a Mongo-style query against a document"""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, clause) for clause in condition):
+                return False
+            continue
+        value = doc.get(key, MISSING)
+        if isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            for op, arg in condition.items():
+                if not compare(value, op, arg):
+                    return False
+        elif condition is None:
+            # As in Mongo, null also matches a missing field
+            if value is not MISSING and value is not None:
+                return False
+        elif value is MISSING or value != condition:
+            return False
+    return True
+
+
+def compare(value, op: str, arg) -> bool:
+    if op == "$exists":
+        return (value is not MISSING) == bool(arg)
+    if op == "$in":
+        return value is not MISSING and value in arg
+    if op == "$ne":
+        return value is MISSING or value != arg
+    if value is MISSING or value is None:
+        return False
+    if op == "$lt":
+        return value < arg
+    if op == "$lte":
+        return value <= arg
+    if op == "$gt":
+        return value > arg
+    if op == "$gte":
+        return value >= arg
+    raise OperationFailure(f"Unsupported query operator {op}")
+
+
+def project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply an inclusion projection; documents here never carry an _id"""
+    if not projection:
+        return dict(doc)
+    included = [key for key, flag in projection.items() if flag and key != "_id"]
+    if not included:
+        return {key: value for key, value in doc.items() if projection.get(key, 1)}
+    return {key: doc[key] for key in included if key in doc}
+
+
+def apply_update(doc: Dict[str, Any], update: Dict[str, Any], inserting: bool) -> Dict[str, Any]:
+    unsupported = set(update) - {"$set", "$setOnInsert", "$inc"}
+    if unsupported:
+        raise OperationFailure(f"Unsupported update operators {sorted(unsupported)}")
+    doc = dict(doc)
+    doc.update(update.get("$set", {}))
+    for field, amount in update.get("$inc", {}).items():
+        doc[field] = doc.get(field, 0) + amount
+    if inserting:
+        doc.update(update.get("$setOnInsert", {}))
+    return doc
+
+
+def upsert_seed(query: Dict[str, Any]) -> Dict[str, Any]:
+    """The equality fields of a query, which become part of an upserted document"""
+    return {
+        key: value for key, value in query.items()
+        if not key.startswith("$") and not (isinstance(value, dict) and any(k.startswith("$") for k in value))
+    }
+
+
+def operation_parts(operation):
+    """Unpack a pymongo bulk operation into (kind, filter, document, upsert)"""
+    if isinstance(operation, InsertOne):
+        return "insert", None, operation._doc, False
+    if isinstance(operation, UpdateOne):
+        return "update", operation._filter, operation._doc, operation._upsert
+    if isinstance(operation, DeleteOne):
+        return "delete", operation._filter, None, False
+    raise OperationFailure(f"Unsupported bulk operation {type(operation).__name__}")
+
+
+class Result:
+    """Attribute bag standing in for pymongo's result objects"""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+def bulk_summary() -> Dict[str, Any]:
+    return {"writeErrors": [], "nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0}
+
+
+class Cursor:
+    """Lazy find() result supporting sort, limit and to_list"""
+
+    def __init__(self, run, query, projection):
+        self._run = run
+        self._query = query
+        self._projection = projection
+        self._sort = []
+        self._limit = 0
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = [(key_or_list, direction or 1)] if isinstance(key_or_list, str) else list(key_or_list)
+        return self
+
+    def limit(self, limit: int):
+        self._limit = limit
+        return self
+
+    async def to_list(self, length: Optional[int] = None):
+        limit = min(filter(None, [self._limit, length]), default=0)
+        return await self._run(self._query, self._projection, self._sort, limit)
+
+
+# In-memory backend
+
+class MemoryCollection:
+    """Documents held in a dict, with unique indexes kept as hash maps"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._docs: Dict[int, Dict[str, Any]] = {}
+        self._by_id: Dict[Any, int] = {}
+        self._next_seq = 0
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+        self._unique: Dict[str, Dict[tuple, int]] = {}
+
+    def _candidates(self, query):
+        doc_id = query.get("id")
+        if isinstance(doc_id, str):
+            seq = self._by_id.get(doc_id)
+            return [(seq, self._docs[seq])] if seq is not None else []
+        return self._docs.items()
+
+    def _matching(self, query):
+        return [(seq, doc) for seq, doc in self._candidates(query) if matches(doc, query)]
+
+    def _index_key(self, name, doc):
+        """The unique-index key of doc, or None when a partial index doesn't cover it"""
+        index = self._indexes[name]
+        partial = index.get("partialFilterExpression")
+        if partial and not matches(doc, partial):
+            return None
+        return tuple(doc.get(field) for field, _ in index["key"])
+
+    def _check_unique(self, doc, seq=None):
+        doc_seq = self._by_id.get(doc.get("id"))
+        if doc_seq is not None and doc_seq != seq:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: id", 11000)
+        for name, keys in self._unique.items():
+            key = self._index_key(name, doc)
+            if key is not None and keys.get(key, seq) != seq:
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}", 11000)
+
+    def _link(self, seq, doc):
+        self._docs[seq] = doc
+        if "id" in doc:
+            self._by_id[doc["id"]] = seq
+        for name, keys in self._unique.items():
+            key = self._index_key(name, doc)
+            if key is not None:
+                keys[key] = seq
+
+    def _drop_keys(self, seq, doc):
+        if self._by_id.get(doc.get("id")) == seq:
+            del self._by_id[doc["id"]]
+        for name, keys in self._unique.items():
+            key = self._index_key(name, doc)
+            if key is not None and keys.get(key) == seq:
+                del keys[key]
+
+    def _unlink(self, seq):
+        self._drop_keys(seq, self._docs.pop(seq))
+
+    def _insert(self, doc):
+        doc = dict(doc)
+        self._check_unique(doc)
+        seq = self._next_seq
+        self._next_seq += 1
+        self._link(seq, doc)
+
+    def _store(self, seq, doc):
+        self._check_unique(doc, seq)
+        # Re-keying in place keeps the document's position in natural order
+        self._drop_keys(seq, self._docs[seq])
+        self._link(seq, doc)
+
+    def _update(self, query, update, upsert):
+        """Apply an update to the first match; returns (matched, document after)"""
+        found = self._matching(query)
+        if found:
+            seq, doc = found[0]
+            doc = apply_update(doc, update, inserting=False)
+            self._store(seq, doc)
+            return True, doc
+        if upsert:
+            doc = apply_update(upsert_seed(query), update, inserting=True)
+            self._insert(doc)
+            return False, doc
+        return False, None
+
+    async def _find(self, query, projection, sort, limit):
+        docs = [doc for _, doc in self._matching(query or {})]
+        for field, direction in reversed(sort):
+            docs.sort(key=lambda doc: (doc.get(field) is not None, doc.get(field)), reverse=direction < 0)
+        if limit:
+            docs = docs[:limit]
+        return [project(doc, projection) for doc in docs]
+
+    def find(self, query=None, projection=None):
+        return Cursor(self._find, query or {}, projection)
+
+    async def find_one(self, query=None, projection=None):
+        found = self._matching(query or {})
+        return project(found[0][1], projection) if found else None
+
+    async def insert_one(self, doc):
+        self._insert(doc)
+        return Result(inserted_id=doc.get("id"))
+
+    async def insert_many(self, docs, ordered=True):
+        summary = bulk_summary()
+        for index, doc in enumerate(docs):
+            try:
+                self._insert(doc)
+                summary["nInserted"] += 1
+            except DuplicateKeyError as e:
+                summary["writeErrors"].append({"index": index, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+        if summary["writeErrors"]:
+            raise BulkWriteError(summary)
+        return Result(inserted_ids=[doc.get("id") for doc in docs])
+
+    async def find_one_and_update(self, query, update, projection=None,
+                                  return_document=ReturnDocument.BEFORE, upsert=False):
+        found = self._matching(query)
+        before = found[0][1] if found else None
+        matched, after = self._update(query, update, upsert)
+        doc = after if return_document == ReturnDocument.AFTER else before
+        return project(doc, projection) if doc is not None else None
+
+    async def update_many(self, query, update):
+        found = self._matching(query)
+        for seq, doc in found:
+            self._store(seq, apply_update(doc, update, inserting=False))
+        return Result(matched_count=len(found), modified_count=len(found))
+
+    async def replace_one(self, query, doc, upsert=False):
+        found = self._matching(query)
+        if found:
+            self._store(found[0][0], dict(doc))
+            return Result(matched_count=1, upserted_id=None)
+        if upsert:
+            self._insert(doc)
+            return Result(matched_count=0, upserted_id=doc.get("id"))
+        return Result(matched_count=0, upserted_id=None)
+
+    async def delete_one(self, query):
+        found = self._matching(query)
+        if not found:
+            return Result(deleted_count=0)
+        self._unlink(found[0][0])
+        return Result(deleted_count=1)
+
+    async def delete_many(self, query):
+        found = self._matching(query)
+        for seq, _ in found:
+            self._unlink(seq)
+        return Result(deleted_count=len(found))
+
+    async def bulk_write(self, operations, ordered=True):
+        summary = bulk_summary()
+        for index, operation in enumerate(operations):
+            kind, query, doc, upsert = operation_parts(operation)
+            try:
+                if kind == "insert":
+                    self._insert(doc)
+                    summary["nInserted"] += 1
+                elif kind == "update":
+                    matched, after = self._update(query, doc, upsert)
+                    if matched:
+                        summary["nMatched"] += 1
+                        summary["nModified"] += 1
+                    elif after is not None:
+                        summary["nUpserted"] += 1
+                else:
+                    summary["nRemoved"] += (await self.delete_one(query)).deleted_count
+            except DuplicateKeyError as e:
+                summary["writeErrors"].append({"index": index, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+        if summary["writeErrors"]:
+            raise BulkWriteError(summary)
+        return Result(bulk_api_result=summary, upserted_count=summary["nUpserted"])
+
+    async def create_indexes(self, indexes):
+        for index in indexes:
+            document = dict(index.document)
+            name = document["name"]
+            document["key"] = list(document["key"].items())
+            self._indexes[name] = document
+            if document.get("unique"):
+                keys = {}
+                for seq, doc in self._docs.items():
+                    key = self._index_key(name, doc)
+                    if key is not None and keys.setdefault(key, seq) != seq:
+                        del self._indexes[name]
+                        raise DuplicateKeyError(f"E11000 duplicate key error building index {name}", 11000)
+                self._unique[name] = keys
+        return [index.document["name"] for index in indexes]
+
+    async def index_information(self):
+        return {"_id_": {"key": [("_id", 1)]}, **self._indexes}
+
+
+class MemoryDatabase:
+    def __init__(self, name: str):
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+
+class MemoryClient:
+    """Process-local storage; fast, and empty again on every restart"""
+
+    def __init__(self):
+        self._databases: Dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(name)
+        return self._databases[name]
+
+    def close(self):
+        pass
+
+
+# SQLite backend
+
+def to_json(doc: Dict[str, Any]) -> str:
+    return json.dumps(doc, default=json_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def json_default(value):
+    if isinstance(value, datetime):
+        # Fixed-width timestamps keep lexicographic order equal to time order
+        return value.isoformat(timespec="microseconds")
+    return str(value)
+
+
+def sql_value(value):
+    return json_default(value) if isinstance(value, datetime) else value
+
+
+def json_path(field: str) -> str:
+    return f"json_extract(doc, '$.{field}')"
+
+
+SQL_OPERATORS = {"$lt": "<", "$lte": "<=", "$gt": ">", "$gte": ">="}
+
+
+def where_clause(query: Dict[str, Any], params: List[Any]) -> str:
+    """Translate a Mongo-style query into a SQL condition over the JSON doc column"""
+    clauses = []
+    for key, condition in query.items():
+        if key == "$or":
+            clauses.append("(" + " OR ".join(where_clause(clause, params) for clause in condition) + ")")
+            continue
+        path = json_path(key)
+        if isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            for op, arg in condition.items():
+                if op in SQL_OPERATORS:
+                    clauses.append(f"{path} {SQL_OPERATORS[op]} ?")
+                    params.append(sql_value(arg))
+                elif op == "$in":
+                    clauses.append(f"{path} IN ({', '.join('?' for _ in arg)})" if arg else "0")
+                    params.extend(sql_value(item) for item in arg)
+                elif op == "$ne":
+                    clauses.append(f"({path} IS NULL OR {path} != ?)")
+                    params.append(sql_value(arg))
+                elif op == "$exists":
+                    clauses.append(f"json_type(doc, '$.{key}') IS {'NOT ' if arg else ''}NULL")
+                else:
+                    raise OperationFailure(f"Unsupported query operator {op}")
+        elif condition is None:
+            clauses.append(f"{path} IS NULL")
+        else:
+            clauses.append(f"{path} = ?")
+            params.append(sql_value(condition))
+    return " AND ".join(clauses) or "1"
+
+
+class SQLiteCollection:
+    """One table per collection: (seq, id, doc) with the document stored as JSON"""
+
+    def __init__(self, database: "SQLiteDatabase", name: str):
+        self.name = name
+        self._database = database
+        self._table = '"' + name.replace('"', '""') + '"'
+        self._ready = False
+
+    async def _call(self, func, *args):
+        return await self._database.run(self._with_table, func, *args)
+
+    def _with_table(self, conn, func, *args):
+        if not self._ready:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._table} "
+                "(seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE, doc TEXT NOT NULL)"
+            )
+            self._ready = True
+        return func(conn, *args)
+
+    def _select(self, conn, query, sort=(), limit=0):
+        params = []
+        sql = f"SELECT seq, doc FROM {self._table} WHERE {where_clause(query, params)}"
+        if sort:
+            sql += " ORDER BY " + ", ".join(
+                f"{json_path(field)} {'DESC' if direction < 0 else 'ASC'}" for field, direction in sort
+            )
+        else:
+            sql += " ORDER BY seq"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [(seq, json.loads(doc)) for seq, doc in conn.execute(sql, params)]
+
+    def _insert(self, conn, doc):
+        try:
+            conn.execute(f"INSERT INTO {self._table} (id, doc) VALUES (?, ?)", (doc.get("id"), to_json(doc)))
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name}: {e}", 11000)
+
+    def _store(self, conn, seq, doc):
+        try:
+            conn.execute(f"UPDATE {self._table} SET id = ?, doc = ? WHERE seq = ?", (doc.get("id"), to_json(doc), seq))
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name}: {e}", 11000)
+
+    def _update(self, conn, query, update, upsert):
+        found = self._select(conn, query, limit=1)
+        if found:
+            seq, doc = found[0]
+            doc = apply_update(doc, update, inserting=False)
+            self._store(conn, seq, doc)
+            return True, doc, found[0][1]
+        if upsert:
+            doc = apply_update(upsert_seed(query), update, inserting=True)
+            self._insert(conn, doc)
+            return False, doc, None
+        return False, None, None
+
+    def find(self, query=None, projection=None):
+        async def run(query, projection, sort, limit):
+            rows = await self._call(self._select, query, sort, limit)
+            return [project(doc, projection) for _, doc in rows]
+        return Cursor(run, query or {}, projection)
+
+    async def find_one(self, query=None, projection=None):
+        rows = await self._call(self._select, query or {}, (), 1)
+        return project(rows[0][1], projection) if rows else None
+
+    async def insert_one(self, doc):
+        await self._call(self._transaction, lambda conn: self._insert(conn, doc))
+        return Result(inserted_id=doc.get("id"))
+
+    async def insert_many(self, docs, ordered=True):
+        def run(conn):
+            summary = bulk_summary()
+            for index, doc in enumerate(docs):
+                try:
+                    self._insert(conn, doc)
+                    summary["nInserted"] += 1
+                except DuplicateKeyError as e:
+                    summary["writeErrors"].append({"index": index, "code": 11000, "errmsg": str(e)})
+                    if ordered:
+                        break
+            return summary
+        summary = await self._call(self._transaction, run)
+        if summary["writeErrors"]:
+            raise BulkWriteError(summary)
+        return Result(inserted_ids=[doc.get("id") for doc in docs])
+
+    async def find_one_and_update(self, query, update, projection=None,
+                                  return_document=ReturnDocument.BEFORE, upsert=False):
+        matched, after, before = await self._call(
+            self._transaction, lambda conn: self._update(conn, query, update, upsert)
+        )
+        doc = after if return_document == ReturnDocument.AFTER else before
+        return project(doc, projection) if doc is not None else None
+
+    async def update_many(self, query, update):
+        def run(conn):
+            found = self._select(conn, query)
+            for seq, doc in found:
+                self._store(conn, seq, apply_update(doc, update, inserting=False))
+            return len(found)
+        matched = await self._call(self._transaction, run)
+        return Result(matched_count=matched, modified_count=matched)
+
+    async def replace_one(self, query, doc, upsert=False):
+        def run(conn):
+            found = self._select(conn, query, limit=1)
+            if found:
+                self._store(conn, found[0][0], dict(doc))
+                return 1
+            if upsert:
+                self._insert(conn, doc)
+            return 0
+        matched = await self._call(self._transaction, run)
+        return Result(matched_count=matched, upserted_id=None if matched or not upsert else doc.get("id"))
+
+    def _delete(self, conn, query):
+        found = self._select(conn, query, limit=1)
+        if found:
+            conn.execute(f"DELETE FROM {self._table} WHERE seq = ?", (found[0][0],))
+        return len(found)
+
+    async def delete_one(self, query):
+        deleted = await self._call(self._transaction, lambda conn: self._delete(conn, query))
+        return Result(deleted_count=deleted)
+
+    async def delete_many(self, query):
+        def run(conn):
+            params = []
+            return conn.execute(f"DELETE FROM {self._table} WHERE {where_clause(query, params)}", params).rowcount
+        deleted = await self._call(self._transaction, run)
+        return Result(deleted_count=deleted)
+
+    async def bulk_write(self, operations, ordered=True):
+        def run(conn):
+            summary = bulk_summary()
+            for index, operation in enumerate(operations):
+                kind, query, doc, upsert = operation_parts(operation)
+                try:
+                    if kind == "insert":
+                        self._insert(conn, doc)
+                        summary["nInserted"] += 1
+                    elif kind == "update":
+                        matched, after, _ = self._update(conn, query, doc, upsert)
+                        if matched:
+                            summary["nMatched"] += 1
+                            summary["nModified"] += 1
+                        elif after is not None:
+                            summary["nUpserted"] += 1
+                    else:
+                        summary["nRemoved"] += self._delete(conn, query)
+                except DuplicateKeyError as e:
+                    summary["writeErrors"].append({"index": index, "code": 11000, "errmsg": str(e)})
+                    if ordered:
+                        break
+            return summary
+        summary = await self._call(self._transaction, run)
+        if summary["writeErrors"]:
+            raise BulkWriteError(summary)
+        return Result(bulk_api_result=summary, upserted_count=summary["nUpserted"])
+
+    def _transaction(self, conn, func):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = func(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    async def create_indexes(self, indexes):
+        def run(conn):
+            for index in indexes:
+                document = index.document
+                columns = ", ".join(
+                    f"{json_path(field)} {'DESC' if direction == -1 else 'ASC'}"
+                    for field, direction in document["key"].items()
+                )
+                sql = (
+                    f"CREATE {'UNIQUE ' if document.get('unique') else ''}INDEX IF NOT EXISTS "
+                    f"\"{self.name}__{document['name']}\" ON {self._table} ({columns})"
+                )
+                partial = document.get("partialFilterExpression")
+                if partial:
+                    # Only $exists filters are used, which need no bound parameters
+                    params = []
+                    sql += f" WHERE {where_clause(partial, params)}"
+                    if params:
+                        raise OperationFailure("Partial index filters must not need parameters")
+                try:
+                    conn.execute(sql)
+                except sqlite3.IntegrityError as e:
+                    raise DuplicateKeyError(f"E11000 duplicate key error building index {document['name']}: {e}", 11000)
+            return [index.document["name"] for index in indexes]
+        return await self._call(run)
+
+    async def index_information(self):
+        def run(conn):
+            rows = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (self.name,)
+            ).fetchall()
+            prefix = f"{self.name}__"
+            return {name[len(prefix):]: {} for (name,) in rows if name.startswith(prefix)}
+        return await self._call(run)
+
+
+def pymongo_error(error: sqlite3.Error) -> PyMongoError:
+    """The pymongo exception matching a SQLite error that wasn't translated where it was raised"""
+    if isinstance(error, sqlite3.OperationalError) and ("locked" in str(error) or "busy" in str(error)):
+        # Another process holds the write lock; like a lost connection, worth retrying
+        return AutoReconnect(f"SQLite database is busy: {error}")
+    return OperationFailure(f"SQLite error: {error}")
+
+
+class SQLiteDatabase:
+    """A SQLite file in WAL mode, accessed from one dedicated thread"""
+
+    def __init__(self, path: str, timeout: float = 5):
+        self.path = path
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._conn = None
+        self._collections: Dict[str, SQLiteCollection] = {}
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def _run(self, func, *args):
+        try:
+            return func(self._connect(), *args)
+        except sqlite3.Error as e:
+            raise pymongo_error(e) from e
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: self._run(func, *args))
+
+    def __getitem__(self, name: str) -> SQLiteCollection:
+        if name not in self._collections:
+            self._collections[name] = SQLiteCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> SQLiteCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def close(self):
+        """Close the connection; it is reopened if the database is used again"""
+        def close_connection():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        self._executor.submit(close_connection).result()
+
+
+class SQLiteClient:
+    """Single-node storage in one SQLite file; the database name is ignored"""
+
+    def __init__(self, path: str, timeout: float = 5):
+        self._database = SQLiteDatabase(path, timeout)
+
+    def __getitem__(self, name: str) -> SQLiteDatabase:
+        return self._database
+
+    def close(self):
+        self._database.close()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+In-Process Performance Benchmark for Ladypi89 Backend
+Drives the FastAPI app from backend/server.py through an ASGI transport against the
+in-memory storage backend, and reports latency percentiles and throughput per route
+at several concurrency levels
+
+Usage:
+    python backend_benchmark.py                              # print results
+    python backend_benchmark.py --save-baseline bench.json   # record a baseline
+    python backend_benchmark.py --baseline bench.json        # fail on regressions
+
+Set STORAGE_BACKEND=sqlite or STORAGE_BACKEND=mongo (with MONGO_URL/DB_NAME) to
+benchmark against another backend.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
+# Use the in-memory backend and keep abuse protection out of the numbers
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("CONTACT_RATE_BURST", "1000000000")
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import server  # noqa: E402
+
+# One INFO line per request would dwarf the numbers being measured
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+CONCURRENCY_LEVELS = [1, 10, 50]
+
+# name -> (method, path, body factory)
+ROUTES = {
+    "GET /api/biography": ("GET", "/api/biography", None),
+    "GET /api/partnerships": ("GET", "/api/partnerships", None),
+    "GET /api/social-media": ("GET", "/api/social-media", None),
+    "GET /api/streaming-status": ("GET", "/api/streaming-status", None),
+    "GET /api/site": ("GET", "/api/site", None),
+    "GET /api/contact": ("GET", "/api/contact", None),
+    "GET /api/status": ("GET", "/api/status", None),
+    "POST /api/status": ("POST", "/api/status", lambda i: {"client_name": f"bench-{i}"}),
+    "POST /api/contact": ("POST", "/api/contact", lambda i: {
+        "name": "Benchmark",
+        "email": f"bench{i}@example.com",
+        "message": f"Benchmark message {i} {time.perf_counter_ns()}",
+    }),
+}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class BackendBenchmark:
+    def __init__(self, requests_per_run, concurrency_levels):
+        self.requests_per_run = requests_per_run
+        self.concurrency_levels = concurrency_levels
+        self.results = {}
+
+    async def run_route(self, client, method, path, body_factory, concurrency):
+        """Issue requests_per_run requests from `concurrency` workers and summarize them"""
+        latencies = []
+        errors = 0
+        indexes = iter(range(self.requests_per_run))
+
+        async def worker():
+            nonlocal errors
+            for i in indexes:
+                body = body_factory(i) if body_factory else None
+                start = time.perf_counter()
+                response = await client.request(method, path, json=body)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "rps": len(latencies) / elapsed if elapsed else 0.0,
+        }
+
+    async def run_all(self):
+        await server.app.router.startup()
+        try:
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                # Warm up caches and lazily built state so the first level isn't penalized
+                for _, (method, path, body_factory) in ROUTES.items():
+                    await client.request(method, path, json=body_factory(-1) if body_factory else None)
+
+                for name, (method, path, body_factory) in ROUTES.items():
+                    self.results[name] = {}
+                    for concurrency in self.concurrency_levels:
+                        stats = await self.run_route(client, method, path, body_factory, concurrency)
+                        self.results[name][str(concurrency)] = stats
+                        print(
+                            f"{name:<28} c={concurrency:<4} "
+                            f"p50={stats['p50_ms']:7.2f}ms p95={stats['p95_ms']:7.2f}ms "
+                            f"p99={stats['p99_ms']:7.2f}ms {stats['rps']:9.1f} req/s"
+                            + (f"  ❌ {stats['errors']} errors" if stats["errors"] else "")
+                        )
+        finally:
+            await server.app.router.shutdown()
+        return self.results
+
+    def compare(self, baseline, threshold):
+        """Return a list of regressions against a saved baseline"""
+        regressions = []
+        for name, levels in self.results.items():
+            for concurrency, stats in levels.items():
+                previous = baseline.get("routes", {}).get(name, {}).get(concurrency)
+                if not previous:
+                    continue
+                if stats["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+                    regressions.append(
+                        f"{name} c={concurrency}: p95 {previous['p95_ms']:.2f}ms -> {stats['p95_ms']:.2f}ms"
+                    )
+                if stats["rps"] < previous["rps"] * (1 - threshold):
+                    regressions.append(
+                        f"{name} c={concurrency}: throughput {previous['rps']:.1f} -> {stats['rps']:.1f} req/s"
+                    )
+                if stats["errors"] > previous.get("errors", 0):
+                    regressions.append(f"{name} c={concurrency}: {stats['errors']} errors")
+        return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process benchmark for the Ladypi89 backend")
+    parser.add_argument("--requests", type=int, default=500, help="requests per route and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=CONCURRENCY_LEVELS)
+    parser.add_argument("--save-baseline", metavar="PATH", help="write results to a baseline JSON file")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative regression in p95 latency or throughput (default 0.25)")
+    args = parser.parse_args()
+
+    print("🚀 Starting In-Process Backend Benchmark for Ladypi89 Website")
+    print(f"📦 {args.requests} requests per route at concurrency {args.concurrency}, "
+          f"storage backend {server.STORAGE_BACKEND}")
+    print("=" * 80)
+
+    benchmark = BackendBenchmark(args.requests, args.concurrency)
+    results = asyncio.run(benchmark.run_all())
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps({
+            "requests": args.requests,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "routes": results,
+        }, indent=2))
+        print(f"\n💾 Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = benchmark.compare(baseline, args.threshold)
+        print("\n" + "=" * 80)
+        if regressions:
+            print(f"⚠️  {len(regressions)} regressions beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  ❌ {regression}")
+            sys.exit(1)
+        print(f"🎉 No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -290,10 +290,10 @@ class BackendTester:
             response = requests.get(f"{self.base_url}/contact")
             if response.status_code == 200:
                 data = response.json()
-                if isinstance(data, list):
+                if isinstance(data.get("items"), list) and "next_cursor" in data:
                     self.log_result("contact_form_api", "GET /api/contact", True)
                 else:
-                    self.log_result("contact_form_api", "GET /api/contact", False, "Expected list of contact forms")
+                    self.log_result("contact_form_api", "GET /api/contact", False, "Expected a page of contact forms")
             else:
                 self.log_result("contact_form_api", "GET /api/contact", False, f"Status code: {response.status_code}")
         except Exception as e:
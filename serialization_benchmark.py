@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Serialization Microbenchmark for Ladypi89 Backend
+Compares the model-validated response path with the fast orjson path, and the
+original model_to_dict with the precompiled per-model encoder
+"""
+
+import json
+import sys
+import timeit
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from typing import List
+
+import serialization
+from serialization import FastJSONResponse, model_to_dict
+from server import SocialMedia
+
+ITEMS = 1000
+ROUNDS = 20
+
+
+def legacy_model_to_dict(model):
+    """model_to_dict as it was before the precompiled encoder"""
+    data = model.dict()
+    for key, value in data.items():
+        if hasattr(value, '__str__') and 'HttpUrl' in str(type(value)):
+            data[key] = str(value)
+    return data
+
+
+def sample_documents():
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "platform": f"Platform {i}",
+            "url": f"https://example.com/ladypi89/{i}",
+            "icon": "play",
+            "color": "#9146ff",
+            "created_at": datetime.utcnow(),
+        }
+        for i in range(ITEMS)
+    ]
+
+
+def per_item_us(func):
+    seconds = min(timeit.repeat(func, number=1, repeat=ROUNDS))
+    return seconds / ITEMS * 1e6
+
+
+def main():
+    docs = sample_documents()
+    models = [SocialMedia(**doc) for doc in docs]
+    adapter = TypeAdapter(List[SocialMedia])
+    fast_response = FastJSONResponse(None)
+
+    def model_path():
+        # What the list endpoints did: build models, let FastAPI re-validate and encode them
+        items = [SocialMedia(**doc) for doc in docs]
+        validated = adapter.validate_python(items)
+        return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+    def fast_path():
+        return fast_response.render(docs)
+
+    results = [
+        ("response: models + validation + json", per_item_us(model_path)),
+        ("response: raw documents + fast render", per_item_us(fast_path)),
+        ("write: legacy model_to_dict", per_item_us(lambda: [legacy_model_to_dict(m) for m in models])),
+        ("write: precompiled model_to_dict", per_item_us(lambda: [model_to_dict(m) for m in models])),
+    ]
+
+    print(f"📊 Serialization microbenchmark ({ITEMS} SocialMedia items, best of {ROUNDS})")
+    print(f"   orjson available: {serialization.orjson is not None}")
+    print("=" * 64)
+    for name, us in results:
+        print(f"{name:<44} {us:8.2f} µs/item")
+    print("=" * 64)
+    print(f"Response speedup: {results[0][1] / results[1][1]:.1f}x")
+    print(f"Write encode speedup: {results[2][1] / results[3][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
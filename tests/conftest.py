@@ -0,0 +1,60 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from storage import MemoryClient, SQLiteClient  # noqa: E402
+
+BACKENDS = ["memory", "sqlite"]
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(params=BACKENDS)
+def storage_backend(request):
+    return request.param
+
+
+@pytest.fixture
+def database(storage_backend, tmp_path):
+    """An empty database on each storage backend"""
+    client = MemoryClient() if storage_backend == "memory" else SQLiteClient(str(tmp_path / "storage.sqlite3"))
+    yield client["test"]
+    client.close()
+
+
+@pytest.fixture
+def load_server(storage_backend, tmp_path, monkeypatch):
+    """Import a fresh server module on the storage backend, with settings taken from keyword arguments.
+
+    server.py reads its settings and builds its repositories at import time, so every
+    test gets its own module and its own (empty) storage.
+    """
+    def load(**settings):
+        monkeypatch.setenv("STORAGE_BACKEND", storage_backend)
+        monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "server.sqlite3"))
+        for name, value in settings.items():
+            monkeypatch.setenv(name, str(value))
+        sys.modules.pop("server", None)
+        return importlib.import_module("server")
+    yield load
+    sys.modules.pop("server", None)
+
+
+@pytest.fixture
+def server(load_server):
+    return load_server()
+
+
+@pytest.fixture
+def client(server):
+    with TestClient(server.app) as client:
+        yield client
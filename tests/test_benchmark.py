@@ -0,0 +1,56 @@
+import importlib
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def benchmark_module(monkeypatch):
+    monkeypatch.syspath_prepend(str(ROOT_DIR))
+    monkeypatch.setenv("MONGO_URL", "mongodb://localhost:27017")
+    monkeypatch.setenv("DB_NAME", "benchmark_test")
+    sys.modules.pop("server", None)
+    yield importlib.import_module("backend_benchmark")
+    sys.modules.pop("backend_benchmark", None)
+    sys.modules.pop("server", None)
+
+
+def test_percentiles_use_the_nearest_rank(benchmark_module):
+    values = [float(i) for i in range(1, 101)]
+    assert benchmark_module.percentile(values, 50) == 50.0
+    assert benchmark_module.percentile(values, 99) == 99.0
+    assert benchmark_module.percentile([], 95) == 0.0
+
+
+def test_regressions_beyond_the_threshold_are_reported(benchmark_module):
+    benchmark = benchmark_module.BackendBenchmark(10, [1])
+    benchmark.results = {
+        "GET /api/site": {"1": {"p95_ms": 1.2, "rps": 900.0, "errors": 0}},
+        "GET /api/status": {"1": {"p95_ms": 2.0, "rps": 500.0, "errors": 1}},
+        "GET /api/new": {"1": {"p95_ms": 9.0, "rps": 1.0, "errors": 0}},
+    }
+    baseline = {"routes": {
+        "GET /api/site": {"1": {"p95_ms": 1.0, "rps": 1000.0, "errors": 0}},
+        "GET /api/status": {"1": {"p95_ms": 1.0, "rps": 1000.0, "errors": 0}},
+    }}
+    assert benchmark.compare(baseline, 0.25) == [
+        "GET /api/status c=1: p95 1.00ms -> 2.00ms",
+        "GET /api/status c=1: throughput 1000.0 -> 500.0 req/s",
+        "GET /api/status c=1: 1 errors",
+    ]
+
+
+def test_benchmark_runs_end_to_end(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    command = [sys.executable, "backend_benchmark.py", "--requests", "5", "--concurrency", "1"]
+    subprocess.run(command + ["--save-baseline", str(baseline)], cwd=ROOT_DIR, check=True, capture_output=True)
+    routes = json.loads(baseline.read_text())["routes"]
+    assert all(levels["1"]["requests"] == 5 and levels["1"]["errors"] == 0 for levels in routes.values())
+
+    compared = subprocess.run(command + ["--baseline", str(baseline), "--threshold", "100"], cwd=ROOT_DIR, capture_output=True)
+    assert compared.returncode == 0
@@ -0,0 +1,83 @@
+import pytest
+
+from storage import MemoryClient
+
+
+def partnership(name):
+    return {"name": name, "role": "Sponsor", "logo": "x", "handle": f"@{name}"}
+
+
+def test_partnership_bulk_mixed_operations(client):
+    existing = client.post("/api/partnerships", json=partnership("old")).json()
+    doomed = client.post("/api/partnerships", json=partnership("doomed")).json()
+
+    response = client.post("/api/partnerships/bulk", json={
+        "create": [partnership("new")],
+        "update": [{"id": existing["id"], "role": "Partner"}, {"id": "missing", "role": "Partner"}],
+        "delete": [doomed["id"], "missing"],
+    })
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["op"], r["status"]) for r in results] == [
+        ("create", "created"),
+        ("update", "updated"),
+        ("update", "not_found"),
+        ("delete", "deleted"),
+        ("delete", "deleted"),
+    ]
+
+    stored = {item["id"]: item for item in client.get("/api/partnerships").json()}
+    assert stored[results[0]["id"]]["name"] == "new"
+    assert stored[existing["id"]]["role"] == "Partner"
+    assert doomed["id"] not in stored
+
+
+def test_bulk_update_without_fields_fails_that_item_only(client):
+    existing = client.post("/api/partnerships", json=partnership("old")).json()
+    results = client.post("/api/partnerships/bulk", json={
+        "create": [partnership("new")],
+        "update": [{"id": existing["id"]}],
+    }).json()["results"]
+    assert [r["status"] for r in results] == ["created", "failed"]
+    assert results[1]["detail"] == "No fields to update"
+
+
+def test_social_media_bulk(client):
+    before = client.get("/api/social-media").json()
+    results = client.post("/api/social-media/bulk", json={
+        "create": [{"platform": "Kick", "url": "https://kick.com/x", "icon": "kick", "color": "#53fc18"}],
+        "delete": [before[0]["id"]],
+    }).json()["results"]
+    assert [r["status"] for r in results] == ["created", "deleted"]
+
+    after = {item["id"] for item in client.get("/api/social-media").json()}
+    assert results[0]["id"] in after and before[0]["id"] not in after
+
+
+def test_bulk_rejects_oversized_requests(server, client):
+    before = len(client.get("/api/partnerships").json())
+    items = [partnership(str(i)) for i in range(server.MAX_BULK_ITEMS + 1)]
+    assert client.post("/api/partnerships/bulk", json={"create": items}).status_code == 413
+    assert len(client.get("/api/partnerships").json()) == before
+
+
+@pytest.mark.anyio
+async def test_bulk_updates_are_read_back_only_for_listeners_that_need_them(server):
+    repo = server.Repository(MemoryClient()["site"], "partnerships", server.Partnership)
+    bumps = []
+    repo.add_listener(lambda repo, operation, doc_id, document: bumps.append(operation), documents=False)
+    created = await repo.insert(server.Partnership(**partnership("p")))
+    reads = []
+    find = repo.collection.find
+    repo.collection.find = lambda *args, **kwargs: reads.append(args) or find(*args, **kwargs)
+
+    results = await repo.bulk_write([], [(created.id, {"role": "Partner"})], [])
+    assert [r["status"] for r in results] == ["updated"] and reads == []
+    results = await repo.bulk_write([], [(created.id, {"role": "Sponsor"}), ("missing", {"role": "x"})], [])
+    assert [r["status"] for r in results] == ["updated", "not_found"] and len(reads) == 1
+
+    documents = []
+    repo.add_listener(lambda repo, operation, doc_id, document: documents.append(document.role))
+    await repo.bulk_write([], [(created.id, {"role": "Partner"})], [])
+    assert documents == ["Partner"] and len(reads) == 2
+    assert bumps == ["insert", "update", "update", "update"]
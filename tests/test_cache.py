@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def test_reads_are_served_from_the_cache_until_a_write(client):
+    assert client.get("/api/biography").json()["name"] == "LadyPi89"
+    client.get("/api/biography")
+    stats = client.get("/api/cache/stats").json()
+    assert (stats["misses"], stats["hits"]) == (1, 1)
+
+    # Writes prime the cache with the written document, so the next read is a hit
+    client.put("/api/biography", json={"name": "Renamed"})
+    assert client.get("/api/biography").json()["name"] == "Renamed"
+    after = client.get("/api/cache/stats").json()
+    assert (after["misses"], after["hits"]) == (1, 2)
+    assert after["invalidations"] > stats["invalidations"]
+
+
+def test_streaming_status_updates_invalidate_the_cache(client):
+    assert client.get("/api/streaming-status").json()["status"] == "offline"
+    client.put("/api/streaming-status", params={"status": "streaming"})
+    assert client.get("/api/streaming-status").json()["status"] == "streaming"
+
+
+def test_entries_expire_after_the_ttl(load_server):
+    server = load_server(SINGLETON_CACHE_TTL=0.05)
+    with TestClient(server.app) as client:
+        client.get("/api/biography")
+        time.sleep(0.1)
+        client.get("/api/biography")
+        assert client.get("/api/cache/stats").json()["misses"] == 2
+
+
+@pytest.mark.anyio
+async def test_a_load_racing_an_invalidation_is_not_cached(server):
+    cache = server.SingletonCache(60)
+    loaded = asyncio.Event()
+
+    async def slow_loader():
+        loaded.set()
+        await asyncio.sleep(0.05)
+        return "old"
+
+    pending = asyncio.ensure_future(cache.get("key", slow_loader))
+    await loaded.wait()
+    cache.invalidate("key")
+    assert await pending == "old"
+
+    async def loader():
+        return "new"
+
+    assert await cache.get("key", loader) == "new"
+    assert cache.stats()["entries"] == 1
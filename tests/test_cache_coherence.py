@@ -0,0 +1,65 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def test_polling_picks_up_writes_from_another_worker(load_server, storage_backend):
+    if storage_backend == "memory":
+        pytest.skip("memory storage isn't shared between workers")
+    settings = {"CACHE_COHERENCE": "poll", "CACHE_POLL_INTERVAL": 0.05}
+    writer, reader = load_server(**settings), load_server(**settings)
+    with TestClient(writer.app) as writer_client, TestClient(reader.app) as reader_client:
+        cached = reader_client.get("/api/biography")
+        writer_client.put("/api/biography", json={"name": "Renamed"})
+        time.sleep(0.3)
+
+        response = reader_client.get("/api/biography", headers={"if-none-match": cached.headers["etag"]})
+        assert response.status_code == 200
+        assert response.json()["name"] == "Renamed"
+        assert reader_client.get("/api/site").json()["biography"]["name"] == "Renamed"
+
+
+def test_coherence_recovers_after_failures(load_server):
+    server = load_server(CACHE_COHERENCE="poll", CACHE_POLL_INTERVAL=0.1)
+    versions = server.cache_coherence.versions
+    find_one = versions.find_one
+    calls = 0
+
+    async def flaky_find_one(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        if calls in (3, 4):
+            raise RuntimeError("boom")
+        return await find_one(*args, **kwargs)
+
+    versions.find_one = flaky_find_one
+    with TestClient(server.app) as client:
+        time.sleep(0.35)
+        health = client.get("/api/health").json()
+        assert health["status"] == "degraded"
+        assert health["cache_coherence"]["last_error"] == "RuntimeError('boom')"
+
+        time.sleep(0.8)
+        assert client.get("/api/health").json()["status"] == "ok"
+        stats = server.cache_coherence.stats()
+        assert (stats["strategy"], stats["failures"]) == ("polling", 2)
+
+
+def test_invalid_document_from_another_worker_drops_the_cached_copy(client, server):
+    etag = client.get("/api/biography").headers["etag"]
+    server.cache_coherence.apply("biography", {"id": "x", "name": None})
+    assert "biography" not in server.singleton_cache._entries
+    # Reloaded from the database, which still holds the same document
+    assert client.get("/api/biography", headers={"if-none-match": etag}).status_code == 304
+    assert client.get("/api/biography").json()["name"] == "LadyPi89"
+
+
+@pytest.mark.anyio
+async def test_writes_are_only_marked_when_coherence_is_on(server):
+    on = server.CacheCoherence(server.db, ["biography"], "poll", 1)
+    off = server.CacheCoherence(server.db, ["biography"], "off", 1)
+    await off.mark("biography")
+    assert await server.db.cache_versions.find_one({"id": "versions"}) is None
+    await on.mark("biography")
+    assert (await server.db.cache_versions.find_one({"id": "versions"}))["biography"] == on._seen["biography"]
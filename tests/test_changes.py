@@ -0,0 +1,159 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from pymongo.errors import AutoReconnect
+
+from changelog import ChangeLog
+
+SOCIAL_MEDIA = {"platform": "P", "url": "https://p.com", "icon": "i", "color": "#000"}
+
+
+def make_log(database, **settings):
+    options = dict(retention=60, compact_interval=60, compact_batch=3, settle=0)
+    options.update(settings)
+    return ChangeLog(database, **options)
+
+
+@pytest.mark.anyio
+async def test_appends_get_increasing_sequence_numbers(database):
+    log = make_log(database)
+    for i in range(3):
+        await log.append("social_media", "insert", f"d{i}", {"id": f"d{i}", **SOCIAL_MEDIA})
+    await log.append("social_media", "delete", "d0")
+
+    entries, has_more = await log.read(0, 100)
+    assert [(entry["seq"], entry["op"], entry["doc_id"]) for entry in entries] == [
+        (1, "upsert", "d0"), (2, "upsert", "d1"), (3, "upsert", "d2"), (4, "delete", "d0"),
+    ]
+    assert entries[0]["document"]["url"] == "https://p.com"
+    assert "document" not in entries[3]
+    assert not has_more
+    assert await log.head() == 4
+    entries, has_more = await log.read(1, 2)
+    assert [entry["seq"] for entry in entries] == [2, 3] and has_more
+
+
+@pytest.mark.anyio
+async def test_concurrent_appends_share_sequence_reservations(database):
+    log = make_log(database)
+    await asyncio.gather(*(log.append("social_media", "insert", f"d{i}", {"id": f"d{i}"}) for i in range(10)))
+    entries, has_more = await log.read(0, 100)
+    assert [entry["seq"] for entry in entries] == list(range(1, 11))
+    assert not has_more
+    assert log.stats()["batches"] < 10
+    assert await log.head() == 10
+
+
+@pytest.mark.anyio
+async def test_entries_are_scoped_to_their_tenant(database):
+    log = make_log(database)
+    await log.append("partnerships", "insert", "a", {"id": "a"}, tenant="t1")
+    await log.append("partnerships", "insert", "b", {"id": "b"}, tenant="t2")
+    await log.append("partnerships", "delete", "a", tenant="t1")
+    entries, _ = await log.read(0, 100, "t1")
+    assert [(entry["doc_id"], entry["op"], "document" in entry) for entry in entries] == [
+        ("a", "upsert", True), ("a", "delete", False),
+    ]
+    assert await log.head("t2") == 2
+    assert await log.head() == 0
+
+
+@pytest.mark.anyio
+async def test_compaction_keeps_only_the_latest_entry_per_document(database):
+    log = make_log(database)
+    for i in range(4):
+        await log.append("social_media", "update", "x", {"id": "x", "n": i})
+    await log.append("social_media", "insert", "y", {"id": "y"})
+    await log.append("social_media", "update", "x", {"id": "x", "n": 4})
+
+    assert await log.compact() == 4
+    entries, _ = await log.read(0, 100)
+    assert [(entry["doc_id"], entry["seq"]) for entry in entries] == [("y", 5), ("x", 6)]
+    # Tombstones within the retention window are kept, and tokens stay valid
+    await log.append("social_media", "delete", "y")
+    assert await log.compact() == 1
+    assert await log.horizon() == 0
+
+
+@pytest.mark.anyio
+async def test_expired_tombstones_expire_the_tokens_before_them(database):
+    log = make_log(database, retention=0.05)
+    await log.append("social_media", "insert", "x", {"id": "x"})
+    await log.append("social_media", "delete", "x")
+    await log.append("social_media", "insert", "y", {"id": "y"})
+    await asyncio.sleep(0.1)
+
+    await log.compact()
+    assert await log.horizon() == 2
+    entries, _ = await log.read(0, 100)
+    assert [entry["doc_id"] for entry in entries] == ["y"]
+
+
+@pytest.mark.anyio
+async def test_a_lost_append_forces_clients_to_resync(database):
+    log = make_log(database)
+    await log.append("social_media", "insert", "x", {"id": "x"})
+    insert_many = log.collection.insert_many
+
+    async def unavailable(*args, **kwargs):
+        raise AutoReconnect("down")
+
+    log.collection.insert_many = unavailable
+    await log.append("social_media", "update", "x", {"id": "x"})
+    log.collection.insert_many = insert_many
+
+    assert log.stats()["lost"] == 1
+    assert await log.horizon() > 1
+    assert await log.head() == await log.horizon()
+
+
+def test_change_feed(load_server):
+    server = load_server(CHANGE_FEED_SETTLE=0.5, CHANGE_LOG_RETENTION=0.5)
+    with TestClient(server.app) as client:
+        token = client.get("/api/changes").json()["next_token"]
+        partnership = client.post("/api/partnerships", json={"name": "X", "role": "r", "logo": "l", "handle": "h"}).json()
+        client.put(f"/api/partnerships/{partnership['id']}", json={"name": "Y"})
+        client.post("/api/social-media", json=SOCIAL_MEDIA)
+        # Entries are held back until they settle
+        assert client.get("/api/changes", params={"since": token}).json()["changes"] == []
+        time.sleep(0.6)
+
+        page = client.get("/api/changes", params={"since": token, "limit": 2}).json()
+        assert [(change["op"], change["collection"]) for change in page["changes"]] == [
+            ("upsert", "partnerships"), ("upsert", "partnerships"),
+        ]
+        assert page["changes"][1]["document"]["name"] == "Y"
+        assert page["has_more"]
+        page = client.get("/api/changes", params={"since": page["next_token"]}).json()
+        assert [change["collection"] for change in page["changes"]] == ["social_media"]
+        assert not page["has_more"]
+
+        client.delete(f"/api/partnerships/{partnership['id']}")
+        time.sleep(0.6)
+        page = client.get("/api/changes", params={"since": page["next_token"]}).json()
+        assert [(change["op"], change["id"], change["document"]) for change in page["changes"]] == [
+            ("delete", partnership["id"], None),
+        ]
+
+        time.sleep(0.5)
+        client.portal.call(server.change_log.compact)
+        assert client.get("/api/changes", params={"since": token}).status_code == 410
+        assert client.get("/api/changes", params={"since": "abc"}).status_code == 400
+        head = client.get("/api/changes").json()["next_token"]
+        assert client.get("/api/changes", params={"since": head}).status_code == 200
+
+
+def test_bulk_writes_are_logged_in_few_batches(load_server):
+    server = load_server(CHANGE_FEED_SETTLE=0)
+    with TestClient(server.app) as client:
+        token = client.get("/api/changes").json()["next_token"]
+        response = client.post("/api/social-media/bulk", json={
+            "create": [{**SOCIAL_MEDIA, "platform": f"P{i}"} for i in range(10)],
+        })
+        assert response.status_code == 200
+        stats = client.get("/api/changes/stats").json()
+        assert stats["appended"] == 10
+        assert stats["batches"] < 10
+        assert len(client.get("/api/changes", params={"since": token}).json()["changes"]) == 10
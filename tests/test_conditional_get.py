@@ -0,0 +1,109 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from storage import MemoryClient
+
+
+@pytest.mark.parametrize("path", ["/api/biography", "/api/partnerships", "/api/site", "/api/status"])
+def test_unchanged_resources_answer_304(client, path):
+    first = client.get(path)
+    assert first.status_code == 200 and first.headers["etag"]
+    second = client.get(path, headers={"if-none-match": first.headers["etag"]})
+    assert second.status_code == 304
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.content == b""
+
+
+def test_writes_change_the_etag(client):
+    etag = client.get("/api/partnerships").headers["etag"]
+    client.post("/api/partnerships", json={"name": "P1", "role": "Sponsor", "logo": "x", "handle": "@p1"})
+    fresh = client.get("/api/partnerships", headers={"if-none-match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert client.get("/api/site", headers={"if-none-match": etag}).status_code == 200
+
+
+def test_buffered_status_writes_change_the_etag(load_server):
+    server = load_server(STATUS_FLUSH_INTERVAL=0.01)
+    with TestClient(server.app) as client:
+        etag = client.get("/api/status").headers["etag"]
+        client.post("/api/status", json={"client_name": "a"})
+        client.portal.call(asyncio.sleep, 0.1)
+        assert client.get("/api/status", headers={"if-none-match": etag}).status_code == 200
+
+
+def test_query_strings_get_their_own_etag(client):
+    for i in range(2):
+        client.post("/api/contact", json={"name": f"N{i}", "email": f"n{i}@example.com", "message": f"hello {i}"})
+    one = client.get("/api/contact?limit=1").headers["etag"]
+    assert one != client.get("/api/contact?limit=2").headers["etag"]
+    assert client.get("/api/contact?limit=1", headers={"if-none-match": one}).status_code == 304
+
+
+def test_etags_match_across_workers_and_restarts(load_server, storage_backend):
+    if storage_backend == "memory":
+        pytest.skip("memory storage isn't shared between servers")
+    etags = []
+    for worker in range(2):
+        server = load_server()
+        with TestClient(server.app) as client:
+            if worker:
+                response = client.get("/api/social-media", headers={"if-none-match": etags[0]})
+                assert response.status_code == 304
+            etags.append(client.get("/api/social-media").headers["etag"])
+    assert etags[0] == etags[1]
+
+
+def test_lagging_secondary_reads_never_keep_a_stale_etag(server, client, monkeypatch):
+    replica = MemoryClient()["site"]
+    monkeypatch.setattr(server, "public_db", replica)
+    monkeypatch.setattr(server.partnership_repo, "public_collection", replica["partnerships"])
+    partnership = {"name": "P1", "role": "Sponsor", "logo": "x", "handle": "@p1"}
+    etag = client.get("/api/partnerships").headers["etag"]
+    created = client.post("/api/partnerships", json=partnership).json()
+    # The secondary hasn't seen the write yet, so the old body is still current
+    assert client.get("/api/partnerships", headers={"if-none-match": etag}).status_code == 304
+    client.portal.call(replica["partnerships"].insert_one, dict(created))
+    fresh = client.get("/api/partnerships", headers={"if-none-match": etag})
+    assert fresh.status_code == 200
+    assert [p["id"] for p in fresh.json()] == [created["id"]]
+
+
+def test_cache_control_depends_on_the_route(client):
+    assert client.get("/api/biography").headers["cache-control"] == "public, no-cache"
+    assert client.get("/api/contact").headers["cache-control"] == "private, no-cache"
+    assert "etag" not in client.get("/api/cache/stats").headers
+
+
+def test_if_none_match_lists_and_weak_tags(server):
+    assert server.etag_matches('"a", W/"b"', '"b"')
+    assert server.etag_matches("*", '"b"')
+    assert not server.etag_matches('"a"', '"b"')
+
+
+@pytest.mark.anyio
+async def test_site_etag_never_labels_the_profile_being_rebuilt(server, monkeypatch):
+    await server.app.router.startup()
+    try:
+        collection = server.site_profile_builder.collection
+        replace_one = collection.replace_one
+
+        async def slow_replace_one(*args, **kwargs):
+            await asyncio.sleep(0.1)
+            return await replace_one(*args, **kwargs)
+
+        monkeypatch.setattr(collection, "replace_one", slow_replace_one)
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            update = asyncio.ensure_future(client.put("/api/biography", json={"name": "NEW"}))
+            await asyncio.sleep(0.03)
+            during = await client.get("/api/site")
+            await update
+            after = await client.get("/api/site", headers={"if-none-match": during.headers["etag"]})
+            assert after.status_code == 200
+            assert after.json()["biography"]["name"] == "NEW"
+    finally:
+        await server.app.router.shutdown()
@@ -0,0 +1,86 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+
+def contact(i, **overrides):
+    return {"name": f"N{i}", "email": f"n{i}@example.com", "message": f"hello {i}", **overrides}
+
+
+def test_bursts_from_one_address_are_rate_limited(load_server):
+    server = load_server(CONTACT_RATE_BURST=2)
+    with TestClient(server.app) as client:
+        assert client.post("/api/contact", json=contact(1)).status_code == 200
+        assert client.post("/api/contact", json=contact(2)).status_code == 200
+        limited = client.post("/api/contact", json=contact(3))
+        assert limited.status_code == 429
+        assert int(limited.headers["retry-after"]) > 0
+        assert client.get("/api/contact/stats").json() == {"allowed": 4, "rate_limited": 1, "duplicates": 0}
+
+
+def test_repeated_submissions_are_rejected(client):
+    assert client.post("/api/contact", json=contact(1)).status_code == 200
+    repeat = contact(1, name="  n1 ", message="HELLO   1")
+    assert client.post("/api/contact", json=repeat).status_code == 409
+    assert client.get("/api/contact/stats").json()["duplicates"] == 1
+    assert len(client.get("/api/contact").json()["items"]) == 1
+
+
+def test_the_database_rejects_duplicates_the_memory_table_forgot(server, client):
+    # Startup builds indexes in the background; make sure the unique hash index exists
+    client.portal.call(server.ensure_indexes, server.db)
+    assert client.post("/api/contact", json=contact(1)).status_code == 200
+    server.contact_hashes._seen.clear()
+    assert client.post("/api/contact", json=contact(1)).status_code == 409
+
+
+def test_limiter_and_hash_tables_stay_bounded(server):
+    limiter = server.TokenBucketLimiter(burst=1, rate_per_second=0, max_keys=2)
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == float("inf")
+    limiter.acquire("b")
+    limiter.acquire("c")
+    assert limiter.acquire("a") == 0  # evicted, so it starts with a full bucket
+
+    hashes = server.RecentHashes(window=60, max_entries=2)
+    assert not hashes.seen("x")
+    assert hashes.seen("x")
+    hashes.seen("y")
+    hashes.seen("z")
+    assert len(hashes._seen) == 2
+
+
+def test_database_dedup_expires_with_its_window(load_server, monkeypatch):
+    server = load_server(CONTACT_DEDUP_WINDOW=60)
+    monkeypatch.setattr(server.time, "time", lambda: 1000.0)
+    first = server.contact_content_hash("n", "a@example.com", "hello")
+    monkeypatch.setattr(server.time, "time", lambda: 1019.0)
+    assert server.contact_content_hash("N ", "A@example.com", "hello") == first
+    monkeypatch.setattr(server.time, "time", lambda: 1021.0)
+    assert server.contact_content_hash("n", "a@example.com", "hello") != first
+
+
+@pytest.mark.parametrize("peer, forwarded_for, expected", [
+    ("10.1.2.3", "9.9.9.9, 1.2.3.4, 10.0.0.5", "1.2.3.4"),
+    ("10.1.2.3", "127.0.0.1, 10.0.0.5", "127.0.0.1"),
+    ("8.8.8.8", "1.2.3.4", "8.8.8.8"),
+    ("127.0.0.1", None, "127.0.0.1"),
+])
+def test_client_address_trusts_only_configured_proxies(load_server, peer, forwarded_for, expected):
+    server = load_server(TRUSTED_PROXIES="127.0.0.1,10.0.0.0/8")
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    request = Request({"type": "http", "client": (peer, 1234), "headers": headers})
+    assert server.client_address(request) == expected
+
+
+def test_forwarded_for_from_an_untrusted_peer_is_warned_about_once(server, caplog):
+    request = Request({"type": "http", "client": ("10.1.2.3", 1234), "headers": [(b"x-forwarded-for", b"1.2.3.4")]})
+    with caplog.at_level(logging.WARNING):
+        assert server.client_address(request) == "10.1.2.3"
+        assert server.client_address(request) == "10.1.2.3"
+    assert [r.getMessage() for r in caplog.records if "TRUSTED_PROXIES" in r.getMessage()] == [
+        "Ignoring X-Forwarded-For from 10.1.2.3: TRUSTED_PROXIES is empty, so clients are identified by their "
+        "peer address. Set TRUSTED_PROXIES to the reverse proxy's IPs or CIDR ranges if this server runs behind one."
+    ]
@@ -0,0 +1,38 @@
+from fastapi.testclient import TestClient
+
+
+def test_database_endpoints_project_the_requested_fields(client):
+    items = client.get("/api/social-media", params={"fields": "platform,url"}).json()
+    assert len(items) == 7
+    assert all(set(item) == {"platform", "url"} for item in items)
+
+    partnerships = client.get("/api/partnerships", params={"fields": "name"}).json()
+    assert partnerships and all(set(item) == {"name"} for item in partnerships)
+
+
+def test_cached_endpoints_trim_the_serialized_document(client):
+    full = client.get("/api/biography").json()
+    trimmed = client.get("/api/biography", params={"fields": "name"}).json()
+    assert trimmed == {"name": full["name"]}
+
+    status = client.get("/api/streaming-status", params={"fields": "platform,status"}).json()
+    assert set(status) == {"platform", "status"}
+
+
+def test_paged_endpoints_keep_the_cursor_working(load_server):
+    server = load_server(CONTACT_RATE_BURST=100)
+    with TestClient(server.app) as client:
+        for i in range(5):
+            assert client.post("/api/contact", json={"name": f"N{i}", "email": f"n{i}@example.com",
+                                                     "message": f"hello {i}"}).status_code == 200
+        page = client.get("/api/contact", params={"limit": 2, "fields": "email,status"}).json()
+        assert page["items"] == [{"email": "n4@example.com", "status": "new"},
+                                 {"email": "n3@example.com", "status": "new"}]
+        following = client.get("/api/contact", params={"limit": 2, "fields": "email",
+                                                       "cursor": page["next_cursor"]}).json()
+        assert following["items"] == [{"email": "n2@example.com"}, {"email": "n1@example.com"}]
+
+
+def test_unknown_or_empty_field_lists_are_rejected(client):
+    assert client.get("/api/social-media", params={"fields": "platform,nope"}).status_code == 400
+    assert client.get("/api/biography", params={"fields": ","}).status_code == 400
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import ServerSelectionTimeoutError
+
+from storage import MemoryClient
+
+
+class PingCounter:
+    def __init__(self, error=None):
+        self.pings = 0
+        self.error = error
+        self.read_preference = None
+
+    async def command(self, name, **kwargs):
+        assert name == "ping"
+        self.pings += 1
+        if self.error:
+            raise self.error
+        return {"ok": 1}
+
+
+def test_health_reports_the_storage_backend(client, storage_backend):
+    assert client.get("/api/health").json() == {"status": "ok", "storage": storage_backend}
+
+
+def test_health_is_503_when_mongo_is_unreachable(server, client, monkeypatch):
+    monkeypatch.setattr(server, "STORAGE_BACKEND", "mongo")
+    monkeypatch.setattr(server, "db", PingCounter(ServerSelectionTimeoutError("no primary")))
+    response = client.get("/api/health")
+    assert response.status_code == 503
+    assert (response.json()["status"], response.json()["detail"]) == ("unavailable", "no primary")
+
+
+@pytest.mark.anyio
+async def test_warm_up_pings_each_target_concurrently(server, monkeypatch):
+    primary, secondary = PingCounter(), PingCounter()
+    monkeypatch.setattr(server, "STORAGE_BACKEND", "mongo")
+    monkeypatch.setattr(server, "MONGO_WARMUP_CONNECTIONS", 3)
+    monkeypatch.setattr(server, "db", primary)
+    monkeypatch.setattr(server, "public_db", secondary)
+    await server.warm_up_connections()
+    assert (primary.pings, secondary.pings) == (3, 3)
+
+
+def test_pool_stats_follow_connection_events(server):
+    stats = server.PoolStats()
+    event = SimpleNamespace(address=("mongo", 27017))
+    stats.pool_created(event)
+    stats.connection_created(event)
+    stats.connection_check_out_started(event)
+    stats.connection_checked_out(event)
+    stats.connection_check_out_started(event)
+    stats.connection_check_out_failed(event)
+    assert stats.snapshot() == {"mongo:27017": {
+        "open": 1, "in_use": 1, "waiting": 0, "checkouts": 1, "checkout_failures": 1, "cleared": 0,
+    }}
+    stats.connection_checked_in(event)
+    stats.connection_closed(event)
+    assert stats.snapshot()["mongo:27017"]["open"] == 0
+
+
+@pytest.mark.anyio
+async def test_public_reads_use_the_read_database(server):
+    primary, replica = MemoryClient()["site"], MemoryClient()["site"]
+    repo = server.Repository(primary, "partnerships", server.Partnership, read_database=replica)
+    created = await repo.insert(server.Partnership(name="P", role="r", logo="x", handle="@p"))
+    # The replica hasn't caught up, so only the primary sees the write
+    assert await repo.find_one({"id": created.id}, public=True) is None
+    assert (await repo.find_one({"id": created.id})).name == "P"
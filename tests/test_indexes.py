@@ -0,0 +1,32 @@
+import pytest
+from pymongo import IndexModel
+
+
+@pytest.mark.anyio
+async def test_missing_indexes_are_created_once(server):
+    report = await server.ensure_indexes(server.db)
+    assert set(report) == set(server.INDEX_REGISTRY)
+    assert report["contact_forms"] == {"created": ["id_unique", "created_at_id", "content_hash_unique"], "existing": [], "failed": []}
+
+    report = await server.ensure_indexes(server.db)
+    assert all(not result["created"] and not result["failed"] for result in report.values())
+    assert report["status_checks"]["existing"] == ["id_unique", "timestamp_id"]
+
+
+@pytest.mark.anyio
+async def test_a_failing_index_is_reported_and_the_rest_still_built(server):
+    await server.db.contact_forms.insert_many([{"id": "1", "content_hash": "same"}, {"id": "2", "content_hash": "same"}])
+    report = await server.ensure_indexes(server.db)
+    assert report["contact_forms"]["failed"] == ["content_hash_unique"]
+    assert report["contact_forms"]["created"] == ["id_unique", "created_at_id"]
+    assert report["social_media"]["created"] == ["id_unique"]
+
+
+def test_every_paginated_sort_is_covered_by_an_index(server):
+    keys = {
+        collection_name: [list(index.document["key"].items()) for index in indexes]
+        for collection_name, indexes in server.INDEX_REGISTRY.items()
+    }
+    assert [("created_at", -1), ("id", -1)] in keys["contact_forms"]
+    assert [("timestamp", -1), ("id", -1)] in keys["status_checks"]
+    assert all(isinstance(index, IndexModel) for indexes in server.INDEX_REGISTRY.values() for index in indexes)
@@ -0,0 +1,224 @@
+import asyncio
+import socketserver
+import threading
+import time
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+import pytest
+from fastapi.testclient import TestClient
+
+from jobs import JobQueue
+from mailer import SMTPNotifier
+
+
+def make_queue(database, **settings):
+    options = dict(workers=1, batch_size=20, linger=0.05, poll_interval=0.05, max_attempts=2,
+                   retry_base=0.05, retry_max=1, lease=60)
+    options.update(settings)
+    return JobQueue(database.jobs, database.jobs_dead_letter, **options)
+
+
+async def wait_for(condition, timeout=3):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+@pytest.mark.anyio
+async def test_jobs_enqueued_together_run_as_one_batch(database):
+    queue = make_queue(database)
+    batches = []
+
+    async def handler(payloads):
+        batches.append(payloads)
+
+    queue.register("mail", handler)
+    queue.start()
+    try:
+        for i in range(5):
+            await queue.enqueue("mail", {"n": i})
+        await wait_for(lambda: queue.completed == 5)
+    finally:
+        await queue.stop()
+    assert batches == [[{"n": i} for i in range(5)]]
+    assert await database.jobs.find({}).to_list(None) == []
+
+
+@pytest.mark.anyio
+async def test_failed_batches_are_retried(database):
+    queue = make_queue(database)
+    attempts = []
+
+    async def handler(payloads):
+        attempts.append(payloads)
+        if len(attempts) == 1:
+            raise RuntimeError("smtp down")
+
+    queue.register("mail", handler)
+    queue.start()
+    try:
+        await queue.enqueue("mail", {"n": 1})
+        await wait_for(lambda: queue.completed == 1)
+    finally:
+        await queue.stop()
+    assert attempts == [[{"n": 1}], [{"n": 1}]]
+    assert (queue.retried, queue.dead_lettered) == (1, 0)
+
+
+@pytest.mark.anyio
+async def test_jobs_out_of_attempts_are_dead_lettered(database):
+    queue = make_queue(database)
+
+    async def handler(payloads):
+        raise RuntimeError("bad job")
+
+    queue.register("mail", handler)
+    queue.start()
+    try:
+        await queue.enqueue("mail", {"n": "bad"})
+        await wait_for(lambda: queue.dead_lettered == 1)
+    finally:
+        await queue.stop()
+    dead = await database.jobs_dead_letter.find({}, {"_id": 0}).to_list(None)
+    assert [(job["payload"], job["attempts"], job["last_error"]) for job in dead] == [({"n": "bad"}, 2, "bad job")]
+    assert await database.jobs.find({}).to_list(None) == []
+
+
+@pytest.mark.anyio
+async def test_a_failing_job_is_retried_and_dead_lettered_alone(database):
+    queue = make_queue(database)
+    delivered = []
+
+    async def handler(payloads):
+        if any(payload["n"] == "bad" for payload in payloads):
+            raise RuntimeError("bad job")
+        delivered.extend(payload["n"] for payload in payloads)
+
+    queue.register("mail", handler)
+    queue.start()
+    try:
+        for n in ["a", "bad", "b"]:
+            await queue.enqueue("mail", {"n": n})
+        await wait_for(lambda: queue.dead_lettered == 1)
+    finally:
+        await queue.stop()
+    assert sorted(delivered) == ["a", "b"]
+    assert (queue.completed, queue.retried) == (2, 1)
+    dead = await database.jobs_dead_letter.find({}, {"_id": 0}).to_list(None)
+    assert [(job["payload"], job["attempts"]) for job in dead] == [({"n": "bad"}, 2)]
+
+
+@pytest.mark.anyio
+async def test_jobs_of_a_dead_worker_run_once_their_lease_expires(database):
+    queue = make_queue(database)
+    past = datetime.utcnow() - timedelta(seconds=1)
+    await database.jobs.insert_many([
+        {"id": "expired", "kind": "mail", "payload": {"n": 1}, "status": "running", "attempts": 0,
+         "run_at": past, "locked_until": past},
+        {"id": "leased", "kind": "mail", "payload": {"n": 2}, "status": "running", "attempts": 0,
+         "run_at": past, "locked_until": past + timedelta(minutes=5)},
+    ])
+    delivered = []
+
+    async def handler(payloads):
+        delivered.extend(payloads)
+
+    queue.register("mail", handler)
+    queue.start()
+    try:
+        await wait_for(lambda: queue.completed == 1)
+        await asyncio.sleep(0.1)
+    finally:
+        await queue.stop()
+    assert delivered == [{"n": 1}]
+    assert [job["id"] for job in await database.jobs.find({}).to_list(None)] == ["leased"]
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough of RFC 5321 for smtplib to deliver messages"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.reply("220 fake ESMTP")
+        while line := self.rfile.readline():
+            command = line.decode().strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250 fake")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                data = b""
+                while (chunk := self.rfile.readline()) != b".\r\n":
+                    data += chunk
+                self.server.messages.append(data.decode())
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), FakeSMTPHandler)
+    server.messages = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_contact_submissions_are_mailed_as_a_digest(load_server, smtp_server):
+    server = load_server(
+        SMTP_HOST="127.0.0.1", SMTP_PORT=smtp_server.server_address[1], CONTACT_NOTIFY_TO="owner@example.com",
+        JOB_BATCH_LINGER=0.2, JOB_POLL_INTERVAL=0.05, CONTACT_RATE_BURST=100,
+    )
+    with TestClient(server.app) as client:
+        for i in range(3):
+            response = client.post("/api/contact", json={"name": f"N{i}", "email": f"n{i}@example.com", "message": f"hello {i}"})
+            assert response.status_code == 200
+        deadline = time.monotonic() + 3
+        while server.job_queue.stats()["completed"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert client.get("/api/jobs/stats").json()["completed"] == 3
+
+    # Submissions that arrive within the linger window share one message
+    assert 1 <= len(smtp_server.messages) < 3
+    assert all("To: owner@example.com" in message for message in smtp_server.messages)
+    mailed = "".join(smtp_server.messages)
+    assert all(f"hello {i}" in mailed for i in range(3))
+
+
+@pytest.mark.anyio
+async def test_smtp_failures_raise_for_the_queue_to_retry():
+    with socketserver.TCPServer(("127.0.0.1", 0), socketserver.BaseRequestHandler) as closed:
+        port = closed.server_address[1]
+    notifier = SMTPNotifier("127.0.0.1", port, "", "", False, timeout=1)
+    with pytest.raises(OSError):
+        await notifier.send([EmailMessage()])
+
+
+def test_contact_notification_headers_stay_on_one_line(load_server, smtp_server):
+    server = load_server(
+        SMTP_HOST="127.0.0.1", SMTP_PORT=smtp_server.server_address[1], CONTACT_NOTIFY_TO="owner@example.com",
+        JOB_BATCH_LINGER=0.05, JOB_POLL_INTERVAL=0.05, CONTACT_RATE_BURST=100,
+    )
+    with TestClient(server.app) as client:
+        response = client.post("/api/contact", json={
+            "name": "Eve\r\nBcc: x@evil.com", "email": "eve@example.com", "message": "hello there",
+        })
+        assert response.status_code == 200
+        deadline = time.monotonic() + 3
+        while server.job_queue.stats()["completed"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert server.job_queue.stats()["dead_lettered"] == 0
+
+    assert len(smtp_server.messages) == 1
+    headers = smtp_server.messages[0].split("\r\n\r\n")[0]
+    assert "Subject: New contact form submission from Eve Bcc: x@evil.com" in headers
+    assert "\r\nBcc:" not in headers
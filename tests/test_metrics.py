@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+
+def test_requests_are_counted_per_route_template(client):
+    partnership = client.post("/api/partnerships", json={"name": "P", "role": "r", "logo": "x", "handle": "@p"}).json()
+    client.put(f"/api/partnerships/{partnership['id']}", json={"role": "s"})
+    client.put("/api/partnerships/missing", json={"role": "s"})
+    client.get("/api/nowhere")
+
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="PUT",route="/api/partnerships/{partnership_id}",status="200"} 1' in body
+    assert 'http_requests_total{method="PUT",route="/api/partnerships/{partnership_id}",status="404"} 1' in body
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in body
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/partnerships"} 1' in body
+    assert 'http_requests_in_flight{route="/metrics"} 1' in body
+    assert "singleton_cache_hits " in body and "status_check_buffer_pending 0" in body
+
+
+def test_histogram_buckets_are_cumulative(server):
+    histogram = server.Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.render("latency", 'route="/x"') == [
+        'latency_bucket{route="/x",le="0.1"} 2',
+        'latency_bucket{route="/x",le="1.0"} 3',
+        'latency_bucket{route="/x",le="+Inf"} 4',
+        'latency_sum{route="/x"} 3.65',
+        'latency_count{route="/x"} 4',
+    ]
+
+
+def test_label_values_are_escaped(server):
+    assert server.label_string(route='a"b\\c') == 'route="a\\"b\\\\c"'
+
+
+def test_mongo_commands_are_timed_per_collection(server):
+    metrics = server.CommandMetrics()
+    metrics.started(SimpleNamespace(request_id=1, command_name="find", command={"find": "biography"}))
+    metrics.succeeded(SimpleNamespace(request_id=1, command_name="find", duration_micros=2000))
+    metrics.started(SimpleNamespace(request_id=2, command_name="ping", command={"ping": 1}))
+    metrics.failed(SimpleNamespace(request_id=2, command_name="ping", duration_micros=100))
+
+    lines = metrics.render()
+    assert 'mongo_commands_total{command="find",collection="biography",outcome="success"} 1' in lines
+    assert 'mongo_commands_total{command="ping",collection="",outcome="failure"} 1' in lines
+    assert 'mongo_command_duration_seconds_sum{command="find",collection="biography"} 0.002' in lines
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+
+def read_all(client, path, limit):
+    seen, cursor = [], None
+    while True:
+        page = client.get(path, params={"limit": limit, **({"cursor": cursor} if cursor else {})}).json()
+        seen += page["items"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return seen
+
+
+def test_contact_pages_follow_the_cursor_newest_first(load_server):
+    server = load_server(CONTACT_RATE_BURST=10)
+    with TestClient(server.app) as client:
+        for i in range(7):
+            response = client.post("/api/contact", json={"name": f"N{i}", "email": f"n{i}@example.com", "message": f"hello {i}"})
+            assert response.status_code == 200
+        names = [item["name"] for item in read_all(client, "/api/contact", 3)]
+    assert names == [f"N{i}" for i in reversed(range(7))]
+
+
+def test_documents_sharing_a_timestamp_are_neither_skipped_nor_repeated(client, server):
+    at = datetime(2024, 1, 1)
+    docs = [{"id": f"{i:02d}", "client_name": f"c{i}", "timestamp": at} for i in range(5)]
+    docs.append({"id": "99", "client_name": "newest", "timestamp": datetime(2024, 1, 2)})
+    client.portal.call(server.db.status_checks.insert_many, docs)
+
+    ids = [item["id"] for item in read_all(client, "/api/status", 2)]
+    assert ids == ["99", "04", "03", "02", "01", "00"]
+
+
+def test_invalid_page_requests_are_rejected(client):
+    assert client.get("/api/contact", params={"cursor": "zzz"}).status_code == 400
+    assert client.get("/api/status", params={"limit": 0}).status_code == 422
+    assert client.get("/api/status", params={"limit": 501}).status_code == 422
+    assert client.get("/api/status").json() == {"items": [], "next_cursor": None}
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def test_broadcaster_drops_the_oldest_message_for_slow_consumers(server):
+    broadcaster = server.Broadcaster(queue_size=2)
+    queue = broadcaster.subscribe()
+    for message in ("a", "b", "c"):
+        broadcaster.publish(message)
+    assert [queue.get_nowait(), queue.get_nowait()] == ["b", "c"]
+    assert broadcaster.stats() == {"subscribers": 1, "published": 3, "dropped": 1}
+
+    broadcaster.close()
+    assert queue.get_nowait() is None
+    broadcaster.unsubscribe(queue)
+    assert broadcaster.stats()["subscribers"] == 0
+
+
+def test_websocket_sends_the_current_status_then_changes(client):
+    with client.websocket_connect("/api/streaming-status/ws") as ws:
+        first = json.loads(ws.receive_text())
+        assert (first["type"], first["data"]["status"]) == ("status", "offline")
+        assert client.get("/api/streaming-status/subscribers").json()["subscribers"] == 1
+        client.put("/api/streaming-status", params={"status": "streaming", "game": "Tetris"})
+        pushed = json.loads(ws.receive_text())
+        assert pushed["type"] == "status"
+        assert (pushed["data"]["status"], pushed["data"]["game"]) == ("streaming", "Tetris")
+    assert client.get("/api/streaming-status/subscribers").json()["subscribers"] == 0
+
+
+def test_websocket_heartbeats_while_idle(load_server):
+    server = load_server(STREAM_HEARTBEAT_SECONDS=0.05)
+    with TestClient(server.app) as client, client.websocket_connect("/api/streaming-status/ws") as ws:
+        ws.receive_text()
+        assert json.loads(ws.receive_text()) == {"type": "heartbeat"}
+
+
+class ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def test_sse_sends_the_current_status_then_changes(server, client):
+    async def read_feed():
+        response = await server.stream_streaming_status(ConnectedRequest())
+        assert response.media_type == "text/event-stream"
+        events = response.body_iterator
+        first = await events.__anext__()
+        assert first.startswith("event: streaming-status\ndata: ")
+        assert json.loads(first.split("data: ", 1)[1])["status"] == "offline"
+
+        server.streaming_status_broadcaster.publish('{"status": "streaming"}')
+        assert await events.__anext__() == 'event: streaming-status\ndata: {"status": "streaming"}\n\n'
+
+        server.streaming_status_broadcaster.close()
+        with pytest.raises(StopAsyncIteration):
+            await events.__anext__()
+
+    client.portal.call(read_feed)
+    assert server.streaming_status_broadcaster.stats()["subscribers"] == 0
+
+
+def test_sse_queues_changes_published_while_reading_the_current_status(server, client, monkeypatch):
+    current_streaming_status = server.current_streaming_status
+
+    async def publish_during_read():
+        status = await current_streaming_status()
+        server.streaming_status_broadcaster.publish('{"status": "streaming"}')
+        return status
+
+    monkeypatch.setattr(server, "current_streaming_status", publish_during_read)
+
+    async def read_feed():
+        events = (await server.stream_streaming_status(ConnectedRequest())).body_iterator
+        assert json.loads((await events.__anext__()).split("data: ", 1)[1])["status"] == "offline"
+        assert await events.__anext__() == 'event: streaming-status\ndata: {"status": "streaming"}\n\n'
+        await events.aclose()
+
+    client.portal.call(read_feed)
+    assert server.streaming_status_broadcaster.stats()["subscribers"] == 0
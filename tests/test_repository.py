@@ -0,0 +1,48 @@
+import pytest
+
+PARTNERSHIP = {"name": "P1", "role": "Sponsor", "logo": "x", "handle": "@p1", "url": "https://p1.example.com/"}
+
+
+def test_partnership_crud(client):
+    created = client.post("/api/partnerships", json=PARTNERSHIP).json()
+    assert created["url"] == "https://p1.example.com/"
+
+    updated = client.put(f"/api/partnerships/{created['id']}", json={"role": "Partner", "url": "https://new.example.com/"})
+    assert updated.status_code == 200
+    assert (updated.json()["role"], updated.json()["name"]) == ("Partner", "P1")
+    stored = [item for item in client.get("/api/partnerships").json() if item["id"] == created["id"]]
+    assert stored[0]["url"] == "https://new.example.com/"
+
+    assert client.delete(f"/api/partnerships/{created['id']}").status_code == 200
+    assert client.delete(f"/api/partnerships/{created['id']}").status_code == 404
+    assert client.put(f"/api/partnerships/{created['id']}", json={"role": "x"}).status_code == 404
+
+
+def test_contact_status_updates(client):
+    contact = client.post("/api/contact", json={"name": "n", "email": "a@example.com", "message": "hi"}).json()
+    assert client.put(f"/api/contact/{contact['id']}/status", params={"status": "read"}).status_code == 200
+    assert client.get("/api/contact").json()["items"][0]["status"] == "read"
+    assert client.put(f"/api/contact/{contact['id']}/status", params={"status": "bogus"}).status_code == 400
+    assert client.put("/api/contact/missing/status", params={"status": "read"}).status_code == 404
+
+
+def test_biography_update_keeps_unset_fields(client):
+    before = client.get("/api/biography").json()
+    after = client.put("/api/biography", json={"tagline": "New tagline"}).json()
+    assert (after["tagline"], after["name"], after["id"]) == ("New tagline", before["name"], before["id"])
+
+
+@pytest.mark.anyio
+async def test_listeners_hear_every_write(server):
+    events = []
+    repo = server.partnership_repo
+    repo.add_listener(lambda repo, operation, doc_id, document: events.append(
+        (operation, document.name if document else doc_id)
+    ))
+
+    created = await repo.insert(server.Partnership(**PARTNERSHIP))
+    await repo.update({"id": created.id}, {"name": "P2"})
+    assert await repo.update({"id": "missing"}, {"name": "P3"}) is None
+    assert await repo.delete(created.id)
+    assert not await repo.delete(created.id)
+    assert events == [("insert", "P1"), ("update", "P2"), ("delete", created.id)]
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+
+def test_startup_seeds_every_default_document(client, server):
+    for collection_name, (_, _, documents) in server.SEED_DATA.items():
+        stored = client.portal.call(lambda: server.db[collection_name].find({}).to_list(None))
+        assert len(stored) == len(documents)
+    assert len(client.get("/api/social-media").json()) == 7
+    assert client.get("/api/streaming-status").json()["status"] == "offline"
+
+
+@pytest.mark.anyio
+async def test_seeding_twice_adds_nothing(server):
+    first = await server.seed_defaults(server.db)
+    assert first == {name: len(documents) for name, (_, _, documents) in server.SEED_DATA.items()}
+    assert not any((await server.seed_defaults(server.db)).values())
+
+
+@pytest.mark.anyio
+async def test_curated_collections_are_left_alone(server):
+    await server.db.partnerships.insert_one({"id": "mine", "name": "Only One"})
+    counts = await server.seed_defaults(server.db)
+    assert counts["partnerships"] == 0
+    assert [doc["id"] for doc in await server.db.partnerships.find({}).to_list(None)] == ["mine"]
+
+
+def test_seed_ids_are_deterministic(server):
+    first = [operation._doc["$setOnInsert"]["id"] for operation in server.seed_operations("social_media")]
+    again = [operation._doc["$setOnInsert"]["id"] for operation in server.seed_operations("social_media")]
+    assert first == again
+    assert len(set(first)) == 7
+
+
+@pytest.mark.anyio
+async def test_concurrent_seeding_creates_each_default_once(server):
+    await server.ensure_indexes(server.db, server.unique_indexes([*server.SEED_DATA, "tenants"]))
+    await asyncio.gather(server.seed_defaults(server.db), server.seed_defaults(server.db))
+    for collection_name, (_, _, documents) in server.SEED_DATA.items():
+        assert len(await server.db[collection_name].find({}).to_list(None)) == len(documents)
+    assert not any((await server.seed_defaults(server.db)).values())
+
+
+def test_unique_indexes_picks_only_unique_registry_entries(server):
+    registry = server.unique_indexes(["social_media"])
+    assert list(registry) == ["social_media"]
+    assert registry["social_media"] and all(index.document["unique"] for index in registry["social_media"])
@@ -0,0 +1,81 @@
+import json
+from datetime import datetime
+from typing import List, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, HttpUrl
+
+import serialization
+from serialization import FastJSONResponse, encoder_for, model_to_dict
+
+PARTNERSHIP = {"name": "P1", "role": "Sponsor", "logo": "x", "handle": "@p1", "url": "https://p1.example.com/"}
+
+
+def list_responses(server):
+    with TestClient(server.app) as client:
+        client.post("/api/partnerships", json=PARTNERSHIP)
+        client.post("/api/contact", json={"name": "n", "email": "a@example.com", "message": "hi"})
+        return {
+            "partnerships": client.get("/api/partnerships").json(),
+            "social_media": client.get("/api/social-media").json(),
+            "contact": client.get("/api/contact").json()["items"],
+        }
+
+
+def without_generated_fields(items):
+    return [{key: value for key, value in item.items() if key not in ("id", "created_at")} for item in items]
+
+
+def test_fast_responses_match_the_model_path(load_server, tmp_path):
+    fast = list_responses(load_server(FAST_RESPONSES=1, SQLITE_PATH=tmp_path / "fast.sqlite3"))
+    slow = list_responses(load_server(FAST_RESPONSES=0, SQLITE_PATH=tmp_path / "slow.sqlite3"))
+    for name in fast:
+        assert fast[name]
+        assert [set(item) for item in fast[name]] == [set(item) for item in slow[name]]
+        assert without_generated_fields(fast[name]) == without_generated_fields(slow[name])
+
+
+def test_documents_are_projected_to_model_fields(server, client):
+    client.portal.call(server.db.partnerships.insert_one, {"id": "p", **PARTNERSHIP, "internal": "secret"})
+    stored = [item for item in client.get("/api/partnerships").json() if item["id"] == "p"]
+    assert "internal" not in stored[0] and "_id" not in stored[0]
+
+
+def test_model_to_dict_stringifies_urls_at_any_depth():
+    class Link(BaseModel):
+        url: HttpUrl
+
+    class Page(BaseModel):
+        home: Optional[HttpUrl] = None
+        main: Link
+        links: List[Link] = []
+
+    page = Page(home="https://a.example.com/", main={"url": "https://b.example.com/"}, links=[{"url": "https://c.example.com/"}])
+    assert model_to_dict(page) == {
+        "home": "https://a.example.com/",
+        "main": {"url": "https://b.example.com/"},
+        "links": [{"url": "https://c.example.com/"}],
+    }
+    assert model_to_dict(Page(main={"url": "https://b.example.com/"}))["home"] is None
+    assert encoder_for(Page) is encoder_for(Page)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_fast_json_response_renders_with_and_without_orjson(monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(serialization, "orjson", None)
+    body = FastJSONResponse({"name": "Zoë", "items": [1, 2]}).body
+    assert body.decode("utf-8").replace(" ", "") == '{"name":"Zoë","items":[1,2]}'
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_datetimes_render_as_iso_8601_with_and_without_orjson(monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(serialization, "orjson", None)
+    content = {"at": datetime(2024, 5, 1, 12, 30, 15, 250)}
+    assert json.loads(FastJSONResponse(None).render(content)) == {"at": "2024-05-01T12:30:15.000250"}
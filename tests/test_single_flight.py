@@ -0,0 +1,102 @@
+import asyncio
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+async def started(server):
+    await server.app.router.startup()
+    try:
+        yield server
+    finally:
+        await server.app.router.shutdown()
+
+
+def slow_down(monkeypatch, repo, delay=0.05):
+    find_all = repo.find_all
+    calls = []
+
+    async def slow_find_all(*args, **kwargs):
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return await find_all(*args, **kwargs)
+
+    monkeypatch.setattr(repo, "find_all", slow_find_all)
+    return calls
+
+
+def asgi_client(server):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test")
+
+
+@pytest.mark.anyio
+async def test_concurrent_identical_reads_share_one_load(started, monkeypatch):
+    server = started
+    calls = slow_down(monkeypatch, server.social_media_repo)
+    async with asgi_client(server) as client:
+        responses = await asyncio.gather(*(client.get("/api/social-media") for _ in range(5)))
+    assert len(calls) == 1
+    assert len({response.content for response in responses}) == 1
+    assert len(responses[0].json()) == 7
+    assert server.single_flight.stats()["keys"]["/api/social-media"] == {"requests": 5, "loads": 1, "collapsed": 4}
+
+
+@pytest.mark.anyio
+async def test_query_order_does_not_split_keys(server):
+    first = httpx.Request("GET", "http://test/api/biography?b=2&a=1")
+    second = httpx.Request("GET", "http://test/api/biography?a=1&b=2")
+    scope = lambda request: {"type": "http", "path": request.url.path, "query_string": request.url.query,
+                             "headers": [], "scheme": "http", "server": ("test", 80)}
+    assert server.SingleFlight.key(server.Request(scope(first))) == server.SingleFlight.key(server.Request(scope(second)))
+
+
+@pytest.mark.anyio
+async def test_a_cancelled_first_caller_does_not_cancel_the_load(started, monkeypatch):
+    server = started
+    calls = slow_down(monkeypatch, server.social_media_repo, delay=0.1)
+    async with asgi_client(server) as client:
+        first = asyncio.ensure_future(client.get("/api/social-media"))
+        await asyncio.sleep(0.02)
+        second = asyncio.ensure_future(client.get("/api/social-media"))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        response = await second
+    assert response.status_code == 200 and len(response.json()) == 7
+    assert len(calls) == 1
+
+
+@pytest.mark.anyio
+async def test_single_flight_can_be_disabled(load_server, monkeypatch):
+    server = load_server(SINGLE_FLIGHT=0)
+    await server.app.router.startup()
+    try:
+        calls = slow_down(monkeypatch, server.social_media_repo)
+        async with asgi_client(server) as client:
+            await asyncio.gather(*(client.get("/api/social-media") for _ in range(3)))
+        assert len(calls) == 3
+        assert server.single_flight.stats()["enabled"] is False
+    finally:
+        await server.app.router.shutdown()
+
+
+@pytest.mark.anyio
+async def test_a_read_after_a_write_never_joins_an_older_load(started, monkeypatch):
+    server = started
+    find_all = server.social_media_repo.find_all
+
+    async def slow_find_all(*args, **kwargs):
+        result = await find_all(*args, **kwargs)
+        if kwargs.get("public"):
+            await asyncio.sleep(0.1)
+        return result
+
+    monkeypatch.setattr(server.social_media_repo, "find_all", slow_find_all)
+    async with asgi_client(server) as client:
+        first = asyncio.ensure_future(client.get("/api/social-media"))
+        await asyncio.sleep(0.02)
+        await client.post("/api/social-media", json={"platform": "Kick", "url": "https://kick.com/x",
+                                                     "icon": "k", "color": "#0f0"})
+        response = await client.get("/api/social-media")
+        assert any(item["platform"] == "Kick" for item in response.json())
+        assert response.headers["etag"] != (await first).headers["etag"]
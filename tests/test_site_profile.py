@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+
+def test_site_combines_every_source_collection(client):
+    site = client.get("/api/site").json()
+    assert site["biography"]["name"] == "LadyPi89"
+    assert site["streaming_status"]["status"] == "offline"
+    assert len(site["social_media"]) == len(client.get("/api/social-media").json())
+    assert len(site["partnerships"]) == len(client.get("/api/partnerships").json())
+
+
+def test_site_follows_writes_to_its_sources(client):
+    seeded = client.get("/api/site").json()["partnerships"]
+    partnership = client.post("/api/partnerships", json={
+        "name": "P1", "role": "Sponsor", "logo": "x", "handle": "@p1", "url": "https://p1.example.com/",
+    }).json()
+    client.put("/api/biography", json={"name": "Renamed"})
+    client.put("/api/streaming-status", params={"status": "streaming", "game": "Tetris"})
+
+    site = client.get("/api/site").json()
+    assert site["biography"]["name"] == "Renamed"
+    assert site["streaming_status"]["game"] == "Tetris"
+    urls = {p["id"]: p["url"] for p in site["partnerships"]}
+    assert len(urls) == len(seeded) + 1
+    assert urls[partnership["id"]] == "https://p1.example.com/"
+
+    client.delete(f"/api/partnerships/{partnership['id']}")
+    assert client.get("/api/site").json()["partnerships"] == seeded
+
+
+@pytest.mark.anyio
+async def test_concurrent_refreshes_are_coalesced(server, monkeypatch):
+    builder = server.site_profile_builder
+    builds = []
+    original = builder.build
+
+    async def counting_build():
+        builds.append(1)
+        await asyncio.sleep(0.01)
+        return await original()
+
+    monkeypatch.setattr(builder, "build", counting_build)
+    await asyncio.gather(*(builder.refresh() for _ in range(10)))
+    assert len(builds) <= 2
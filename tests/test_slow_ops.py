@@ -0,0 +1,86 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+
+def find_event(request_id, filter, duration_ms=None, collection="contact_forms"):
+    if duration_ms is None:
+        return SimpleNamespace(
+            request_id=request_id, command_name="find", database_name="site",
+            command={"find": collection, "filter": filter, "lsid": {"id": 1}},
+        )
+    return SimpleNamespace(request_id=request_id, command_name="find", duration_micros=duration_ms * 1000)
+
+
+class ExplainingClient:
+    def __init__(self):
+        self.commands = []
+
+    def __getitem__(self, name):
+        return self
+
+    async def command(self, command):
+        self.commands.append(command)
+        return {
+            "queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}},
+            "executionStats": {"nReturned": 1, "executionTimeMillis": 5, "totalKeysExamined": 0, "totalDocsExamined": 40},
+        }
+
+
+def test_query_shapes_drop_literal_values(server):
+    assert server.query_shape({"status": "new", "created_at": {"$lt": "2024"}}) == {"status": 1, "created_at": {"$lt": 1}}
+    assert server.query_shape({"$or": [{"a": 1}, {"b": [1, 2]}]}) == {"$or": [{"a": 1}, {"b": 1}]}
+
+
+def test_slow_commands_are_grouped_by_shape(server):
+    log = server.SlowOpLog(threshold_ms=50, size=10)
+    token = server.current_route.set("/api/contact")
+    try:
+        log.started(find_event(1, {"status": "new"}))
+        log.started(find_event(2, {"status": "read"}))
+        log.started(find_event(3, {"status": "new"}))
+    finally:
+        server.current_route.reset(token)
+    log.succeeded(find_event(1, None, duration_ms=80))
+    log.succeeded(find_event(2, None, duration_ms=120))
+    log.succeeded(find_event(3, None, duration_ms=10))
+
+    [entry] = log.entries()
+    assert (entry["collection"], entry["shape"], entry["count"]) == ("contact_forms", {"status": 1}, 2)
+    assert (entry["max_ms"], entry["last_ms"], entry["last_route"]) == (120, 120, "/api/contact")
+
+
+def test_the_log_keeps_the_most_recent_shapes(server):
+    log = server.SlowOpLog(threshold_ms=1, size=2)
+    for request_id, field in enumerate("abc"):
+        log.started(find_event(request_id, {field: 1}))
+        log.failed(find_event(request_id, None, duration_ms=5))
+    assert [entry["shape"] for entry in log.entries()] == [{"c": 1}, {"b": 1}]
+
+
+@pytest.mark.anyio
+async def test_new_shapes_are_explained_in_the_background(server, monkeypatch):
+    explaining = ExplainingClient()
+    monkeypatch.setattr(server, "client", explaining)
+    log = server.SlowOpLog(threshold_ms=1, size=10)
+    log.start()
+
+    log.started(find_event(1, {"email": "a@example.com"}))
+    # pymongo reports command events from its own threads
+    await asyncio.to_thread(log.succeeded, find_event(1, None, duration_ms=5))
+    await asyncio.sleep(0.01)
+
+    [entry] = log.entries()
+    assert entry["explain"] == {
+        "winning_plan": {"stage": "COLLSCAN"}, "n_returned": 1, "execution_time_ms": 5,
+        "keys_examined": 0, "docs_examined": 40,
+    }
+    [command] = explaining.commands
+    assert command["verbosity"] == "executionStats"
+    assert "lsid" not in command["explain"]
+
+
+def test_slow_ops_endpoint(server, client):
+    response = client.get("/api/admin/slow-ops").json()
+    assert response == {"threshold_ms": server.SLOW_OP_THRESHOLD_MS, "operations": []}
@@ -0,0 +1,62 @@
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from snapshots import SnapshotPublisher
+
+
+def render(document):
+    return json.dumps(document, default=str).encode()
+
+
+def loader(documents, loaded=None):
+    async def load(tenant):
+        if loaded is not None:
+            loaded.append(tenant)
+        return documents
+    return load
+
+
+@pytest.mark.anyio
+async def test_exports_are_debounced_versioned_and_precompressed(tmp_path):
+    documents, loaded = {"biography": {"name": "A"}}, []
+    publisher = SnapshotPublisher(str(tmp_path), 60, 1, loader(documents, loaded), render)
+    for _ in range(3):
+        publisher.request("t1")
+    await publisher.flush()
+    assert loaded == ["t1"]
+    assert (publisher.requested, publisher.exports) == (3, 1)
+
+    current = tmp_path / "t1" / "biography.json"
+    assert json.loads(current.read_bytes()) == {"name": "A"}
+    assert gzip.decompress((tmp_path / "t1" / "biography.json.gz").read_bytes()) == current.read_bytes()
+    manifest = json.loads((tmp_path / "t1" / "manifest.json").read_bytes())
+    assert (tmp_path / "t1" / manifest["files"]["biography"]).read_bytes() == current.read_bytes()
+
+    documents["biography"] = {"name": "B"}
+    await publisher.export("t1")
+    assert json.loads(current.read_bytes()) == {"name": "B"}
+    # Only keep_versions immutable versions are kept
+    assert len(list((tmp_path / "t1").glob("biography.*.json"))) == 1
+
+
+@pytest.mark.anyio
+async def test_unchanged_content_is_not_rewritten(tmp_path):
+    publisher = SnapshotPublisher(str(tmp_path), 60, 2, loader({"biography": {"name": "A"}}), render)
+    await publisher.export(None)
+    written = publisher.files_written
+    await publisher.export(None)
+    # Only the manifest changes
+    assert publisher.files_written == written + 1
+
+
+def test_writes_trigger_an_export(load_server, tmp_path):
+    server = load_server(SNAPSHOT_DIR=tmp_path / "snapshots", SNAPSHOT_DEBOUNCE=60)
+    with TestClient(server.app) as client:
+        client.put("/api/biography", json={"name": "Renamed"})
+        assert client.get("/api/snapshots/stats").json()["pending"] == 1
+    site = json.loads((tmp_path / "snapshots" / "site.json").read_bytes())
+    assert site["biography"]["name"] == "Renamed"
+    assert len(site["social_media"]) == 7
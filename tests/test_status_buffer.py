@@ -0,0 +1,177 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from pymongo.errors import AutoReconnect, BulkWriteError, OperationFailure
+
+
+class RecordingCollection:
+    """Records inserted batches, raising the next of errors (if any) for each"""
+
+    name = "status_checks"
+
+    def __init__(self, *errors):
+        self.batches = []
+        self.errors = list(errors)
+
+    async def insert_many(self, documents, ordered=True):
+        self.batches.append(list(documents))
+        if self.errors:
+            error = self.errors.pop(0)
+            if error:
+                raise error
+
+
+@pytest.mark.anyio
+async def test_buffer_flushes_when_a_batch_fills(server):
+    collection = RecordingCollection()
+    buffer = server.WriteBuffer(collection, batch_size=3, flush_interval=60, max_pending=10)
+    buffer.start()
+    for i in range(3):
+        await buffer.add({"id": str(i)})
+    await asyncio.sleep(0.01)
+    assert [len(batch) for batch in collection.batches] == [3]
+    await buffer.stop()
+
+
+@pytest.mark.anyio
+async def test_buffer_flushes_after_the_interval(server):
+    collection = RecordingCollection()
+    buffer = server.WriteBuffer(collection, batch_size=100, flush_interval=0.05, max_pending=10)
+    buffer.start()
+    await buffer.add({"id": "1"})
+    await asyncio.sleep(0.01)
+    assert collection.batches == []
+    await asyncio.sleep(0.1)
+    assert collection.batches == [[{"id": "1"}]]
+    await buffer.stop()
+
+
+@pytest.mark.anyio
+async def test_add_waits_while_the_buffer_is_full(server):
+    release = asyncio.Event()
+
+    class SlowCollection(RecordingCollection):
+        async def insert_many(self, documents, ordered=True):
+            await release.wait()
+            await super().insert_many(documents, ordered)
+
+    collection = SlowCollection()
+    buffer = server.WriteBuffer(collection, batch_size=1, flush_interval=60, max_pending=2)
+    buffer.start()
+    await buffer.add({"id": "1"})
+    await asyncio.sleep(0.01)  # the flusher takes it and stalls in insert_many
+    await buffer.add({"id": "2"})
+    await buffer.add({"id": "3"})
+    blocked = asyncio.create_task(buffer.add({"id": "4"}))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    release.set()
+    await asyncio.wait_for(blocked, 1)
+    await buffer.stop()
+    assert sum(len(batch) for batch in collection.batches) == 4
+
+
+def make_buffer(server, collection, **settings):
+    options = dict(batch_size=10, flush_interval=60, max_pending=10, max_attempts=3, retry_base=0.01, retry_max=0.05)
+    options.update(settings)
+    return server.WriteBuffer(collection, **options)
+
+
+@pytest.mark.anyio
+async def test_rejected_documents_are_retried_alone(server):
+    rejected = BulkWriteError({"writeErrors": [{"index": 1, "code": 2, "errmsg": "not now"}]})
+    collection = RecordingCollection(rejected)
+    written = []
+    buffer = make_buffer(server, collection, batch_size=3, on_write=lambda name, batch: written.extend(batch))
+    buffer.start()
+    for i in range(3):
+        await buffer.add({"id": str(i)})
+    await asyncio.sleep(0.1)
+    await buffer.stop()
+    assert collection.batches[1] == [{"id": "1"}]
+    assert buffer.stats() == {"pending": 0, "written": 3, "batches": 1, "retried": 1, "dead_lettered": 0, "failed": 0}
+    assert sorted(document["id"] for document in written) == ["0", "1", "2"]
+
+
+@pytest.mark.anyio
+async def test_duplicates_on_a_retry_were_written_by_an_earlier_attempt(server):
+    duplicates = BulkWriteError({"writeErrors": [{"index": 0, "code": 11000, "errmsg": "duplicate"}]})
+    collection = RecordingCollection(AutoReconnect("timed out"), duplicates)
+    buffer = make_buffer(server, collection, batch_size=1)
+    buffer.start()
+    await buffer.add({"id": "1"})
+    await asyncio.sleep(0.1)
+    await buffer.stop()
+    assert len(collection.batches) == 2
+    assert (buffer.written, buffer.retried, buffer.failed) == (1, 1, 0)
+
+
+@pytest.mark.anyio
+async def test_batches_that_keep_failing_are_dead_lettered(server, database):
+    collection = RecordingCollection(*[RuntimeError("down")] * 3)
+    buffer = make_buffer(server, collection, dead_letter=database.status_checks_dead_letter, flush_interval=0.01)
+    buffer.start()
+    await buffer.add({"id": "1"})
+    await asyncio.sleep(0.2)
+    assert len(collection.batches) == 3
+    assert buffer.stats()["dead_lettered"] == 1
+    dead = await database.status_checks_dead_letter.find({}, {"_id": 0}).to_list(None)
+    assert [(entry["document"], entry["attempts"], entry["last_error"]) for entry in dead] == [({"id": "1"}, 3, "down")]
+
+    # The flusher is still running
+    await buffer.add({"id": "2"})
+    await buffer.stop()
+    assert collection.batches[-1] == [{"id": "2"}] and buffer.written == 1
+
+
+@pytest.mark.anyio
+async def test_stop_gives_failing_batches_one_last_attempt(server):
+    collection = RecordingCollection(OperationFailure("down"), OperationFailure("down"))
+    buffer = make_buffer(server, collection, retry_base=60, retry_max=60, max_attempts=5)
+    buffer.start()
+    await buffer.add({"id": "1"})
+    await asyncio.wait_for(buffer.stop(), 1)
+    assert (len(collection.batches), buffer.failed) == (1, 1)
+
+
+@pytest.mark.anyio
+async def test_a_failing_listener_does_not_stop_the_flusher(server):
+    def broken_listener(name, batch):
+        raise ValueError("broken")
+
+    collection = RecordingCollection()
+    buffer = make_buffer(server, collection, batch_size=1, on_write=broken_listener)
+    buffer.start()
+    await buffer.add({"id": "1"})
+    await buffer.add({"id": "2"})
+    await asyncio.wait_for(buffer.stop(), 1)
+    assert collection.batches == [[{"id": "1"}], [{"id": "2"}]]
+    assert buffer.written == 2
+
+
+def test_batch_endpoint_accepts_json_and_ndjson(load_server):
+    server = load_server(STATUS_FLUSH_INTERVAL=0.01)
+    with TestClient(server.app) as client:
+        assert client.post("/api/status/batch", json=[{"client_name": "a"}, {"client_name": "b"}]).json() == {"accepted": 2}
+        ndjson = "\n".join(json.dumps({"client_name": name}) for name in "cde") + "\n"
+        response = client.post(
+            "/api/status/batch", content=ndjson, headers={"content-type": "application/x-ndjson"}
+        )
+        assert response.json() == {"accepted": 3}
+        client.post("/api/status", json={"client_name": "f"})
+
+        client.portal.call(asyncio.sleep, 0.1)
+        assert client.get("/api/status/buffer").json()["written"] == 6
+        names = {item["client_name"] for item in client.get("/api/status").json()["items"]}
+        assert names == set("abcdef")
+
+
+def test_batch_endpoint_rejects_bad_bodies(server, client):
+    assert client.post("/api/status/batch", content="{not json").status_code == 400
+    assert client.post("/api/status/batch", json={"client_name": "a"}).status_code == 400
+    assert client.post("/api/status/batch", json=[{"name": "a"}]).status_code == 422
+    too_many = [{"client_name": "a"}] * (server.STATUS_INGEST_MAX_ITEMS + 1)
+    assert client.post("/api/status/batch", json=too_many).status_code == 413
@@ -0,0 +1,256 @@
+"""The memory and SQLite backends must answer every query and update like Mongo does."""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo import DeleteOne, IndexModel, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import AutoReconnect, BulkWriteError, DuplicateKeyError, OperationFailure
+
+pytestmark = pytest.mark.anyio
+
+DOCS = [
+    {"id": "a", "name": "Ann", "rank": 1, "tags": "x", "tenant": "t1"},
+    {"id": "b", "name": "Bob", "rank": 2, "tags": None, "tenant": "t1"},
+    {"id": "c", "name": "Cid", "rank": 3, "tenant": "t2"},
+    {"id": "d", "name": "Dee", "rank": 4},
+]
+
+
+@pytest.fixture
+async def people(database):
+    await database.people.insert_many([dict(doc) for doc in DOCS])
+    return database.people
+
+
+async def ids(collection, query):
+    return [doc["id"] for doc in await collection.find(query, {"_id": 0, "id": 1}).sort("id", 1).to_list(None)]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ({}, ["a", "b", "c", "d"]),
+    ({"id": "b"}, ["b"]),
+    ({"id": "b", "tenant": "t2"}, []),
+    ({"name": "Cid", "rank": 3}, ["c"]),
+    ({"rank": {"$gt": 1, "$lte": 3}}, ["b", "c"]),
+    ({"rank": {"$lt": 2}}, ["a"]),
+    ({"rank": {"$gte": 4}}, ["d"]),
+    ({"rank": {"$in": [1, 4, 9]}}, ["a", "d"]),
+    ({"rank": {"$in": []}}, []),
+    ({"tenant": {"$ne": "t1"}}, ["c", "d"]),
+    ({"tenant": {"$exists": False}}, ["d"]),
+    ({"tags": {"$exists": True}}, ["a", "b"]),
+    ({"tags": None}, ["b", "c", "d"]),
+    ({"tenant": None}, ["d"]),
+    ({"$or": [{"rank": 1}, {"tenant": "t2"}]}, ["a", "c"]),
+    ({"tenant": "t1", "$or": [{"rank": {"$gt": 1}}, {"name": "Zed"}]}, ["b"]),
+])
+async def test_find_matches_mongo_semantics(people, query, expected):
+    assert await ids(people, query) == expected
+
+
+async def test_find_sorts_limits_and_projects(people):
+    docs = await people.find({"rank": {"$gt": 1}}, {"_id": 0, "name": 1}).sort("rank", -1).limit(2).to_list(None)
+    assert docs == [{"name": "Dee"}, {"name": "Cid"}]
+
+    docs = await people.find({}, {"_id": 0, "tenant": 0, "tags": 0}).sort([("tenant", 1), ("rank", -1)]).to_list(None)
+    assert [doc["id"] for doc in docs] == ["d", "b", "a", "c"]
+    assert all(set(doc) == {"id", "name", "rank"} for doc in docs)
+
+
+async def test_datetime_ranges(database):
+    now = datetime.utcnow()
+    await database.events.insert_many([{"id": str(i), "at": now - timedelta(minutes=i)} for i in range(5)])
+
+    older = await database.events.find({"at": {"$lt": now - timedelta(minutes=2)}}).to_list(None)
+    assert sorted(doc["id"] for doc in older) == ["3", "4"]
+    newest = await database.events.find({}).sort("at", -1).limit(1).to_list(1)
+    assert newest[0]["id"] == "0"
+
+
+async def test_unsupported_operators_raise(people):
+    with pytest.raises(OperationFailure):
+        await people.find({"name": {"$regex": "A"}}).to_list(None)
+    with pytest.raises(OperationFailure):
+        await people.find_one_and_update({"id": "a"}, {"$push": {"tags": "y"}})
+
+
+async def test_find_one_and_update_returns_before_or_after(people):
+    before = await people.find_one_and_update({"id": "a"}, {"$set": {"name": "Ana", "rank": 11}})
+    assert (before["name"], before["rank"]) == ("Ann", 1)
+
+    after = await people.find_one_and_update(
+        {"id": "a"}, {"$set": {"rank": 12}}, projection={"_id": 0, "rank": 1}, return_document=ReturnDocument.AFTER
+    )
+    assert after == {"rank": 12}
+    assert await people.find_one_and_update({"id": "zz"}, {"$set": {"name": "x"}}) is None
+    assert await people.find_one({"id": "zz"}) is None
+
+
+async def test_upsert_seeds_equality_fields_only(database):
+    doc = await database.counters.find_one_and_update(
+        {"id": "feed", "seq": {"$lt": 5}},
+        {"$set": {"seq": 5}, "$setOnInsert": {"created": True}},
+        projection={"_id": 0}, upsert=True, return_document=ReturnDocument.AFTER,
+    )
+    assert doc == {"id": "feed", "seq": 5, "created": True}
+
+    # $setOnInsert only applies when the upsert inserts
+    doc = await database.counters.find_one_and_update(
+        {"id": "feed"}, {"$set": {"seq": 7}, "$setOnInsert": {"created": False}},
+        projection={"_id": 0}, upsert=True, return_document=ReturnDocument.AFTER,
+    )
+    assert doc == {"id": "feed", "seq": 7, "created": True}
+
+    doc = await database.counters.find_one_and_update(
+        {"id": "fresh"}, {"$set": {"seq": 3}}, projection={"_id": 0}, upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    assert doc == {"id": "fresh", "seq": 3}
+
+
+async def test_inc_counts_from_zero_on_upsert(database):
+    doc = await database.counters.find_one_and_update(
+        {"id": "feed"}, {"$inc": {"seq": 2}}, projection={"_id": 0}, upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    assert doc == {"id": "feed", "seq": 2}
+    doc = await database.counters.find_one_and_update(
+        {"id": "feed"}, {"$inc": {"seq": 3}, "$set": {"name": "f"}}, projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+    assert doc == {"id": "feed", "seq": 5, "name": "f"}
+
+
+async def test_upsert_against_a_range_that_no_longer_matches_hits_the_unique_id(database):
+    await database.counters.insert_one({"id": "horizon", "seq": 9})
+    with pytest.raises(DuplicateKeyError):
+        await database.counters.find_one_and_update({"id": "horizon", "seq": {"$lt": 5}}, {"$set": {"seq": 5}}, upsert=True)
+    assert (await database.counters.find_one({"id": "horizon"}))["seq"] == 9
+
+
+async def test_ids_are_unique(people):
+    with pytest.raises(DuplicateKeyError):
+        await people.insert_one({"id": "a", "name": "Again"})
+    with pytest.raises(DuplicateKeyError):
+        await people.replace_one({"id": "b"}, {"id": "a", "name": "Clash"})
+    assert (await people.find_one({"id": "b"}))["name"] == "Bob"
+
+
+async def test_unique_index_with_partial_filter(database):
+    collection = database.partnerships
+    await collection.create_indexes([
+        IndexModel([("tenant", 1), ("name", 1)], name="tenant_name", unique=True,
+                   partialFilterExpression={"tenant": {"$exists": True}}),
+    ])
+    await collection.insert_one({"id": "1", "tenant": "t1", "name": "P"})
+    await collection.insert_one({"id": "2", "tenant": "t2", "name": "P"})
+    # Documents without the field are not covered by the partial index
+    await collection.insert_one({"id": "3", "name": "P"})
+    await collection.insert_one({"id": "4", "name": "P"})
+    with pytest.raises(DuplicateKeyError):
+        await collection.insert_one({"id": "5", "tenant": "t1", "name": "P"})
+    with pytest.raises(DuplicateKeyError):
+        await collection.find_one_and_update({"id": "2"}, {"$set": {"tenant": "t1"}})
+
+    # Deleting a document frees its key
+    await collection.delete_one({"id": "1"})
+    await collection.insert_one({"id": "5", "tenant": "t1", "name": "P"})
+    assert "tenant_name" in await collection.index_information()
+
+
+async def test_unique_index_cannot_be_built_over_duplicates(people):
+    await people.insert_one({"id": "e", "name": "Ann"})
+    with pytest.raises(DuplicateKeyError):
+        await people.create_indexes([IndexModel([("name", 1)], name="name_unique", unique=True)])
+    await people.insert_one({"id": "f", "name": "Ann"})
+
+
+async def test_insert_many_unordered_keeps_going_past_duplicates(people):
+    with pytest.raises(BulkWriteError) as error:
+        await people.insert_many(
+            [{"id": "a"}, {"id": "e"}, {"id": "b"}, {"id": "f"}], ordered=False
+        )
+    assert [e["index"] for e in error.value.details["writeErrors"]] == [0, 2]
+    assert error.value.details["nInserted"] == 2
+    assert await ids(people, {"id": {"$in": ["e", "f"]}}) == ["e", "f"]
+
+
+async def test_insert_many_ordered_stops_at_first_duplicate(people):
+    with pytest.raises(BulkWriteError):
+        await people.insert_many([{"id": "e"}, {"id": "a"}, {"id": "f"}])
+    assert await ids(people, {"id": {"$in": ["e", "f"]}}) == ["e"]
+
+
+async def test_bulk_write_mixes_operations(people):
+    result = await people.bulk_write([
+        InsertOne({"id": "e", "rank": 5}),
+        UpdateOne({"id": "a"}, {"$set": {"rank": 10}}),
+        UpdateOne({"id": "n", "tenant": "t3"}, {"$setOnInsert": {"rank": 0}}, upsert=True),
+        UpdateOne({"id": "zz"}, {"$set": {"rank": 0}}),
+        DeleteOne({"id": "d"}),
+        DeleteOne({"id": "zz"}),
+    ], ordered=False)
+    summary = result.bulk_api_result
+    assert (summary["nInserted"], summary["nMatched"], summary["nUpserted"], summary["nRemoved"]) == (1, 1, 1, 1)
+    assert result.upserted_count == 1
+    assert await people.find_one({"id": "n"}, {"_id": 0}) == {"id": "n", "tenant": "t3", "rank": 0}
+    assert await ids(people, {}) == ["a", "b", "c", "e", "n"]
+
+
+async def test_replace_one_upserts(people):
+    result = await people.replace_one({"id": "z"}, {"id": "z", "name": "Zed"}, upsert=True)
+    assert (result.matched_count, result.upserted_id) == (0, "z")
+    result = await people.replace_one({"id": "z"}, {"id": "z", "name": "Zoe"})
+    assert result.matched_count == 1
+    assert await people.find_one({"id": "z"}, {"_id": 0}) == {"id": "z", "name": "Zoe"}
+
+
+async def test_sqlite_documents_survive_a_restart(tmp_path):
+    from storage import SQLiteClient
+
+    path = str(tmp_path / "restart.sqlite3")
+    client = SQLiteClient(path)
+    await client["test"].people.insert_one({"id": "a", "name": "Ann"})
+    client.close()
+
+    client = SQLiteClient(path)
+    assert await client["test"].people.find_one({"id": "a"}, {"_id": 0}) == {"id": "a", "name": "Ann"}
+    client.close()
+
+
+async def test_sqlite_errors_are_raised_as_pymongo_errors(tmp_path):
+    from storage import SQLiteClient
+
+    path = str(tmp_path / "locked.sqlite3")
+    client = SQLiteClient(path, timeout=0.05)
+    people = client["test"].people
+    await people.insert_one({"id": "a"})
+
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    with pytest.raises(AutoReconnect):
+        await people.insert_one({"id": "b"})
+    other.execute("ROLLBACK")
+    other.close()
+    await people.insert_one({"id": "b"})
+    assert await ids(people, {}) == ["a", "b"]
+
+    with pytest.raises(OperationFailure):
+        await client["test"].run(lambda conn: conn.execute("SELECT * FROM missing"))
+    client.close()
+
+
+async def test_update_many_and_delete_many(people):
+    result = await people.update_many({"tenant": {"$exists": False}}, {"$set": {"tenant": "t9"}})
+    assert (result.matched_count, result.modified_count) == (1, 1)
+    assert await ids(people, {"tenant": "t9"}) == ["d"]
+
+    result = await people.update_many({"tenant": "t1"}, {"$set": {"vip": True}})
+    assert result.matched_count == 2
+    assert await ids(people, {"vip": True}) == ["a", "b"]
+
+    result = await people.delete_many({"tenant": "t1", "rank": {"$lt": 2}})
+    assert result.deleted_count == 1
+    assert (await people.delete_many({"tenant": "nobody"})).deleted_count == 0
+    assert await ids(people, {}) == ["b", "c", "d"]
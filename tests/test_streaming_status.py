@@ -0,0 +1,85 @@
+import time
+
+from fastapi.testclient import TestClient
+
+
+def test_reports_write_only_changes_and_debounce_flapping(load_server):
+    server = load_server(STREAMING_STATUS_DEBOUNCE=0.3)
+    with TestClient(server.app) as client:
+        for status in ["offline", "offline", "streaming", "online", "streaming"]:
+            response = client.put("/api/streaming-status", params={"status": status})
+            assert response.status_code == 200
+            assert response.json()["last_checked"] is not None
+        time.sleep(0.5)
+
+        assert client.get("/api/streaming-status").json()["status"] == "streaming"
+        stats = client.get("/api/streaming-status/writes").json()
+        assert (stats["reports"], stats["writes"], stats["unchanged"], stats["debounced"]) == (5, 1, 3, 2)
+        assert not stats["pending"]
+
+
+def test_last_checked_is_persisted_in_the_background(load_server):
+    server = load_server(STREAMING_STATUS_HEARTBEAT_INTERVAL=0.1)
+    with TestClient(server.app) as client:
+        client.put("/api/streaming-status", params={"status": "offline"})
+        time.sleep(0.3)
+        stored = client.portal.call(server.streaming_status_repo.collection.find_one, {})
+        assert stored["last_checked"] is not None
+        assert server.streaming_status_writer.stats()["writes"] == 0
+
+
+def test_unchanged_reports_leave_the_site_untouched(load_server):
+    server = load_server(STREAMING_STATUS_DEBOUNCE=0)
+    with TestClient(server.app) as client:
+        site = client.get("/api/site")
+        client.put("/api/streaming-status", params={"status": "offline", "game": "Rocket League"})
+        assert client.get("/api/site", headers={"if-none-match": site.headers["etag"]}).status_code == 304
+
+        client.put("/api/streaming-status", params={"status": "streaming", "game": "Tetris"})
+        changed = client.get("/api/site", headers={"if-none-match": site.headers["etag"]})
+        assert changed.status_code == 200
+        assert changed.json()["streaming_status"]["game"] == "Tetris"
+
+
+def test_unchanged_report_moves_last_checked_but_not_the_etag(load_server):
+    server = load_server(STREAMING_STATUS_DEBOUNCE=0)
+    with TestClient(server.app) as client:
+        client.put("/api/streaming-status", params={"status": "offline"})
+        first = client.get("/api/streaming-status")
+        assert first.json()["last_checked"] is None
+        checked = client.get("/api/streaming-status/heartbeat").json()["last_checked"]
+        version = server.collection_versions.version("streaming_status")
+        time.sleep(0.01)
+        client.put("/api/streaming-status", params={"status": "offline"})
+
+        assert server.collection_versions.version("streaming_status") == version
+        second = client.get("/api/streaming-status", headers={"if-none-match": first.headers["etag"]})
+        assert second.status_code == 304
+        assert client.get("/api/streaming-status/heartbeat").json()["last_checked"] > checked
+
+
+def test_heartbeat_from_another_worker_keeps_the_etag(load_server):
+    server = load_server(STREAMING_STATUS_DEBOUNCE=0)
+    with TestClient(server.app) as client:
+        current = server.model_to_dict(client.portal.call(server.streaming_status_writer.current))
+        version = server.collection_versions.version("streaming_status")
+
+        server.cache_coherence._apply("streaming_status", {**current, "last_checked": server.datetime.utcnow()})
+        assert server.collection_versions.version("streaming_status") == version
+
+        server.cache_coherence._apply("streaming_status", {**current, "status": "online"})
+        assert server.collection_versions.version("streaming_status") == version + 1
+        assert client.get("/api/streaming-status").json()["status"] == "online"
+
+
+def test_shutdown_flushes_buffers_when_a_step_fails(load_server, monkeypatch):
+    server = load_server(STATUS_FLUSH_INTERVAL=30)
+    client = TestClient(server.app)
+    with client:
+        client.post("/api/status", json={"client_name": "x"})
+
+        def broken_stop():
+            raise RuntimeError("stop failed")
+
+        monkeypatch.setattr(server.cache_coherence, "stop", broken_stop)
+    assert server.status_check_buffer.stats()["written"] == 1
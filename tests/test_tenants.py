@@ -0,0 +1,79 @@
+import pytest
+from fastapi.testclient import TestClient
+
+PARTNERSHIP = {"name": "P1", "role": "Sponsor", "logo": "x", "handle": "@p1"}
+
+
+@pytest.fixture
+def tenants(load_server):
+    server = load_server(MULTI_TENANT=1, TENANT_RESOLUTION="path", DEFAULT_TENANT="ladypi89",
+                         STREAMING_STATUS_DEBOUNCE=0)
+    with TestClient(server.app) as client:
+        response = client.post("/api/admin/tenants", json={
+            "id": "rocketgal", "name": "RocketGal", "title": "Caster", "hosts": ["rocketgal.tv"],
+        })
+        assert response.status_code == 200
+        yield client
+
+
+def test_tenant_registration_is_validated(tenants):
+    assert tenants.post("/api/admin/tenants", json={"id": "rocketgal", "name": "x"}).status_code == 409
+    assert tenants.post("/api/admin/tenants", json={"id": "Bad_Id", "name": "x"}).status_code == 422
+    assert [tenant["id"] for tenant in tenants.get("/api/admin/tenants").json()] == ["ladypi89", "rocketgal"]
+
+
+def test_new_tenants_are_seeded_with_their_own_documents(tenants):
+    assert tenants.get("/t/rocketgal/api/biography").json()["name"] == "RocketGal"
+    assert tenants.get("/t/ladypi89/api/biography").json()["name"] == "LadyPi89"
+    assert tenants.get("/t/rocketgal/api/site").json()["biography"]["name"] == "RocketGal"
+    assert tenants.get("/t/rocketgal/api/social-media").json() == []
+    assert len(tenants.get("/t/ladypi89/api/social-media").json()) == 7
+    assert tenants.get("/t/nobody/api/biography").status_code == 404
+
+
+def test_writes_stay_within_their_tenant(tenants):
+    etag = tenants.get("/t/ladypi89/api/partnerships").headers["etag"]
+    before = len(tenants.get("/t/rocketgal/api/partnerships").json())
+    assert tenants.post("/t/rocketgal/api/partnerships", json=PARTNERSHIP).status_code == 200
+
+    assert len(tenants.get("/t/rocketgal/api/partnerships").json()) == before + 1
+    assert tenants.get("/t/ladypi89/api/partnerships", headers={"if-none-match": etag}).status_code == 304
+
+    tenants.put("/t/rocketgal/api/streaming-status", params={"status": "streaming"})
+    assert tenants.get("/t/rocketgal/api/streaming-status").json()["status"] == "streaming"
+    assert tenants.get("/t/ladypi89/api/streaming-status").json()["status"] == "offline"
+
+
+def test_tenants_resolve_from_their_hosts(load_server):
+    server = load_server(MULTI_TENANT=1, TENANT_RESOLUTION="host", TENANT_BASE_DOMAIN="creators.test")
+    with TestClient(server.app) as client:
+        client.post("/api/admin/tenants", json={"id": "rocketgal", "name": "RocketGal", "hosts": ["rocketgal.tv"]})
+        assert client.get("/api/biography", headers={"host": "rocketgal.tv"}).json()["name"] == "RocketGal"
+        assert client.get("/api/biography", headers={"host": "rocketgal.creators.test"}).json()["name"] == "RocketGal"
+        assert client.get("/api/biography").json()["name"] == "LadyPi89"
+
+
+def test_documents_from_single_site_mode_are_adopted(load_server, storage_backend):
+    if storage_backend == "memory":
+        pytest.skip("memory storage doesn't survive a restart")
+    single = load_server()
+    with TestClient(single.app) as client:
+        client.post("/api/partnerships", json=PARTNERSHIP)
+        partnerships = len(client.get("/api/partnerships").json())
+
+    multi = load_server(MULTI_TENANT=1, TENANT_RESOLUTION="path", DEFAULT_TENANT="ladypi89")
+    with TestClient(multi.app) as client:
+        assert len(client.get("/t/ladypi89/api/partnerships").json()) == partnerships
+        assert len(client.get("/t/ladypi89/api/social-media").json()) == 7
+
+
+@pytest.mark.anyio
+async def test_adopt_untenanted_only_touches_untenanted_documents(load_server):
+    server = load_server(MULTI_TENANT=1)
+    await server.db.partnerships.insert_many([
+        {"id": "old", "name": "Old"}, {"id": "other", "name": "Other", "tenant": "rocketgal"},
+    ])
+    counts = await server.adopt_untenanted(server.db, "ladypi89")
+    assert counts["partnerships"] == 1
+    docs = await server.db.partnerships.find({}, {"_id": 0, "id": 1, "tenant": 1}).sort("id", 1).to_list(None)
+    assert docs == [{"id": "old", "tenant": "ladypi89"}, {"id": "other", "tenant": "rocketgal"}]